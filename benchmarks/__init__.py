@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+計算エンジンのベンチマークスイート
+
+実行例:
+    python -m benchmarks.run_benchmarks --output benchmark_results.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --threshold 0.2
+"""
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計算エンジンのベンチマーク実行・基準値比較
+
+合成案件に対する calculate_all / calculate_amounts / calculate_batch /
+シリアライズの処理件数（件/秒）を計測し、JSONに出力する。
+--baseline を指定すると保存済みの基準値と比較し、閾値を超えて
+遅くなったベンチマークがあれば終了コード1で終了する。
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from models import CaseData
+from calculation.compensation_engine import CompensationEngine, cases_to_columns
+from benchmarks.synthetic_cases import generate_cases
+
+DEFAULT_CASE_COUNT = 5000
+DEFAULT_SEED = 20240401
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2  # 基準値より20%以上遅ければ回帰とみなす
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> float:
+    """repeat 回実行し最短の所要時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(case_count: int = DEFAULT_CASE_COUNT, seed: int = DEFAULT_SEED,
+                   repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """全ベンチマークを実行し、結果（件/秒）を返す"""
+    cases = generate_cases(case_count, seed)
+    uncached = CompensationEngine(cache_size=0)
+    cached = CompensationEngine(cache_size=case_count)
+    for case_data in cases:
+        cached.calculate_all(case_data)
+    columns = cases_to_columns(cases)
+    serialized = [json.dumps(c.to_dict(), ensure_ascii=False, default=str) for c in cases]
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        'calculate_all': lambda: [uncached.calculate_all(c) for c in cases],
+        'calculate_all_cached': lambda: [cached.calculate_all(c) for c in cases],
+        'calculate_all_with_details': lambda: [
+            [r.calculation_details for r in uncached.calculate_all(c).values()] for c in cases],
+        'calculate_amounts': lambda: [uncached.calculate_amounts(c) for c in cases],
+        'cases_to_columns': lambda: cases_to_columns(cases),
+        'calculate_batch': lambda: uncached.calculate_batch(columns),
+        'serialize_json': lambda: [json.dumps(c.to_dict(), ensure_ascii=False, default=str) for c in cases],
+        'deserialize_json': lambda: [CaseData.from_dict(json.loads(s)) for s in serialized],
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        seconds = _best_of(repeat, func)
+        results[name] = {
+            'seconds': seconds,
+            'cases_per_sec': case_count / seconds if seconds > 0 else float('inf'),
+        }
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'case_count': case_count,
+        'seed': seed,
+        'repeat': repeat,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'results': results,
+    }
+
+
+def compare_with_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                          threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """基準値と比較し、各ベンチマークの比率と回帰判定を返す"""
+    comparisons = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratio = result['cases_per_sec'] / base['cases_per_sec']
+        comparisons.append({
+            'name': name,
+            'baseline_cases_per_sec': base['cases_per_sec'],
+            'cases_per_sec': result['cases_per_sec'],
+            'ratio': ratio,
+            'regression': ratio < 1 - threshold,
+        })
+    return comparisons
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="計算エンジンのベンチマーク")
+    parser.add_argument('--cases', type=int, default=DEFAULT_CASE_COUNT, help="合成案件数")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="乱数シード")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="各ベンチマークの反復回数（最短値を採用）")
+    parser.add_argument('--output', type=Path, help="結果JSONの出力先")
+    parser.add_argument('--baseline', type=Path, help="比較する基準値JSON")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回帰とみなす低下率（0.2 = 20%%）")
+    parser.add_argument('--update-baseline', action='store_true', help="結果を基準値として保存")
+    args = parser.parse_args(argv)
+
+    # 計測中のログ出力（監視アラート等）を抑制
+    logging.disable(logging.WARNING)
+    report = run_benchmarks(args.cases, args.seed, args.repeat)
+
+    for name, result in report['results'].items():
+        print(f"{name:28s} {result['cases_per_sec']:>14,.0f} 件/秒  ({result['seconds']:.4f}秒)")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"結果を保存しました: {args.output}")
+
+    exit_code = 0
+    baseline_path = args.baseline or (DEFAULT_BASELINE if not args.update_baseline else None)
+    if baseline_path and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        print(f"\n基準値との比較: {baseline_path} (閾値 {args.threshold:.0%})")
+        if (baseline.get('case_count'), baseline.get('seed')) != (report['case_count'], report['seed']):
+            print(f"  注意: 基準値と案件数・シードが異なります（基準値: {baseline.get('case_count')}件, seed={baseline.get('seed')}）")
+        for comparison in compare_with_baseline(report, baseline, args.threshold):
+            mark = "回帰" if comparison['regression'] else "OK"
+            print(f"  [{mark}] {comparison['name']:28s} {comparison['ratio']:.2f}x")
+            if comparison['regression']:
+                exit_code = 1
+
+    if args.update_baseline:
+        target = args.baseline or DEFAULT_BASELINE
+        target.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"基準値を更新しました: {target}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
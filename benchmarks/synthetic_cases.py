@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成案件データ生成
+
+実務の案件構成に近い分布（むちうち症の割合、後遺障害等級の構成、
+収入分布、過失割合など）で CaseData を生成する。seed が同じなら同じ案件列を返す。
+"""
+
+import math
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+from models import CaseData
+
+# 後遺障害等級の構成（0 = 非該当）
+GRADE_WEIGHTS = {0: 0.72, 14: 0.17, 12: 0.05, 11: 0.015, 10: 0.01, 9: 0.01,
+                 8: 0.008, 7: 0.006, 5: 0.005, 3: 0.003, 1: 0.003}
+
+# むちうち症（他覚所見なし、別表II）の割合
+WHIPLASH_SHARE = 0.6
+
+# 過失割合の構成（%）
+FAULT_WEIGHTS = {0: 0.45, 10: 0.2, 20: 0.15, 30: 0.1, 40: 0.05, 50: 0.04, 70: 0.01}
+
+OCCUPATION_WEIGHTS = {"会社員": 0.6, "自営業": 0.12, "家事従事者": 0.15, "パート": 0.08, "無職": 0.05}
+
+# 年収の分布（対数正規、中央値約420万円）
+INCOME_MEDIAN = 4200000
+INCOME_SIGMA = 0.45
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _loss_period(rng: random.Random, grade: int, age: int) -> int:
+    """等級に応じた労働能力喪失期間（14級は5年、12級は10年程度、重い等級は67歳まで）"""
+    if grade == 0:
+        return 0
+    if grade == 14:
+        return rng.choice([3, 5, 5, 5])
+    if grade == 12:
+        return rng.choice([5, 10, 10])
+    return max(67 - age, 1)
+
+
+def generate_case(rng: random.Random, index: int = 0) -> CaseData:
+    """合成案件を1件生成"""
+    case_data = CaseData()
+    case_data.case_number = f"BENCH-{index:07d}"
+    person, accident, medical, income = (case_data.person_info, case_data.accident_info,
+                                         case_data.medical_info, case_data.income_info)
+
+    person.name = f"ベンチ太郎{index}"
+    person.age = min(max(int(rng.gauss(45, 15)), 18), 85)
+    person.gender = rng.choice(["男性", "女性"])
+    person.occupation = _weighted(rng, OCCUPATION_WEIGHTS)
+    if person.occupation in ("家事従事者", "無職"):
+        annual_income = 0
+    else:
+        annual_income = int(INCOME_MEDIAN * math.exp(rng.gauss(0, INCOME_SIGMA)) // 1000 * 1000)
+    person.annual_income = Decimal(annual_income)
+    person.fault_percentage = float(_weighted(rng, FAULT_WEIGHTS))
+
+    accident.accident_date = date(2018, 1, 1) + timedelta(days=rng.randint(0, 6 * 365))
+    accident.accident_type = rng.choice(["追突", "出会い頭", "右直", "歩行者"])
+    accident.location = rng.choice(["東京都新宿区", "大阪府大阪市", "愛知県名古屋市", "福岡県福岡市"])
+
+    medical.is_whiplash = rng.random() < WHIPLASH_SHARE
+    medical.hospital_months = 0 if rng.random() < 0.85 else rng.randint(1, 6)
+    medical.outpatient_months = rng.randint(1, 12)
+    medical.actual_outpatient_days = int(medical.outpatient_months * rng.uniform(4, 14))
+    medical.disability_grade = _weighted(rng, GRADE_WEIGHTS)
+    if medical.disability_grade:
+        medical.disability_details = f"第{medical.disability_grade}級 神経症状"
+    medical.medical_expenses = Decimal(rng.randint(50, 3000) * 1000)
+    medical.transportation_costs = Decimal(rng.randint(0, 100) * 500)
+    medical.nursing_costs = Decimal(0 if medical.hospital_months == 0 else rng.randint(0, 60) * 6500)
+
+    income.lost_work_days = 0 if annual_income == 0 else rng.randint(0, 90)
+    income.daily_income = Decimal(annual_income // 365)
+    income.loss_period_years = _loss_period(rng, medical.disability_grade, person.age)
+    income.basic_annual_income = Decimal(annual_income)
+    return case_data
+
+
+def generate_cases(count: int, seed: int = 0) -> List[CaseData]:
+    """seed 固定で合成案件を count 件生成"""
+    rng = random.Random(seed)
+    return [generate_case(rng, index) for index in range(count)]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中間利息控除係数（ライプニッツ係数・ホフマン係数）サービス
+
+(方式, 利率, 期間単位) ごとに係数表を初回参照時に一度だけ生成し、
+以降の参照は表の添字参照のみで行う。係数は公表表と同じく
+小数点以下3桁で四捨五入（ROUND_HALF_UP）した値を返す。
+"""
+
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from utils.error_handler import CalculationError
+
+LEIBNIZ = 'leibniz'
+HOFFMANN = 'hoffmann'
+METHODS = (LEIBNIZ, HOFFMANN)
+
+YEAR = 'year'
+MONTH = 'month'
+GRANULARITIES = (YEAR, MONTH)
+
+# 係数の丸め単位（公表表と同じ小数点以下3桁）
+COEFFICIENT_QUANTUM = Decimal('0.001')
+
+# 初回生成する表の長さ（年単位は就労可能年数の上限を十分に超える長さ）
+DEFAULT_TABLE_PERIODS = {YEAR: 100, MONTH: 1200}
+
+TableKey = Tuple[str, Decimal, str]
+
+
+class CoefficientTable:
+    """1つの (方式, 利率, 期間単位) に対する係数表（不変）"""
+
+    def __init__(self, method: str, rate: Decimal, granularity: str, values: Tuple[Decimal, ...]):
+        self.method = method
+        self.rate = rate
+        self.granularity = granularity
+        self.values = values  # 添字=期間、values[0] は 0
+        milli = np.array([int(v.scaleb(3)) for v in values], dtype=np.int64)
+        milli.setflags(write=False)
+        self.milli = milli
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, period: int) -> Decimal:
+        return self.values[period]
+
+
+def _generate_values(method: str, rate: Decimal, granularity: str, periods: int) -> Tuple[Decimal, ...]:
+    """係数表を生成
+
+    ライプニッツ係数は (1 - (1 + i)^-n) / i、ホフマン係数は Σ 1 / (1 + k·i) による。
+    月単位の表は月利 i = r / 12 で割り引いた値を 12 で除し、年収に対する倍率として返す。
+    """
+    if granularity == MONTH:
+        step_rate = rate / 12
+        scale = Decimal(12)
+    else:
+        step_rate = rate
+        scale = Decimal(1)
+
+    values = [Decimal('0')]
+    if method == LEIBNIZ:
+        discount = Decimal(1) / (Decimal(1) + step_rate)
+        present = Decimal(1)
+        for _ in range(periods):
+            present *= discount
+            raw = (Decimal(1) - present) / step_rate / scale
+            values.append(raw.quantize(COEFFICIENT_QUANTUM, rounding=ROUND_HALF_UP))
+    else:
+        total = Decimal(0)
+        for k in range(1, periods + 1):
+            total += Decimal(1) / (Decimal(1) + k * step_rate)
+            values.append((total / scale).quantize(COEFFICIENT_QUANTUM, rounding=ROUND_HALF_UP))
+    return tuple(values)
+
+
+class CoefficientService:
+    """中間利息控除係数の表をキャッシュして提供するサービス"""
+
+    def __init__(self):
+        self._tables: Dict[TableKey, CoefficientTable] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(method: str, rate: Union[Decimal, float, str], granularity: str) -> TableKey:
+        if method not in METHODS:
+            raise CalculationError(
+                f"未対応の係数方式です: {method}",
+                user_message="中間利息控除の方式はライプニッツ方式またはホフマン方式を指定してください。"
+            )
+        if granularity not in GRANULARITIES:
+            raise CalculationError(
+                f"未対応の期間単位です: {granularity}",
+                user_message="期間の単位は年または月を指定してください。"
+            )
+        rate = Decimal(str(rate))
+        if rate <= 0:
+            raise CalculationError(
+                f"利率が正の値ではありません: {rate}",
+                user_message="中間利息控除の利率は正の値を指定してください。"
+            )
+        return method, rate.normalize(), granularity
+
+    def table(self, method: str = LEIBNIZ, rate: Union[Decimal, float, str] = Decimal('0.03'),
+              granularity: str = YEAR, min_periods: int = 0) -> CoefficientTable:
+        """係数表を取得（未生成または長さ不足の場合のみ生成）"""
+        key = self._normalize(method, rate, granularity)
+        table = self._tables.get(key)
+        if table is not None and len(table) > min_periods:
+            return table
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None or len(table) <= min_periods:
+                periods = max(DEFAULT_TABLE_PERIODS[granularity], min_periods,
+                              2 * (len(table) - 1) if table is not None else 0)
+                table = CoefficientTable(*key, _generate_values(*key, periods))
+                self._tables[key] = table
+            return table
+
+    def coefficient(self, period: int, method: str = LEIBNIZ,
+                    rate: Union[Decimal, float, str] = Decimal('0.03'), granularity: str = YEAR) -> Decimal:
+        """期間に対する係数（期間が0以下なら0）"""
+        if period <= 0:
+            return Decimal('0')
+        return self.table(method, rate, granularity, min_periods=period)[period]
+
+    def coefficients(self, periods: Iterable[int], method: str = LEIBNIZ,
+                     rate: Union[Decimal, float, str] = Decimal('0.03'), granularity: str = YEAR) -> List[Decimal]:
+        """複数期間の係数を一括取得"""
+        periods = [max(int(p), 0) for p in periods]
+        table = self.table(method, rate, granularity, min_periods=max(periods, default=0))
+        return [table[p] for p in periods]
+
+    def coefficients_milli(self, periods: np.ndarray, method: str = LEIBNIZ,
+                           rate: Union[Decimal, float, str] = Decimal('0.03'), granularity: str = YEAR) -> np.ndarray:
+        """期間配列に対する係数を千分の一単位の整数配列で取得（一括計算用）"""
+        periods = np.maximum(np.asarray(periods, dtype=np.int64), 0)
+        max_period = int(periods.max()) if periods.size else 0
+        return self.table(method, rate, granularity, min_periods=max_period).milli[periods]
+
+    def cached_tables(self) -> List[Dict[str, object]]:
+        """生成済みの表の一覧"""
+        return [
+            {'method': m, 'rate': str(r), 'granularity': g, 'periods': len(t) - 1}
+            for (m, r, g), t in self._tables.items()
+        ]
+
+
+# グローバル係数サービス
+_global_coefficient_service: Optional[CoefficientService] = None
+_global_coefficient_service_lock = threading.Lock()
+
+
+def get_coefficient_service() -> CoefficientService:
+    """グローバル係数サービスを取得"""
+    global _global_coefficient_service
+    if _global_coefficient_service is None:
+        with _global_coefficient_service_lock:
+            if _global_coefficient_service is None:
+                _global_coefficient_service = CoefficientService()
+    return _global_coefficient_service
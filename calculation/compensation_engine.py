@@ -7,16 +7,219 @@
 
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, datetime
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Iterable, Mapping
+import copy
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 
+import numpy as np
+
 from models import CaseData, PersonInfo, AccidentInfo, MedicalInfo, IncomeInfo
 from utils.error_handler import get_error_handler, CalculationError, ErrorSeverity # 追加
+from utils.performance_monitor import get_performance_monitor
+from calculation.standards import StandardsPack, get_standards_registry, to_accident_date
+from calculation.fixed_point import (
+    LAWYER_FEE_TIERS, AMOUNT_ITEMS, NotFixedPointRepresentable, ratio_fraction, round_half_up_div,
+    calculate_amounts as calculate_fixed_point_amounts
+)
+
+# calculate_batch が受け付ける列名とデフォルト値
+# 金額列はすべて整数（円）、過失割合のみ百分率（小数第1位まで）で指定する
+# 事故日（datetime64[D]、未入力は NaT）は行ごとに適用する基準パック（版）の選択に使う
+BATCH_COLUMNS = {
+    'accident_date': None,
+    'hospital_months': 0,
+    'outpatient_months': 0,
+    'actual_outpatient_days': 0,
+    'is_whiplash': False,
+    'disability_grade': 0,
+    'medical_expenses': 0,
+    'transportation_costs': 0,
+    'nursing_costs': 0,
+    'lost_work_days': 0,
+    'daily_income': 0,
+    'loss_period_years': 0,
+    'basic_annual_income': 0,
+    'annual_income': 0,
+    'is_housework': False,
+    'fault_percentage': 0.0,
+}
+
+# 損害項目ごとの依存関係（各項目の計算に使われる入力項目）
+# 事故日は適用する基準パック（版）の選択に使われる
+ITEM_DEPENDENCIES = {
+    'hospitalization': frozenset({
+        'medical_info.hospital_months', 'medical_info.outpatient_months',
+        'medical_info.actual_outpatient_days', 'medical_info.is_whiplash', 'accident_info.accident_date',
+    }),
+    'disability': frozenset({
+        'medical_info.disability_grade', 'medical_info.disability_details', 'accident_info.accident_date',
+    }),
+    'lost_income': frozenset({
+        'income_info.lost_work_days', 'income_info.daily_income',
+    }),
+    'future_income_loss': frozenset({
+        'person_info.occupation', 'person_info.annual_income', 'medical_info.disability_grade',
+        'income_info.loss_period_years', 'income_info.basic_annual_income', 'accident_info.accident_date',
+    }),
+    'medical_expenses': frozenset({
+        'medical_info.medical_expenses', 'medical_info.transportation_costs', 'medical_info.nursing_costs',
+    }),
+}
+# 総合計は全項目の金額に加え、過失割合に依存する
+SUMMARY_DEPENDENCIES = frozenset({'person_info.fault_percentage'})
+CALCULATION_INPUT_FIELDS = tuple(sorted(SUMMARY_DEPENDENCIES.union(*ITEM_DEPENDENCIES.values())))
+
+# 計算結果キャッシュの上限件数
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_NAME = "calculation_results"
+
+
+def _round_half_up_div(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    """整数配列の除算を ROUND_HALF_UP（0から遠い方向へ）で丸める"""
+    magnitude = (np.abs(numerator) * 2 + denominator) // (2 * denominator)
+    return np.where(numerator < 0, -magnitude, magnitude)
+
+
+def _to_yen(value: Any) -> int:
+    """Decimal/数値を円単位の整数に変換（1円未満は四捨五入）"""
+    return int(Decimal(str(value or 0)).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+_INPUT_SECTIONS = {
+    'person_info': PersonInfo,
+    'accident_info': AccidentInfo,
+    'medical_info': MedicalInfo,
+    'income_info': IncomeInfo,
+}
+
+
+def _qualify_input_field(name: str) -> List[str]:
+    """入力項目名を "区分.項目名" 形式に正規化（未知の項目は CalculationError）"""
+    if '.' in name:
+        section, field_name = name.split('.', 1)
+        model = _INPUT_SECTIONS.get(section)
+        if model is not None and field_name in model.__dataclass_fields__:
+            return [name]
+    else:
+        matches = [f"{section}.{name}" for section, model in _INPUT_SECTIONS.items()
+                   if name in model.__dataclass_fields__]
+        if matches:
+            return matches
+    raise CalculationError(
+        f"未知の入力項目が指定されました: {name}",
+        user_message="再計算の対象項目が正しくありません。"
+    )
+
+
+def _batch_dtype(name: str) -> Any:
+    """calculate_batch の列の型"""
+    if name == 'accident_date':
+        return 'datetime64[D]'
+    if name == 'fault_percentage':
+        return np.float64
+    return bool if name.startswith('is_') else np.int64
+
+
+def cases_to_columns(cases: Iterable[CaseData]) -> Dict[str, np.ndarray]:
+    """CaseData の列を calculate_batch 用の列指向配列に変換"""
+    rows = {name: [] for name in BATCH_COLUMNS}
+    for case_data in cases:
+        person, medical, income = case_data.person_info, case_data.medical_info, case_data.income_info
+        rows['accident_date'].append(to_accident_date(case_data.accident_info.accident_date))
+        rows['hospital_months'].append(medical.hospital_months)
+        rows['outpatient_months'].append(medical.outpatient_months)
+        rows['actual_outpatient_days'].append(medical.actual_outpatient_days)
+        rows['is_whiplash'].append(bool(medical.is_whiplash))
+        rows['disability_grade'].append(medical.disability_grade or 0)
+        rows['medical_expenses'].append(_to_yen(medical.medical_expenses))
+        rows['transportation_costs'].append(_to_yen(medical.transportation_costs))
+        rows['nursing_costs'].append(_to_yen(medical.nursing_costs))
+        rows['lost_work_days'].append(income.lost_work_days)
+        rows['daily_income'].append(_to_yen(income.daily_income))
+        rows['loss_period_years'].append(income.loss_period_years)
+        rows['basic_annual_income'].append(_to_yen(income.basic_annual_income))
+        rows['annual_income'].append(_to_yen(person.annual_income))
+        rows['is_housework'].append(person.occupation == "家事従事者")
+        rows['fault_percentage'].append(float(person.fault_percentage or 0))
+    return {name: np.asarray(values, dtype=_batch_dtype(name)) for name, values in rows.items()}
+
+# 計算詳細のテンプレート（str.format 形式）
+HOSPITALIZATION_DETAILS = """入院期間: {hospital_months}ヶ月
+通院期間: {outpatient_months}ヶ月
+実通院日数: {actual_outpatient_days}日
+適用表: 赤い本{table_type}
+基準額: {base_amount}万円"""
+
+DISABILITY_DETAILS = """後遺障害等級: 第{grade}級
+弁護士基準慰謝料: {base_amount}万円"""
+
+LOST_INCOME_DETAILS = """休業日数: {lost_days}日
+日額基礎収入: {daily_income:,}円
+計算式: {daily_income:,}円 × {lost_days}日"""
+
+FUTURE_INCOME_LOSS_DETAILS = """基礎収入: {base_income:,.0f}円/年
+労働能力喪失率: {loss_percent:.0f}%（第{grade}級）
+労働能力喪失期間: {loss_period}年
+ライプニッツ係数: {leibniz}
+計算式: {base_income:,.0f}円 × {loss_percent:.0f}% × {leibniz} = {amount:,.0f}円"""
+
+MEDICAL_EXPENSES_DETAILS = """治療費: {medical_expenses:,.0f}円
+交通費: {transportation_costs:,.0f}円
+看護費: {nursing_costs:,.0f}円"""
+
+SUMMARY_DETAILS = """損害合計（過失相殺前）: {total_before_deduction:,}円
+被害者過失割合: {fault_percentage}%
+損害合計（過失相殺後）: {total_after_fault:,}円
+弁護士費用（概算）: {lawyer_fee:,}円
+最終支払見込額: {final_amount:,}円"""
+
+
+class CalculationDetails:
+    """計算詳細（テンプレート + パラメータ）
+
+    文字列への整形は初めて参照されたときに一度だけ行う。
+    一括計算やAPI経由など詳細を表示しない経路では整形コストが発生しない。
+    """
+    __slots__ = ('template', 'params', '_text')
+
+    def __init__(self, template: str, **params: Any):
+        self.template = template
+        self.params = params
+        self._text: Optional[str] = None
+
+    @property
+    def is_rendered(self) -> bool:
+        return self._text is not None
+
+    def render(self) -> str:
+        """詳細文字列を取得（初回のみ整形）"""
+        if self._text is None:
+            try:
+                self._text = self.template.format(**self.params)
+            except (ValueError, TypeError, KeyError) as e:
+                # 不正な型の入力でも詳細表示で例外を発生させない
+                logging.getLogger(__name__).warning(f"計算詳細の整形に失敗しました: {e}")
+                self._text = ", ".join(f"{key}={value}" for key, value in self.params.items())
+        return self._text
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __repr__(self) -> str:
+        return f"CalculationDetails({self.render()!r})"
+
 
 @dataclass
 class CalculationResult:
-    """計算結果データクラス"""
+    """計算結果データクラス
+
+    calculation_details には文字列または CalculationDetails を渡せる。
+    参照時は常に整形済みの文字列を返す。
+    """
     item_name: str
     amount: Decimal
     calculation_details: str
@@ -32,119 +235,162 @@ class CalculationResult:
             'notes': self.notes
         }
 
+
+def _get_calculation_details(result: CalculationResult) -> str:
+    details = result._calculation_details
+    return details.render() if isinstance(details, CalculationDetails) else details
+
+
+def _set_calculation_details(result: CalculationResult, details: Any):
+    result._calculation_details = details
+
+
+# dataclass の生成後にプロパティを設定し、詳細の整形を参照時まで遅延させる
+CalculationResult.calculation_details = property(_get_calculation_details, _set_calculation_details)
+
 class CompensationEngine:
     """弁護士基準損害賠償計算エンジン"""
     
-    def __init__(self):
+    def __init__(self, edition: Optional[str] = None, cache_size: int = RESULT_CACHE_SIZE):
         self.logger = logging.getLogger(__name__)
         self._error_handler = get_error_handler() # 追加
-        self.init_standards()
-    
-    def init_standards(self):
-        """法的基準データの初期化"""
+        self.performance_monitor = get_performance_monitor()
         
-        # 入通院慰謝料表（赤い本別表I） 単位：万円
-        # より詳細で正確なデータに拡張
-        self.hospitalization_table_1 = {
-            0: {0:0, 1:28, 2:52, 3:73, 4:90, 5:105, 6:116, 7:124, 8:132, 9:139, 10:145, 11:150, 12:154, 13:158, 14:162, 15:166, 16:169, 17:172, 18:175, 19:178, 20:180},
-            1: {0:53, 1:77, 2:98, 3:115, 4:130, 5:141, 6:150, 7:158, 8:164, 9:169, 10:174, 11:177, 12:181, 13:185, 14:189, 15:193, 16:196, 17:199, 18:201, 19:204, 20:206},
-            2: {0:101, 1:122, 2:140, 3:154, 4:167, 5:176, 6:183, 7:188, 8:193, 9:196, 10:199, 11:201, 12:204, 13:207, 14:210, 15:213, 16:215, 17:218, 18:220, 19:222, 20:224},
-            3: {0:145, 1:162, 2:177, 3:188, 4:197, 5:204, 6:209, 7:213, 8:216, 9:218, 10:221, 11:223, 12:225, 13:228, 14:231, 15:233, 16:235, 17:237, 18:239, 19:241, 20:243},
-            4: {0:165, 1:184, 2:198, 3:208, 4:216, 5:223, 6:228, 7:232, 8:235, 9:237, 10:239, 11:241, 12:243, 13:245, 14:247, 15:249, 16:251, 17:252, 18:254, 19:256, 20:257},
-            5: {0:183, 1:202, 2:215, 3:225, 4:233, 5:239, 6:244, 7:248, 8:250, 9:252, 10:254, 11:256, 12:258, 13:260, 14:262, 15:264, 16:265, 17:267, 18:268, 19:270, 20:271},
-            6: {0:199, 1:218, 2:230, 3:239, 4:246, 5:252, 6:257, 7:260, 8:262, 9:264, 10:266, 11:268, 12:270, 13:272, 14:274, 15:276, 16:277, 17:279, 18:280, 19:282, 20:283},
-            7: {0:212, 1:231, 2:242, 3:250, 4:256, 5:261, 6:266, 7:269, 8:271, 9:273, 10:275, 11:277, 12:279, 13:281, 14:282, 15:284, 16:285, 17:287, 18:288, 19:290, 20:291},
-            8: {0:224, 1:242, 2:252, 3:259, 4:265, 5:270, 6:274, 7:277, 8:279, 9:281, 10:283, 11:285, 12:286, 13:288, 14:290, 15:291, 16:293, 17:294, 18:295, 19:297, 20:298},
-            9: {0:234, 1:251, 2:261, 3:267, 4:272, 5:277, 6:281, 7:284, 8:286, 9:288, 10:290, 11:292, 12:293, 13:295, 14:296, 15:298, 16:299, 17:301, 18:302, 19:303, 20:305},
-            10: {0:242, 1:259, 2:268, 3:274, 4:279, 5:284, 6:287, 7:290, 8:292, 9:294, 10:296, 11:298, 12:299, 13:301, 14:302, 15:304, 16:305, 17:306, 18:308, 19:309, 20:310}
-        }
+        # 入力が同一の計算結果を再利用するLRUキャッシュ
+        self._result_cache: 'OrderedDict[str, Dict[str, CalculationResult]]' = OrderedDict()
+        self._result_cache_size = cache_size
+        self._result_cache_lock = threading.Lock()
+        self._result_cache_hits = 0
+        self._result_cache_misses = 0
         
-        # むちうち症等（他覚症状なし）の場合 - 別表II
-        self.hospitalization_table_2 = {
-            k: {vk: round(vv * 0.67) for vk, vv in v.items()}
-            for k, v in self.hospitalization_table_1.items()
-        }
-        
-        # 後遺障害慰謝料（弁護士基準）
-        self.disability_compensation = {
-            1: 2800, 2: 2370, 3: 1990, 4: 1670, 5: 1400, 6: 1180, 7: 1000,
-            8: 830, 9: 690, 10: 550, 11: 420, 12: 290, 13: 180, 14: 110
-        }
-        
-        # 労働能力喪失率
-        self.disability_loss_rate = {
-            1: 100, 2: 100, 3: 100, 4: 92, 5: 79, 6: 67, 7: 56,
-            8: 45, 9: 35, 10: 27, 11: 20, 12: 14, 13: 9, 14: 5
-        }
-        
-        # ライプニッツ係数（法定利率3%）- より正確な表
-        self.leibniz_coefficients = {
-            1: 0.971, 2: 1.913, 3: 2.829, 4: 3.717, 5: 4.580,
-            6: 5.417, 7: 6.230, 8: 7.020, 9: 7.786, 10: 8.530,
-            11: 9.253, 12: 9.954, 13: 10.635, 14: 11.296, 15: 11.938,
-            16: 12.561, 17: 13.166, 18: 13.754, 19: 14.324, 20: 14.877,
-            21: 15.415, 22: 15.937, 23: 16.444, 24: 16.936, 25: 17.413,
-            26: 17.877, 27: 18.327, 28: 18.764, 29: 19.188, 30: 19.600,
-            31: 20.000, 32: 20.389, 33: 20.766, 34: 21.132, 35: 21.487,
-            36: 21.832, 37: 22.167, 38: 22.492, 39: 22.808, 40: 23.115,
-            41: 23.412, 42: 23.701, 43: 23.982, 44: 24.254, 45: 24.519,
-            46: 24.775, 47: 25.025, 48: 25.267, 49: 25.502, 50: 25.730,
-            51: 25.951, 52: 26.166, 53: 26.374, 54: 26.578, 55: 26.774,
-            56: 26.965, 57: 27.151, 58: 27.331, 59: 27.506, 60: 27.676,
-            61: 27.840, 62: 28.000, 63: 28.155, 64: 28.306, 65: 28.453,
-            66: 28.595, 67: 28.733
-        }
-        
-        # 年齢別平均余命（簡易版）
-        self.life_expectancy = {
-            0: 81.41, 1: 80.43, 5: 76.48, 10: 71.52, 15: 66.56, 
-            20: 61.63, 25: 56.72, 30: 51.84, 35: 47.00, 40: 42.21,
-            45: 37.48, 50: 32.84, 55: 28.31, 60: 23.91, 65: 19.70,
-            70: 15.71, 75: 12.05, 80: 8.78, 85: 6.04, 90: 3.95
-        }
+        self.init_standards(edition)
+    
+    def init_standards(self, edition: Optional[str] = None):
+        """法的基準データの初期化
+
+        基準表はプロセス内で共有される不変の StandardsPack から参照する。
+        edition を指定した場合はその版に固定し、省略時は事故日から版を選択する。
+        """
+        registry = get_standards_registry()
+        self._pinned_edition = edition
+        self.standards = registry.get(edition) if edition else registry.latest()
         
-        # 家事従事者の年収基準
-        self.housework_annual_income = {
-            "全年齢平均": 3936000,  # 2023年基準
-            "30代": 4200000,
-            "40代": 4500000,
-            "50代": 4300000,
-            "60代": 3800000
-        }
+        # 既存コードとの互換のため辞書形式の読み取り専用ビューも公開
+        self.hospitalization_table_1 = self.standards.hospitalization_table_1_map
+        self.hospitalization_table_2 = self.standards.hospitalization_table_2_map
+        self.disability_compensation = self.standards.disability_compensation_map
+        self.disability_loss_rate = self.standards.disability_loss_rate_map
+        self.leibniz_coefficients = self.standards.leibniz_coefficients_map
+        self.life_expectancy = self.standards.life_expectancy_map
+        self.housework_annual_income = self.standards.housework_annual_income
+
+    @staticmethod
+    def input_snapshot(case_data: CaseData) -> Dict[str, Any]:
+        """計算に影響する入力項目の値（"区分.項目名" をキーとする）"""
+        snapshot = {}
+        for name in CALCULATION_INPUT_FIELDS:
+            section, field_name = name.split('.')
+            snapshot[name] = getattr(getattr(case_data, section), field_name, None)
+        return snapshot
+    
+    @staticmethod
+    def changed_input_fields(before: Mapping[str, Any], after: Mapping[str, Any]) -> set:
+        """2つの入力スナップショット間で値（表記を含む）が変わった項目"""
+        return {name for name in CALCULATION_INPUT_FIELDS if repr(before.get(name)) != repr(after.get(name))}
+    
+    @staticmethod
+    def affected_items(changed_fields: Iterable[str]) -> set:
+        """変更された入力項目から再計算が必要な損害項目を求める
+
+        項目名は "medical_info.medical_expenses" 形式、または項目名のみでも指定できる。
+        計算に影響しない項目（氏名など）のみの変更では空集合を返す。
+        """
+        affected = set()
+        for name in changed_fields:
+            for qualified in _qualify_input_field(name):
+                affected.update(item for item, deps in ITEM_DEPENDENCIES.items() if qualified in deps)
+        return affected
+    
+    def _result_cache_key(self, case_data: CaseData, standards: StandardsPack) -> str:
+        """計算に影響する入力項目と基準の版から正規化したキャッシュキーを生成"""
+        parts = [standards.version]
+        parts.extend(f"{name}={value!r}" for name, value in self.input_snapshot(case_data).items())
+        return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _copy_results(results: Dict[str, 'CalculationResult']) -> Dict[str, 'CalculationResult']:
+        """呼び出し元による変更がキャッシュに波及しないよう結果を複製"""
+        return {key: copy.copy(result) for key, result in results.items()}
+    
+    def _get_cached_results(self, cache_key: str) -> Optional[Dict[str, 'CalculationResult']]:
+        """キャッシュから計算結果を取得（ヒット・ミスを記録）"""
+        if self._result_cache_size <= 0:
+            return None
+        with self._result_cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                self._result_cache_hits += 1
+            else:
+                self._result_cache_misses += 1
+        self.performance_monitor.record_cache_access(RESULT_CACHE_NAME, cached is not None)
+        return self._copy_results(cached) if cached is not None else None
+    
+    def _store_cached_results(self, cache_key: str, results: Dict[str, 'CalculationResult']):
+        """計算結果をキャッシュに格納（上限を超えた分は古いものから破棄）"""
+        if self._result_cache_size <= 0:
+            return
+        with self._result_cache_lock:
+            self._result_cache[cache_key] = self._copy_results(results)
+            self._result_cache.move_to_end(cache_key)
+            while len(self._result_cache) > self._result_cache_size:
+                self._result_cache.popitem(last=False)
+    
+    def clear_result_cache(self):
+        """計算結果キャッシュを破棄"""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+    
+    def get_result_cache_info(self) -> Dict[str, int]:
+        """計算結果キャッシュの統計"""
+        with self._result_cache_lock:
+            return {
+                'hits': self._result_cache_hits,
+                'misses': self._result_cache_misses,
+                'size': len(self._result_cache),
+                'max_size': self._result_cache_size,
+            }
+
+    def standards_for(self, case_data: Optional[CaseData]) -> StandardsPack:
+        """案件に適用する基準パック（版の固定がなければ事故日から選択）"""
+        if self._pinned_edition or case_data is None:
+            return self.standards
+        return get_standards_registry().for_date(case_data.accident_info.accident_date)
 
-    def get_leibniz_coefficient(self, period: int) -> Optional[Decimal]:
+    def get_leibniz_coefficient(self, period: int, standards: Optional[StandardsPack] = None) -> Optional[Decimal]:
         """指定された期間のライプニッツ係数を取得します。"""
-        if period <= 0:
-            return Decimal('0')
-        if period in self.leibniz_coefficients:
-            return Decimal(str(self.leibniz_coefficients[period]))
-        else:
-            # 辞書にない場合は近似計算 (3%の利率を想定)
-            # (1 - (1 + 利率)^(-期間)) / 利率
-            try:
-                rate = Decimal('0.03')
-                leibniz = (Decimal('1') - (Decimal('1') + rate) ** -period) / rate
-                # 小数点以下3桁で四捨五入（一般的なライプニッツ係数の表示に合わせる）
-                return leibniz.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
-            except Exception as e:
-                calc_err = CalculationError(
-                    message=f"ライプニッツ係数の近似計算エラー (期間: {period}): {e}",
-                    user_message="ライプニッツ係数の計算中にエラーが発生しました。入力期間を確認してください。",
-                    severity=ErrorSeverity.MEDIUM,
-                    context={"period": period, "original_error": str(e)}
-                )
-                self._error_handler.handle_exception(e, context=calc_err.context)
-                # Noneを返すか、エラーを再送するかは設計次第。ここではNoneを返す。
-                return None
+        try:
+            return (standards or self.standards).leibniz_coefficient(period)
+        except Exception as e:
+            calc_err = CalculationError(
+                message=f"ライプニッツ係数の近似計算エラー (期間: {period}): {e}",
+                user_message="ライプニッツ係数の計算中にエラーが発生しました。入力期間を確認してください。",
+                severity=ErrorSeverity.MEDIUM,
+                context={"period": period, "original_error": str(e)}
+            )
+            self._error_handler.handle_exception(e, context=calc_err.context)
+            # Noneを返すか、エラーを再送するかは設計次第。ここではNoneを返す。
+            return None
 
-    def calculate_hospitalization_compensation(self, medical_info: MedicalInfo) -> CalculationResult:
+    def calculate_hospitalization_compensation(self, medical_info: MedicalInfo, standards: Optional[StandardsPack] = None) -> CalculationResult:
         """入通院慰謝料の計算"""
+        standards = standards or self.standards
         try:
             hospital_months = min(medical_info.hospital_months, 10)  # 表の上限
             outpatient_months = min(medical_info.outpatient_months, 20)  # 表の上限
             
             # 使用する表を決定
-            table = self.hospitalization_table_2 if medical_info.is_whiplash else self.hospitalization_table_1
+            table = standards.hospitalization_table_2_map if medical_info.is_whiplash else standards.hospitalization_table_1_map
             
             # 基本慰謝料の取得
             if hospital_months in table and outpatient_months in table[hospital_months]:
@@ -166,19 +412,20 @@ class CompensationEngine:
             amount = Decimal(str(base_amount * 10000))  # 万円を円に変換
             
             table_type = "別表II（むちうち症等）" if medical_info.is_whiplash else "別表I"
-            details = f"""
-入院期間: {medical_info.hospital_months}ヶ月
-通院期間: {medical_info.outpatient_months}ヶ月
-実通院日数: {medical_info.actual_outpatient_days}日
-適用表: 赤い本{table_type}
-基準額: {base_amount}万円
-"""
+            details = CalculationDetails(
+                HOSPITALIZATION_DETAILS,
+                hospital_months=medical_info.hospital_months,
+                outpatient_months=medical_info.outpatient_months,
+                actual_outpatient_days=medical_info.actual_outpatient_days,
+                table_type=table_type,
+                base_amount=base_amount,
+            )
             
             return CalculationResult(
                 item_name="入通院慰謝料",
                 amount=amount,
-                calculation_details=details.strip(),
-                legal_basis="民法第709条、赤い本2023年版",
+                calculation_details=details,
+                legal_basis=f"民法第709条、{standards.edition_name}",
                 notes="実通院日数が少ない場合は減額調整を行っています"
             )
             
@@ -213,8 +460,9 @@ class CompensationEngine:
                 notes="計算できませんでした"
             )
     
-    def calculate_disability_compensation(self, medical_info: MedicalInfo) -> CalculationResult:
+    def calculate_disability_compensation(self, medical_info: MedicalInfo, standards: Optional[StandardsPack] = None) -> CalculationResult:
         """後遺障害慰謝料の計算"""
+        standards = standards or self.standards
         try:
             if medical_info.disability_grade == 0:
                 return CalculationResult(
@@ -226,20 +474,17 @@ class CompensationEngine:
                 )
             
             grade = medical_info.disability_grade
-            if grade in self.disability_compensation:
-                base_amount = self.disability_compensation[grade]
+            if grade in standards.disability_compensation_map:
+                base_amount = standards.disability_compensation_map[grade]
                 amount = Decimal(str(base_amount * 10000))  # 万円を円に変換
                 
-                details = f"""
-後遺障害等級: 第{grade}級
-弁護士基準慰謝料: {base_amount}万円
-"""
+                details = CalculationDetails(DISABILITY_DETAILS, grade=grade, base_amount=base_amount)
                 
                 return CalculationResult(
                     item_name="後遺障害慰謝料",
                     amount=amount,
-                    calculation_details=details.strip(),
-                    legal_basis="民法第709条、赤い本2023年版",
+                    calculation_details=details,
+                    legal_basis=f"民法第709条、{standards.edition_name}",
                     notes=medical_info.disability_details
                 )
             else:
@@ -298,16 +543,12 @@ class CompensationEngine:
             lost_days = income_info.lost_work_days
             amount = daily_income * lost_days
             
-            details = f"""
-休業日数: {lost_days}日
-日額基礎収入: {daily_income:,}円
-計算式: {daily_income:,}円 × {lost_days}日
-"""
+            details = CalculationDetails(LOST_INCOME_DETAILS, lost_days=lost_days, daily_income=daily_income)
             
             return CalculationResult(
                 item_name="休業損害",
                 amount=amount,
-                calculation_details=details.strip(),
+                calculation_details=details,
                 legal_basis="民法第709条",
                 notes="事故前3ヶ月の実収入を基に算定"
             )
@@ -343,8 +584,9 @@ class CompensationEngine:
                 notes="計算できませんでした"
             )
     
-    def calculate_future_income_loss(self, person_info: PersonInfo, medical_info: MedicalInfo, income_info: IncomeInfo) -> CalculationResult:
+    def calculate_future_income_loss(self, person_info: PersonInfo, medical_info: MedicalInfo, income_info: IncomeInfo, standards: Optional[StandardsPack] = None) -> CalculationResult:
         """後遺障害逸失利益の計算"""
+        standards = standards or self.standards
         try:
             if medical_info.disability_grade == 0 or income_info.loss_period_years == 0:
                 return CalculationResult(
@@ -357,14 +599,14 @@ class CompensationEngine:
             
             # 基礎収入の決定
             if person_info.occupation == "家事従事者":
-                base_income = Decimal(str(self.housework_annual_income["全年齢平均"]))
+                base_income = Decimal(str(standards.housework_annual_income["全年齢平均"]))
             else:
                 # UI・モデル・エンジン間で basic_annual_income に統一
                 base_income = income_info.basic_annual_income or person_info.annual_income
             
             # 労働能力喪失率
             grade = medical_info.disability_grade
-            if grade not in self.disability_loss_rate:
+            if grade not in standards.disability_loss_rate_map:
                 return CalculationResult(
                     item_name="後遺障害逸失利益",
                     amount=Decimal('0'),
@@ -372,10 +614,10 @@ class CompensationEngine:
                     legal_basis="",
                     notes=""
                 )
-            loss_rate = Decimal(str(self.disability_loss_rate[grade])) / 100
+            loss_rate = Decimal(str(standards.disability_loss_rate_map[grade])) / 100
             loss_period = income_info.loss_period_years
             # ライプニッツ係数
-            leibniz = self.get_leibniz_coefficient(loss_period) # 修正: メソッド呼び出しに変更
+            leibniz = self.get_leibniz_coefficient(loss_period, standards) # 修正: メソッド呼び出しに変更
             if leibniz is None: # get_leibniz_coefficient が None を返す可能性に対処
                 raise CalculationError("ライプニッツ係数の取得に失敗しました。", user_message="計算に必要な係数を取得できませんでした。")
 
@@ -383,12 +625,15 @@ class CompensationEngine:
             amount = base_income * loss_rate * leibniz
             amount = amount.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
             
-            # 計算詳細の説明を修正 (f-string を使用)
-            details = f"""基礎収入: {base_income:,.0f}円/年
-労働能力喪失率: {loss_rate*100:.0f}%（第{grade}級）
-労働能力喪失期間: {loss_period}年
-ライプニッツ係数: {leibniz}
-計算式: {base_income:,.0f}円 × {loss_rate*100:.0f}% × {leibniz} = {amount:,.0f}円"""
+            details = CalculationDetails(
+                FUTURE_INCOME_LOSS_DETAILS,
+                base_income=base_income,
+                loss_percent=loss_rate * 100,
+                grade=grade,
+                loss_period=loss_period,
+                leibniz=leibniz,
+                amount=amount,
+            )
             
             notes = ""
             if person_info.occupation == "家事従事者":
@@ -396,7 +641,7 @@ class CompensationEngine:
             return CalculationResult(
                 item_name="後遺障害逸失利益",
                 amount=amount,
-                calculation_details=details.strip(),
+                calculation_details=details,
                 legal_basis="民法第709条、最高裁判例",
                 notes=notes
             )
@@ -473,14 +718,17 @@ class CompensationEngine:
                            Decimal(str(medical_info.transportation_costs)) + \
                            Decimal(str(medical_info.nursing_costs))
             
-            details = f"""治療費: {medical_info.medical_expenses:,.0f}円
-交通費: {medical_info.transportation_costs:,.0f}円
-看護費: {medical_info.nursing_costs:,.0f}円"""
+            details = CalculationDetails(
+                MEDICAL_EXPENSES_DETAILS,
+                medical_expenses=medical_info.medical_expenses,
+                transportation_costs=medical_info.transportation_costs,
+                nursing_costs=medical_info.nursing_costs,
+            )
             
             return CalculationResult(
                 item_name="治療費・医療関係費",
                 amount=total_amount,
-                calculation_details=details.strip(),
+                calculation_details=details,
                 legal_basis="民法第709条",
                 notes="実際に支出した費用"
             )
@@ -516,18 +764,63 @@ class CompensationEngine:
                 notes="計算できませんでした"
             )
     
+    def calculate_item(self, item: str, case_data: CaseData, standards: Optional[StandardsPack] = None) -> CalculationResult:
+        """損害項目を1つ計算（item は ITEM_DEPENDENCIES のキー）"""
+        standards = standards or self.standards_for(case_data)
+        if item == 'hospitalization':
+            return self.calculate_hospitalization_compensation(case_data.medical_info, standards)
+        if item == 'disability':
+            return self.calculate_disability_compensation(case_data.medical_info, standards)
+        if item == 'lost_income':
+            return self.calculate_lost_income(case_data.income_info)
+        if item == 'future_income_loss':
+            return self.calculate_future_income_loss(
+                case_data.person_info, case_data.medical_info, case_data.income_info, standards
+            )
+        if item == 'medical_expenses':
+            return self.calculate_medical_expenses(case_data.medical_info)
+        raise CalculationError(f"未知の損害項目です: {item}", user_message="計算対象の損害項目が正しくありません。")
+
     def calculate_all(self, case_data: CaseData) -> Dict[str, CalculationResult]:
-        """全損害項目の計算"""
+        """全損害項目の計算
+
+        計算に影響する入力と基準の版が同一であれば、キャッシュ済みの結果（の複製）を返す。
+        """
+        return self._calculate(case_data)
+
+    def recalculate(self, case_data: CaseData, changed_fields: Iterable[str],
+                    previous_results: Optional[Mapping[str, CalculationResult]] = None) -> Dict[str, CalculationResult]:
+        """変更された入力項目に依存する損害項目のみを再計算し、総合計を再集計
+
+        previous_results は同じ案件の直前の計算結果（calculate_all / recalculate の戻り値）。
+        前回結果がない・不完全な場合は全項目を計算する。
+        """
+        affected = self.affected_items(changed_fields)
+        if not previous_results or not all(
+                isinstance(previous_results.get(item), CalculationResult) for item in ITEM_DEPENDENCIES):
+            return self._calculate(case_data)
+        return self._calculate(case_data, previous_results, affected)
+
+    def _calculate(self, case_data: CaseData,
+                   previous_results: Optional[Mapping[str, CalculationResult]] = None,
+                   affected_items: Optional[set] = None) -> Dict[str, CalculationResult]:
+        """全項目計算・差分再計算の共通処理（affected_items 以外は前回結果を再利用）"""
         results = {}
         try:
-            # 各項目の計算
-            results['hospitalization'] = self.calculate_hospitalization_compensation(case_data.medical_info)
-            results['disability'] = self.calculate_disability_compensation(case_data.medical_info)
-            results['lost_income'] = self.calculate_lost_income(case_data.income_info)
-            results['future_income_loss'] = self.calculate_future_income_loss(
-                case_data.person_info, case_data.medical_info, case_data.income_info
-            )
-            results['medical_expenses'] = self.calculate_medical_expenses(case_data.medical_info)
+            # 事故日に応じた基準パックを選択
+            standards = self.standards_for(case_data)
+            
+            cache_key = self._result_cache_key(case_data, standards)
+            cached = self._get_cached_results(cache_key)
+            if cached is not None:
+                return cached
+            
+            # 各項目の計算（依存する入力が変わっていない項目は前回結果を複製して再利用）
+            for item in ITEM_DEPENDENCIES:
+                if previous_results is not None and item not in affected_items:
+                    results[item] = copy.copy(previous_results[item])
+                else:
+                    results[item] = self.calculate_item(item, case_data, standards)
             
             # 合計額の計算
             total_before_deduction = sum(result.amount for result in results.values() if result and isinstance(result.amount, Decimal))
@@ -550,16 +843,18 @@ class CompensationEngine:
             results['summary'] = CalculationResult(
                 item_name="総合計",
                 amount=final_amount,
-                calculation_details=f"""
-損害合計（過失相殺前）: {total_before_deduction:,}円
-被害者過失割合: {case_data.person_info.fault_percentage}%
-損害合計（過失相殺後）: {total_after_fault:,}円
-弁護士費用（概算）: {lawyer_fee:,}円
-最終支払見込額: {final_amount:,}円
-""".strip(),
+                calculation_details=CalculationDetails(
+                    SUMMARY_DETAILS,
+                    total_before_deduction=total_before_deduction,
+                    fault_percentage=case_data.person_info.fault_percentage,
+                    total_after_fault=total_after_fault,
+                    lawyer_fee=lawyer_fee,
+                    final_amount=final_amount,
+                ),
                 legal_basis="民法第709条、第722条",
                 notes="弁護士費用は概算です。実際の費用は事務所の基準により異なります"
             )
+            self._store_cached_results(cache_key, results)
             return results
 
         except CalculationError as e: # 既に処理済みの CalculationError
@@ -592,20 +887,165 @@ class CompensationEngine:
                 )
             }
 
+    def calculate_amounts(self, case_data: CaseData) -> Dict[str, Any]:
+        """全損害項目と総合計の金額のみを取得（詳細不要のAPI・一括処理向け）
+
+        通常は整数演算（円単位）で計算し int を返す。金額入力に1円未満の端数があるなど
+        整数で正確に表せない場合は calculate_all の Decimal の金額を返す。
+        いずれの場合も calculate_all の金額と一致する。
+        """
+        try:
+            amounts = calculate_fixed_point_amounts(case_data, self.standards_for(case_data))
+            return {item: amounts[item] for item in AMOUNT_ITEMS + ('summary',)}
+        except NotFixedPointRepresentable as e:
+            self.logger.debug(f"整数演算で表せない入力のため Decimal で計算します: {e}")
+            results = self.calculate_all(case_data)
+            return {item: results[item].amount for item in AMOUNT_ITEMS + ('summary',) if item in results}
+
+    def calculate_batch(self, columns: Mapping[str, Any], standards: Optional[StandardsPack] = None) -> Dict[str, np.ndarray]:
+        """列指向配列による一括計算（ポートフォリオ再評価用）
+
+        columns には BATCH_COLUMNS の列名をキーとして配列またはスカラーを渡す。
+        省略した列はデフォルト値で補完され、全列はブロードキャストされる。
+        金額はすべて整数（円）で計算し、calculate_all と同一の金額を返す。
+        戻り値は calculate_all と同じキーの各損害項目列に加え、
+        total_before_deduction / total_after_fault / lawyer_fee の各列を含む。
+        standards を省略した場合は、calculate_all と同じく行ごとに事故日から版を選択する
+        （版固定時はその版）。standards を指定した場合は全行にその版を用いる。
+        """
+        unknown = set(columns) - set(BATCH_COLUMNS)
+        if unknown:
+            raise CalculationError(
+                f"calculate_batch に未知の列が指定されました: {sorted(unknown)}",
+                user_message="一括計算の入力列が正しくありません。"
+            )
+        arrays = np.broadcast_arrays(*(
+            np.asarray(columns.get(name, default)) for name, default in BATCH_COLUMNS.items()
+        ))
+        col = {name: array.astype(_batch_dtype(name)) for name, array in zip(BATCH_COLUMNS, arrays)}
+        accident_date = col.pop('accident_date')
+        if standards is not None or self._pinned_edition:
+            return self._calculate_batch_rows(col, standards or self.standards)
+
+        groups = get_standards_registry().group_by_date(accident_date)
+        if len(groups) == 1:
+            return self._calculate_batch_rows(col, groups[0][0])
+        # 版ごとに該当行のみを計算し、元の位置に戻す
+        results: Dict[str, np.ndarray] = {}
+        for pack, mask in groups:
+            part = self._calculate_batch_rows({name: array[mask] for name, array in col.items()}, pack)
+            for item, values in part.items():
+                if item not in results:
+                    results[item] = np.zeros(accident_date.shape, dtype=values.dtype)
+                results[item][mask] = values
+        return results
+
+    def _calculate_batch_rows(self, col: Dict[str, np.ndarray], standards: StandardsPack) -> Dict[str, np.ndarray]:
+        """一括計算の本体（全行に同じ基準パックを用いる）"""
+        tables = self._batch_tables(standards)
+
+        # 入通院慰謝料（calculate_hospitalization_compensation と同一の判定・丸め）
+        hospital = np.minimum(col['hospital_months'], 10)
+        outpatient = np.minimum(col['outpatient_months'], 20)
+        # 表の範囲外（負の期間）は表の最大値を使用
+        cell = np.where(
+            (hospital >= 0) & (outpatient >= 0),
+            np.clip(hospital, 0, 10) * 21 + np.clip(outpatient, 0, 20),
+            10 * 21 + 20
+        )
+        base = np.where(
+            col['is_whiplash'],
+            tables['hospitalization_2'].ravel()[cell],
+            tables['hospitalization_1'].ravel()[cell]
+        )
+        actual_days = col['actual_outpatient_days']
+        threshold = outpatient * 15 * 0.6
+        adjust = (outpatient > 0) & (actual_days > 0) & (actual_days < threshold)
+        ratio = np.minimum(1.0, np.divide(actual_days, threshold, out=np.ones(threshold.shape), where=adjust))
+        base = np.where(adjust, np.trunc(base * ratio).astype(np.int64), base)
+        hospitalization = base * 10000
+
+        # 後遺障害慰謝料
+        grade = col['disability_grade']
+        valid_grade = (grade >= 1) & (grade <= 14)
+        grade_index = np.where(valid_grade, grade, 0)
+        disability = np.where(valid_grade, tables['disability_compensation'][grade_index], 0)
+
+        # 休業損害
+        lost_income = col['daily_income'] * col['lost_work_days']
+
+        # 後遺障害逸失利益
+        period = col['loss_period_years']
+        base_income = np.where(
+            col['is_housework'],
+            tables['housework_income'],
+            np.where(col['basic_annual_income'] != 0, col['basic_annual_income'], col['annual_income'])
+        )
+        leibniz_milli = standards.leibniz_milli_array(period)
+        future_income_loss = np.where(
+            valid_grade & (period != 0),
+            _round_half_up_div(base_income * tables['disability_loss_rate'][grade_index] * leibniz_milli, 100 * 1000),
+            0
+        )
+
+        # 治療費・医療関係費
+        medical_expenses = col['medical_expenses'] + col['transportation_costs'] + col['nursing_costs']
+
+        # 過失相殺（千分率）と弁護士費用
+        total_before = hospitalization + disability + lost_income + future_income_loss + medical_expenses
+        fault = col['fault_percentage']
+        fault_permille = np.rint(fault * 10).astype(np.int64)
+        total_after = _round_half_up_div(total_before * (1000 - fault_permille), 1000)
+        # 小数第2位以下を含む過失割合は calculate_all と同じ解釈の分数で行ごとに丸める
+        fault_values, fault_index = np.unique(fault, return_inverse=True)
+        for position, value in enumerate(fault_values):
+            numerator, denominator = ratio_fraction(float(value))
+            if denominator > 1000:
+                rows = np.flatnonzero(fault_index.reshape(fault.shape) == position)
+                flat_before, flat_after = total_before.reshape(-1), total_after.reshape(-1)
+                for row in rows:
+                    flat_after[row] = round_half_up_div(int(flat_before[row]) * (denominator - numerator), denominator)
+        lawyer_fee = np.zeros_like(total_after)
+        remaining = np.ones(total_after.shape, dtype=bool)
+        for upper, rate_permille, min_fee in LAWYER_FEE_TIERS:
+            tier = remaining if upper is None else remaining & (total_after <= upper)
+            fee = np.maximum(_round_half_up_div(total_after * rate_permille, 1000), min_fee)
+            lawyer_fee = np.where(tier, fee, lawyer_fee)
+            remaining &= ~tier
+
+        return {
+            'hospitalization': hospitalization,
+            'disability': disability,
+            'lost_income': lost_income,
+            'future_income_loss': future_income_loss,
+            'medical_expenses': medical_expenses,
+            'total_before_deduction': total_before,
+            'total_after_fault': total_after,
+            'lawyer_fee': lawyer_fee,
+            'summary': total_after + lawyer_fee,
+        }
+
+    def _batch_tables(self, standards: StandardsPack) -> Dict[str, Any]:
+        """一括計算用の基準表（パックの密な配列を円単位で参照）"""
+        return {
+            'hospitalization_1': standards.hospitalization_table_1,
+            'hospitalization_2': standards.hospitalization_table_2,
+            'disability_compensation': standards.disability_compensation * 10000,
+            'disability_loss_rate': standards.disability_loss_rate,
+            'housework_income': int(standards.housework_annual_income["全年齢平均"]),
+        }
+
     def _estimate_lawyer_fee(self, economic_benefit: Decimal) -> Decimal:
         """弁護士費用の概算（旧報酬基準参考）"""
         try:
             # 簡易的な計算（着手金+報酬金の概算）
-            if economic_benefit <= 3000000:
-                fee_rate = Decimal('0.24')  # 8% + 16%
-                min_fee = Decimal('200000')
-            elif economic_benefit <= 30000000:
-                fee_rate = Decimal('0.15')  # 5% + 10%
-                min_fee = Decimal('270000')  # 90,000 + 180,000
-            else:
-                fee_rate = Decimal('0.09')  # 3% + 6%
-                min_fee = Decimal('2070000')  # 690,000 + 1,380,000
-            
+            # 300万円以下: 8% + 16%、3000万円以下: 5% + 10%、超過: 3% + 6%
+            for upper, rate_permille, min_fee in LAWYER_FEE_TIERS:
+                if upper is None or economic_benefit <= upper:
+                    fee_rate = Decimal(rate_permille) / 1000
+                    min_fee = Decimal(min_fee)
+                    break
+
             estimated_fee = economic_benefit * fee_rate
             return max(estimated_fee, min_fee).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
             
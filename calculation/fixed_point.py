@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+固定小数点（整数）による金額計算
+
+金額は円単位の整数、率は百分率・千分率の整数で扱い、Decimal を経由せずに
+calculate_all と同一の金額（ROUND_HALF_UP）を求める。詳細文字列を必要としない
+一括処理やAPI経由の金額取得に用いる。
+
+金額入力に1円未満の端数がある、または数値でない場合は Decimal による
+従来の計算結果を返すため、常に calculate_all と一致する。
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+from models import CaseData
+from calculation.standards import StandardsPack
+
+# 弁護士費用概算の段階（上限額, 料率‰, 最低額）
+LAWYER_FEE_TIERS = (
+    (3000000, 240, 200000),
+    (30000000, 150, 270000),
+    (None, 90, 2070000),
+)
+
+AMOUNT_ITEMS = ('hospitalization', 'disability', 'lost_income', 'future_income_loss', 'medical_expenses')
+
+
+class NotFixedPointRepresentable(ValueError):
+    """入力が整数演算で正確に表せない（Decimal の計算に委ねる）"""
+
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    """整数の除算を ROUND_HALF_UP（0から遠い方向へ）で丸める（denominator > 0）"""
+    magnitude = (abs(numerator) * 2 + denominator) // (2 * denominator)
+    return -magnitude if numerator < 0 else magnitude
+
+
+def whole_yen(value: Any) -> int:
+    """金額入力を円単位の整数に変換（端数があれば NotFixedPointRepresentable）"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        raise NotFixedPointRepresentable(f"金額が数値ではありません: {value!r}")
+    if isinstance(value, int):
+        return value
+    decimal_value = Decimal(str(value))
+    if not decimal_value.is_finite() or decimal_value != decimal_value.to_integral_value():
+        raise NotFixedPointRepresentable(f"1円未満の端数があります: {value!r}")
+    return int(decimal_value)
+
+
+def ratio_fraction(percentage: Any) -> Tuple[int, int]:
+    """百分率（Decimal(str(x)) と同じ解釈）を 分子/分母 の整数組に変換"""
+    if isinstance(percentage, bool) or not isinstance(percentage, (int, float, Decimal)):
+        raise NotFixedPointRepresentable(f"割合が数値ではありません: {percentage!r}")
+    sign, digits, exponent = Decimal(str(percentage)).as_tuple()
+    if not isinstance(exponent, int):
+        raise NotFixedPointRepresentable(f"割合が有限の数値ではありません: {percentage!r}")
+    numerator = int(''.join(map(str, digits))) * (-1 if sign else 1)
+    denominator = 100
+    if exponent >= 0:
+        numerator *= 10 ** exponent
+    else:
+        denominator *= 10 ** -exponent
+    return numerator, denominator
+
+
+def hospitalization_yen(hospital_months: int, outpatient_months: int, actual_outpatient_days: int,
+                        is_whiplash: bool, standards: StandardsPack) -> int:
+    """入通院慰謝料（円）"""
+    hospital = min(hospital_months, 10)
+    outpatient = min(outpatient_months, 20)
+    table = standards.hospitalization_table_2 if is_whiplash else standards.hospitalization_table_1
+    if hospital >= 0 and outpatient >= 0:
+        base = int(table[hospital, outpatient])
+    else:
+        # 表の範囲外は表の最大値を使用
+        base = int(table[-1, -1])
+    # 実通院日数による調整（従来の計算と同じ浮動小数点の判定・切り捨て）
+    if outpatient > 0 and actual_outpatient_days > 0:
+        threshold = outpatient * 15 * 0.6
+        if actual_outpatient_days < threshold:
+            base = int(base * min(1.0, actual_outpatient_days / threshold))
+    return base * 10000
+
+
+def disability_yen(grade: int, standards: StandardsPack) -> int:
+    """後遺障害慰謝料（円）"""
+    if 1 <= grade <= 14:
+        return int(standards.disability_compensation[grade]) * 10000
+    return 0
+
+
+def future_income_loss_yen(base_income: int, grade: int, loss_period: int, standards: StandardsPack) -> int:
+    """後遺障害逸失利益（円）= 基礎収入 × 喪失率% × ライプニッツ係数（千分の一単位）"""
+    if not 1 <= grade <= 14 or loss_period == 0:
+        return 0
+    leibniz_milli = int(standards.leibniz_coefficient(loss_period).scaleb(3))
+    return round_half_up_div(base_income * int(standards.disability_loss_rate[grade]) * leibniz_milli, 100 * 1000)
+
+
+def lawyer_fee_yen(economic_benefit: int) -> int:
+    """弁護士費用の概算（円）"""
+    for upper, rate_permille, min_fee in LAWYER_FEE_TIERS:
+        if upper is None or economic_benefit <= upper:
+            return max(round_half_up_div(economic_benefit * rate_permille, 1000), min_fee)
+    raise AssertionError("unreachable")
+
+
+def calculate_amounts(case_data: CaseData, standards: StandardsPack) -> Dict[str, int]:
+    """全損害項目の金額（円）を整数演算で計算
+
+    戻り値のキーは calculate_all と同じ損害項目に total_before_deduction /
+    total_after_fault / lawyer_fee / summary を加えたもの。
+    整数で正確に表せない入力は NotFixedPointRepresentable を送出する。
+    """
+    person, medical, income = case_data.person_info, case_data.medical_info, case_data.income_info
+    try:
+        grade = int(medical.disability_grade or 0)
+        loss_period = int(income.loss_period_years)
+        amounts = {
+            'hospitalization': hospitalization_yen(
+                int(medical.hospital_months), int(medical.outpatient_months),
+                int(medical.actual_outpatient_days), bool(medical.is_whiplash), standards),
+            'disability': disability_yen(grade, standards),
+            'lost_income': whole_yen(income.daily_income) * int(income.lost_work_days) if income.lost_work_days else 0,
+        }
+        if person.occupation == "家事従事者":
+            base_income = int(standards.housework_annual_income["全年齢平均"])
+        else:
+            base_income = whole_yen(income.basic_annual_income) or whole_yen(person.annual_income)
+        amounts['future_income_loss'] = future_income_loss_yen(base_income, grade, loss_period, standards)
+        amounts['medical_expenses'] = (whole_yen(medical.medical_expenses) + whole_yen(medical.transportation_costs)
+                                       + whole_yen(medical.nursing_costs))
+        fault_numerator, fault_denominator = ratio_fraction(person.fault_percentage)
+    except (TypeError, InvalidOperation, OverflowError) as e:
+        raise NotFixedPointRepresentable(str(e)) from e
+
+    total_before = sum(amounts[item] for item in AMOUNT_ITEMS)
+    total_after = round_half_up_div(total_before * (fault_denominator - fault_numerator), fault_denominator)
+    lawyer_fee = lawyer_fee_yen(total_after)
+    amounts.update({
+        'total_before_deduction': total_before,
+        'total_after_fault': total_after,
+        'lawyer_fee': lawyer_fee,
+        'summary': total_after + lawyer_fee,
+    })
+    return amounts
+
+
+def differential_check(engine, cases: Iterable[CaseData], include_batch: bool = True) -> List[Dict[str, Any]]:
+    """Decimal による calculate_all と固定小数点（および一括計算）の金額を比較
+
+    不一致の一覧（案件の添字・項目・各経路の金額）を返す。空であれば全件一致。
+    """
+    from calculation.compensation_engine import cases_to_columns
+
+    cases = list(cases)
+    batch: Optional[Dict[str, Any]] = None
+    if include_batch and cases:
+        batch = engine.calculate_batch(cases_to_columns(cases))
+
+    mismatches = []
+    for index, case_data in enumerate(cases):
+        reference = engine.calculate_all(case_data)
+        try:
+            fixed = calculate_amounts(case_data, engine.standards_for(case_data))
+        except NotFixedPointRepresentable:
+            continue
+        for item in AMOUNT_ITEMS + ('summary',):
+            expected = reference[item].amount
+            paths = {'fixed_point': fixed[item]}
+            if batch is not None:
+                paths['batch'] = int(batch[item][index])
+            for path, value in paths.items():
+                if Decimal(value) != expected:
+                    mismatches.append({'index': index, 'item': item, 'path': path,
+                                       'decimal': expected, 'actual': value})
+    return mismatches
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感度分析（What-if シミュレーション）
+
+基準となる案件から、過失割合・後遺障害等級・労働能力喪失期間・収入などを
+格子状（直積）または任意のシナリオ列で変化させ、calculate_batch で一括評価する。
+結果は損害項目ごとの多次元配列（ヒートマップにそのまま使える形）と表形式で取得できる。
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Iterable, Mapping, Tuple
+
+import numpy as np
+
+from models import CaseData
+from calculation.compensation_engine import CompensationEngine, BATCH_COLUMNS, cases_to_columns
+from utils.error_handler import CalculationError
+
+# よく使う軸の値
+FAULT_PERCENTAGE_STEPS = tuple(range(0, 101, 10))
+DISABILITY_GRADES = (0, 14, 13, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1)
+
+# 軸名の別名（収入は基礎収入の列を変化させる）
+AXIS_ALIASES = {
+    'income': 'basic_annual_income',
+}
+
+
+def resolve_column(axis: str) -> str:
+    """軸名（別名を含む）を calculate_batch の列名に変換"""
+    column = AXIS_ALIASES.get(axis, axis)
+    # 事故日は基準パックの選択に使う列で、基準案件の版で固定して評価するため軸にできない
+    if column not in BATCH_COLUMNS or column == 'accident_date':
+        raise CalculationError(
+            f"感度分析に使用できない軸です: {axis}",
+            user_message=f"「{axis}」は感度分析の対象にできません。"
+        )
+    return column
+
+
+@dataclass
+class SweepResult:
+    """感度分析の結果
+
+    axes は軸名と各軸の値、values は損害項目ごとの配列（形状は各軸の長さの組）。
+    """
+    axes: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray]
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(v) for v in self.axes.values())
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape)) if self.axes else 0
+
+    def grid(self, item: str = 'summary') -> np.ndarray:
+        """損害項目の配列（2軸であればそのままヒートマップに使用できる）"""
+        try:
+            return self.values[item]
+        except KeyError:
+            raise CalculationError(
+                f"未知の損害項目です: {item}",
+                user_message="感度分析結果に指定された項目はありません。"
+            ) from None
+
+    def range(self, item: str = 'summary') -> Tuple[int, int]:
+        """損害項目の最小値・最大値（和解レンジの確認用）"""
+        values = self.grid(item)
+        return int(values.min()), int(values.max())
+
+    def table(self, items: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """表形式（1シナリオ1行）に展開"""
+        items = list(items) if items is not None else list(self.values)
+        names = list(self.axes)
+        mesh = np.meshgrid(*self.axes.values(), indexing='ij')
+        rows = []
+        for index in np.ndindex(*self.shape):
+            row = {name: mesh[i][index].item() for i, name in enumerate(names)}
+            row.update({item: int(self.values[item][index]) for item in items})
+            rows.append(row)
+        return rows
+
+
+class SensitivityAnalyzer:
+    """CompensationEngine の一括計算による感度分析"""
+
+    def __init__(self, engine: Optional[CompensationEngine] = None):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine or CompensationEngine()
+
+    def sweep(self, case_data: CaseData, axes: Mapping[str, Iterable[Any]]) -> SweepResult:
+        """基準案件に対し、各軸の値の直積（格子）を一括評価
+
+        例: sweep(case, {'fault_percentage': range(0, 101, 10), 'disability_grade': DISABILITY_GRADES})
+        """
+        columns = {name: values[0] for name, values in cases_to_columns([case_data]).items()}
+        axis_values = {}
+        for position, (axis, values) in enumerate(axes.items()):
+            column = resolve_column(axis)
+            values = np.asarray(list(values))
+            if values.ndim != 1 or values.size == 0:
+                raise CalculationError(
+                    f"軸の値が不正です: {axis}",
+                    user_message=f"「{axis}」の値を1つ以上指定してください。"
+                )
+            axis_values[axis] = values
+            shape = [1] * len(axes)
+            shape[position] = values.size
+            columns[column] = values.reshape(shape)
+
+        results = self.engine.calculate_batch(columns, standards=self.engine.standards_for(case_data))
+        grid_shape = tuple(v.size for v in axis_values.values())
+        return SweepResult(
+            axes=axis_values,
+            values={item: np.broadcast_to(values, grid_shape) for item, values in results.items()}
+        )
+
+    def evaluate_scenarios(self, case_data: CaseData, scenarios: Iterable[Mapping[str, Any]]) -> SweepResult:
+        """基準案件に対し、任意のシナリオ（変更する列と値の組）の列を一括評価
+
+        結果の軸は 'scenario'（シナリオ番号）の1軸となる。
+        """
+        scenarios = list(scenarios)
+        columns = {name: np.repeat(values, len(scenarios))
+                   for name, values in cases_to_columns([case_data]).items()}
+        for index, scenario in enumerate(scenarios):
+            for axis, value in scenario.items():
+                columns[resolve_column(axis)][index] = value
+
+        results = self.engine.calculate_batch(columns, standards=self.engine.standards_for(case_data))
+        return SweepResult(axes={'scenario': np.arange(len(scenarios))}, values=results)
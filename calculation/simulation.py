@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+モンテカルロ法による和解額レンジの推計
+
+過失割合・後遺障害等級の認定見込み・通院日数・収入など不確実な入力を
+確率分布として与え、calculate_batch で一括評価して損害項目ごとの
+分布（期待値・パーセンタイル）を求める。乱数は seed で再現可能。
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from models import CaseData
+from calculation.compensation_engine import CompensationEngine, cases_to_columns
+from calculation.sensitivity import resolve_column
+from utils.error_handler import CalculationError
+
+DEFAULT_DRAWS = 100_000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# 1回の一括計算で評価する試行数（メモリ使用量の上限）
+SIMULATION_CHUNK_SIZE = 250_000
+
+
+@dataclass(frozen=True)
+class Uniform:
+    """一様分布 [low, high]"""
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+@dataclass(frozen=True)
+class Triangular:
+    """三角分布（最小値・最頻値・最大値の見立てから設定）"""
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.low == self.high:
+            return np.full(size, float(self.low))
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+@dataclass(frozen=True)
+class Normal:
+    """正規分布（low/high を指定した場合はその範囲に切り詰める）"""
+    mean: float
+    std: float
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        values = rng.normal(self.mean, self.std, size)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+
+@dataclass(frozen=True)
+class Discrete:
+    """離散分布（例: 後遺障害等級の認定見込み {0: 0.3, 14: 0.6, 12: 0.1}）"""
+    values: Sequence[Any]
+    probabilities: Sequence[float]
+
+    @classmethod
+    def from_mapping(cls, outcomes: Mapping[Any, float]) -> 'Discrete':
+        return cls(tuple(outcomes.keys()), tuple(outcomes.values()))
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        probabilities = np.asarray(self.probabilities, dtype=np.float64)
+        total = probabilities.sum()
+        if len(self.values) != len(probabilities) or total <= 0:
+            raise CalculationError(
+                "離散分布の値と確率の指定が不正です",
+                user_message="確率分布の設定（値と確率）を確認してください。"
+            )
+        return rng.choice(np.asarray(self.values), size=size, p=probabilities / total)
+
+
+@dataclass
+class SimulationResult:
+    """シミュレーション結果（損害項目ごとの試行値）"""
+    draws: int
+    seed: Optional[int]
+    values: Dict[str, np.ndarray] = field(repr=False)
+
+    def _item(self, item: str) -> np.ndarray:
+        try:
+            return self.values[item]
+        except KeyError:
+            raise CalculationError(
+                f"未知の損害項目です: {item}",
+                user_message="シミュレーション結果に指定された項目はありません。"
+            ) from None
+
+    def mean(self, item: str = 'summary') -> float:
+        """期待値"""
+        return float(self._item(item).mean())
+
+    def percentiles(self, item: str = 'summary',
+                    percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, int]:
+        """パーセンタイル（円未満は四捨五入）"""
+        values = np.percentile(self._item(item), percentiles)
+        return {p: int(np.rint(v)) for p, v in zip(percentiles, values)}
+
+    def probability_at_least(self, amount: float, item: str = 'summary') -> float:
+        """金額が amount 以上となる確率"""
+        return float((self._item(item) >= amount).mean())
+
+    def interval(self, coverage: float = 0.9, item: str = 'summary') -> Tuple[int, int]:
+        """中央を含む coverage の区間（和解レンジの目安）"""
+        tail = (1 - coverage) / 2 * 100
+        low, high = np.percentile(self._item(item), [tail, 100 - tail])
+        return int(np.rint(low)), int(np.rint(high))
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, Any]]:
+        """全損害項目の統計量"""
+        return {
+            item: {
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                'min': int(values.min()),
+                'max': int(values.max()),
+                'percentiles': self.percentiles(item, percentiles),
+            }
+            for item, values in self.values.items()
+        }
+
+
+class MonteCarloSimulator:
+    """CompensationEngine の一括計算によるモンテカルロシミュレーション"""
+
+    def __init__(self, engine: Optional[CompensationEngine] = None):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine or CompensationEngine()
+
+    def simulate(self, case_data: CaseData, distributions: Mapping[str, Any],
+                 draws: int = DEFAULT_DRAWS, seed: Optional[int] = None) -> SimulationResult:
+        """不確実な入力を distributions（列名 → 分布）に従って抽出し、一括評価
+
+        指定しなかった入力は case_data の値に固定する。
+        例: simulate(case, {'fault_percentage': Triangular(10, 20, 40),
+                            'disability_grade': Discrete.from_mapping({0: 0.4, 14: 0.6})}, seed=1)
+        """
+        if draws <= 0:
+            raise CalculationError(
+                f"試行回数が不正です: {draws}",
+                user_message="シミュレーションの試行回数は1以上を指定してください。"
+            )
+        columns_by_name = {resolve_column(name): dist for name, dist in distributions.items()}
+        base = {name: values[0] for name, values in cases_to_columns([case_data]).items()}
+        standards = self.engine.standards_for(case_data)
+        rng = np.random.default_rng(seed)
+
+        chunks: List[Dict[str, np.ndarray]] = []
+        for start in range(0, draws, SIMULATION_CHUNK_SIZE):
+            size = min(SIMULATION_CHUNK_SIZE, draws - start)
+            columns = dict(base)
+            for column, distribution in columns_by_name.items():
+                columns[column] = self._sample_column(column, distribution, rng, size)
+            results = self.engine.calculate_batch(columns, standards=standards)
+            chunks.append({item: np.broadcast_to(v, (size,)) for item, v in results.items()})
+
+        values = {item: np.concatenate([chunk[item] for chunk in chunks]) for item in chunks[0]}
+        return SimulationResult(draws=draws, seed=seed, values=values)
+
+    @staticmethod
+    def _sample_column(column: str, distribution: Any, rng: np.random.Generator, size: int) -> np.ndarray:
+        """分布から列の値を抽出し、列の型・範囲に合わせる"""
+        values = np.asarray(distribution.sample(rng, size))
+        if column == 'fault_percentage':
+            # 過失割合は入力画面と同じく0.1%単位
+            return np.round(np.clip(values.astype(np.float64), 0, 100), 1)
+        if column.startswith('is_'):
+            return values.astype(bool)
+        # 期間・日数・金額・等級は整数（負値は0）
+        return np.maximum(np.rint(values), 0).astype(np.int64)
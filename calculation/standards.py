@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+法的基準パック（赤い本の版ごとの基準表）
+
+各版の基準表を不変の密な整数配列として一度だけ構築し、
+プロセス内の全エンジン・全スレッドで共有する。
+コンパイル済みパック（.npy + meta.json）はメモリマップで読み込むため、
+複数の版を同時に保持してもエンジン起動時のコストは発生しない。
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Tuple, Union
+
+import numpy as np
+
+from utils.error_handler import ConfigurationError
+from calculation.coefficients import get_coefficient_service, LEIBNIZ, YEAR
+
+PACK_FORMAT_VERSION = 1
+
+# 表の次元（入院0〜10ヶ月 × 通院0〜20ヶ月、後遺障害等級1〜14級）
+HOSPITAL_MONTHS_MAX = 10
+OUTPATIENT_MONTHS_MAX = 20
+DISABILITY_GRADE_MAX = 14
+
+_ARRAY_FIELDS = (
+    'hospitalization_table_1', 'hospitalization_table_2',
+    'disability_compensation', 'disability_loss_rate',
+    'leibniz_milli', 'life_expectancy_ages', 'life_expectancy_years',
+)
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    """配列を読み取り専用にする"""
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class StandardsPack:
+    """1つの版の基準表一式（不変）
+
+    金額表は万円単位の整数、喪失率は百分率の整数、
+    ライプニッツ係数は千分の一単位の整数で保持する。
+    """
+    edition_id: str
+    edition_name: str
+    effective_from: date
+    statutory_rate: Decimal
+    hospitalization_table_1: np.ndarray    # (11, 21) 別表I
+    hospitalization_table_2: np.ndarray    # (11, 21) 別表II
+    disability_compensation: np.ndarray    # (15,) 等級別慰謝料（添字=等級）
+    disability_loss_rate: np.ndarray       # (15,) 等級別労働能力喪失率
+    leibniz_milli: np.ndarray              # (n+1,) 期間別ライプニッツ係数（添字=年数）
+    life_expectancy_ages: np.ndarray
+    life_expectancy_years: np.ndarray
+    housework_annual_income: Mapping[str, int]
+
+    @property
+    def version(self) -> str:
+        """キャッシュキー等に用いる版の識別子"""
+        return f"{self.edition_id}@{self.effective_from.isoformat()}"
+
+    # --- 既存の辞書形式APIとの互換ビュー（パックごとに一度だけ構築） ---
+
+    @cached_property
+    def hospitalization_table_1_map(self) -> Mapping[int, Mapping[int, int]]:
+        return self._table_view(self.hospitalization_table_1)
+
+    @cached_property
+    def hospitalization_table_2_map(self) -> Mapping[int, Mapping[int, int]]:
+        return self._table_view(self.hospitalization_table_2)
+
+    @cached_property
+    def disability_compensation_map(self) -> Mapping[int, int]:
+        return MappingProxyType({
+            grade: int(self.disability_compensation[grade]) for grade in range(1, DISABILITY_GRADE_MAX + 1)
+        })
+
+    @cached_property
+    def disability_loss_rate_map(self) -> Mapping[int, int]:
+        return MappingProxyType({
+            grade: int(self.disability_loss_rate[grade]) for grade in range(1, DISABILITY_GRADE_MAX + 1)
+        })
+
+    @cached_property
+    def leibniz_coefficients_map(self) -> Mapping[int, float]:
+        return MappingProxyType({
+            period: int(self.leibniz_milli[period]) / 1000 for period in range(1, len(self.leibniz_milli))
+        })
+
+    @cached_property
+    def life_expectancy_map(self) -> Mapping[int, float]:
+        return MappingProxyType({
+            int(age): float(years) for age, years in zip(self.life_expectancy_ages, self.life_expectancy_years)
+        })
+
+    @cached_property
+    def _leibniz_decimals(self) -> tuple:
+        # float表記を経由することで従来の表（0.971, 19.6, 20.0 ...）と同じ表示になる
+        return tuple(Decimal(str(int(milli) / 1000)) for milli in self.leibniz_milli)
+
+    @staticmethod
+    def _table_view(table: np.ndarray) -> Mapping[int, Mapping[int, int]]:
+        return MappingProxyType({
+            hospital: MappingProxyType({outpatient: int(table[hospital, outpatient])
+                                        for outpatient in range(table.shape[1])})
+            for hospital in range(table.shape[0])
+        })
+
+    def leibniz_coefficient(self, period: int) -> Decimal:
+        """期間（年）に対するライプニッツ係数
+
+        版の公表表を優先し、表の範囲外は法定利率による係数表から取得する。
+        """
+        if period <= 0:
+            return Decimal('0')
+        if period < len(self.leibniz_milli):
+            return self._leibniz_decimals[period]
+        return get_coefficient_service().coefficient(period, LEIBNIZ, self.statutory_rate, YEAR)
+
+    def coefficient(self, period: int, method: str = LEIBNIZ, granularity: str = YEAR) -> Decimal:
+        """法定利率による中間利息控除係数（年単位ライプニッツは公表表を優先）"""
+        if method == LEIBNIZ and granularity == YEAR:
+            return self.leibniz_coefficient(period)
+        return get_coefficient_service().coefficient(period, method, self.statutory_rate, granularity)
+
+    def leibniz_milli_array(self, periods: np.ndarray) -> np.ndarray:
+        """期間配列に対するライプニッツ係数（千分の一単位の整数配列）"""
+        periods = np.maximum(np.asarray(periods, dtype=np.int64), 0)
+        generated = get_coefficient_service().coefficients_milli(periods, LEIBNIZ, self.statutory_rate, YEAR)
+        official = len(self.leibniz_milli)
+        return np.where(
+            (periods > 0) & (periods < official),
+            np.asarray(self.leibniz_milli)[np.minimum(periods, official - 1)],
+            generated
+        )
+
+    # --- コンパイル済みパックの入出力 ---
+
+    def save(self, directory: Union[str, Path]) -> Path:
+        """パックを <directory>/<edition_id>/ に .npy + meta.json として書き出す"""
+        pack_dir = Path(directory) / self.edition_id
+        pack_dir.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAY_FIELDS:
+            np.save(pack_dir / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            'format_version': PACK_FORMAT_VERSION,
+            'edition_id': self.edition_id,
+            'edition_name': self.edition_name,
+            'effective_from': self.effective_from.isoformat(),
+            'statutory_rate': str(self.statutory_rate),
+            'housework_annual_income': dict(self.housework_annual_income),
+        }
+        with open(pack_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        return pack_dir
+
+    @classmethod
+    def load(cls, pack_dir: Union[str, Path]) -> 'StandardsPack':
+        """コンパイル済みパックをメモリマップで読み込む"""
+        pack_dir = Path(pack_dir)
+        with open(pack_dir / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != PACK_FORMAT_VERSION:
+            raise ConfigurationError(
+                f"未対応の基準パック形式です: {pack_dir} (format_version={meta.get('format_version')})",
+                user_message="基準データファイルの形式が古いか壊れています。再コンパイルしてください。"
+            )
+        arrays = {name: np.load(pack_dir / f"{name}.npy", mmap_mode='r') for name in _ARRAY_FIELDS}
+        return cls(
+            edition_id=meta['edition_id'],
+            edition_name=meta['edition_name'],
+            effective_from=date.fromisoformat(meta['effective_from']),
+            statutory_rate=Decimal(meta['statutory_rate']),
+            housework_annual_income=MappingProxyType(dict(meta['housework_annual_income'])),
+            **arrays
+        )
+
+
+def build_pack(edition_id: str, edition_name: str, effective_from: date, statutory_rate: Decimal,
+               hospitalization_table: Mapping[int, Mapping[int, int]],
+               disability_compensation: Mapping[int, int],
+               disability_loss_rate: Mapping[int, int],
+               leibniz_coefficients: Mapping[int, float],
+               life_expectancy: Mapping[int, float],
+               housework_annual_income: Mapping[str, int]) -> StandardsPack:
+    """辞書形式の基準表から不変の StandardsPack を構築"""
+    table_1 = np.array([
+        [hospitalization_table[h][o] for o in range(OUTPATIENT_MONTHS_MAX + 1)]
+        for h in range(HOSPITAL_MONTHS_MAX + 1)
+    ], dtype=np.int64)
+    # むちうち症等（他覚症状なし）の場合 - 別表II は別表Iの67%（従来どおり round で丸める）
+    table_2 = np.array([[round(int(v) * 0.67) for v in row] for row in table_1], dtype=np.int64)
+
+    compensation = np.zeros(DISABILITY_GRADE_MAX + 1, dtype=np.int64)
+    loss_rate = np.zeros(DISABILITY_GRADE_MAX + 1, dtype=np.int64)
+    for grade in range(1, DISABILITY_GRADE_MAX + 1):
+        compensation[grade] = disability_compensation[grade]
+        loss_rate[grade] = disability_loss_rate[grade]
+
+    max_period = max(leibniz_coefficients)
+    leibniz = np.zeros(max_period + 1, dtype=np.int64)
+    for period, coefficient in leibniz_coefficients.items():
+        leibniz[int(period)] = int(Decimal(str(coefficient)).scaleb(3).to_integral_value(rounding=ROUND_HALF_UP))
+
+    ages = sorted(life_expectancy)
+    return StandardsPack(
+        edition_id=edition_id,
+        edition_name=edition_name,
+        effective_from=effective_from,
+        statutory_rate=statutory_rate,
+        hospitalization_table_1=_freeze(table_1),
+        hospitalization_table_2=_freeze(table_2),
+        disability_compensation=_freeze(compensation),
+        disability_loss_rate=_freeze(loss_rate),
+        leibniz_milli=_freeze(leibniz),
+        life_expectancy_ages=_freeze(np.array(ages, dtype=np.int64)),
+        life_expectancy_years=_freeze(np.array([life_expectancy[a] for a in ages], dtype=np.float64)),
+        housework_annual_income=MappingProxyType(dict(housework_annual_income)),
+    )
+
+
+def _builtin_pack_2023() -> StandardsPack:
+    """赤い本2023年版（法定利率3%、2020年4月1日以降の事故）"""
+    return build_pack(
+        edition_id="akai-hon-2023",
+        edition_name="赤い本2023年版",
+        effective_from=date(2020, 4, 1),
+        statutory_rate=Decimal('0.03'),
+        # 入通院慰謝料表（赤い本別表I） 単位：万円
+        hospitalization_table={
+            0: {0:0, 1:28, 2:52, 3:73, 4:90, 5:105, 6:116, 7:124, 8:132, 9:139, 10:145, 11:150, 12:154, 13:158, 14:162, 15:166, 16:169, 17:172, 18:175, 19:178, 20:180},
+            1: {0:53, 1:77, 2:98, 3:115, 4:130, 5:141, 6:150, 7:158, 8:164, 9:169, 10:174, 11:177, 12:181, 13:185, 14:189, 15:193, 16:196, 17:199, 18:201, 19:204, 20:206},
+            2: {0:101, 1:122, 2:140, 3:154, 4:167, 5:176, 6:183, 7:188, 8:193, 9:196, 10:199, 11:201, 12:204, 13:207, 14:210, 15:213, 16:215, 17:218, 18:220, 19:222, 20:224},
+            3: {0:145, 1:162, 2:177, 3:188, 4:197, 5:204, 6:209, 7:213, 8:216, 9:218, 10:221, 11:223, 12:225, 13:228, 14:231, 15:233, 16:235, 17:237, 18:239, 19:241, 20:243},
+            4: {0:165, 1:184, 2:198, 3:208, 4:216, 5:223, 6:228, 7:232, 8:235, 9:237, 10:239, 11:241, 12:243, 13:245, 14:247, 15:249, 16:251, 17:252, 18:254, 19:256, 20:257},
+            5: {0:183, 1:202, 2:215, 3:225, 4:233, 5:239, 6:244, 7:248, 8:250, 9:252, 10:254, 11:256, 12:258, 13:260, 14:262, 15:264, 16:265, 17:267, 18:268, 19:270, 20:271},
+            6: {0:199, 1:218, 2:230, 3:239, 4:246, 5:252, 6:257, 7:260, 8:262, 9:264, 10:266, 11:268, 12:270, 13:272, 14:274, 15:276, 16:277, 17:279, 18:280, 19:282, 20:283},
+            7: {0:212, 1:231, 2:242, 3:250, 4:256, 5:261, 6:266, 7:269, 8:271, 9:273, 10:275, 11:277, 12:279, 13:281, 14:282, 15:284, 16:285, 17:287, 18:288, 19:290, 20:291},
+            8: {0:224, 1:242, 2:252, 3:259, 4:265, 5:270, 6:274, 7:277, 8:279, 9:281, 10:283, 11:285, 12:286, 13:288, 14:290, 15:291, 16:293, 17:294, 18:295, 19:297, 20:298},
+            9: {0:234, 1:251, 2:261, 3:267, 4:272, 5:277, 6:281, 7:284, 8:286, 9:288, 10:290, 11:292, 12:293, 13:295, 14:296, 15:298, 16:299, 17:301, 18:302, 19:303, 20:305},
+            10: {0:242, 1:259, 2:268, 3:274, 4:279, 5:284, 6:287, 7:290, 8:292, 9:294, 10:296, 11:298, 12:299, 13:301, 14:302, 15:304, 16:305, 17:306, 18:308, 19:309, 20:310}
+        },
+        # 後遺障害慰謝料（弁護士基準）
+        disability_compensation={
+            1: 2800, 2: 2370, 3: 1990, 4: 1670, 5: 1400, 6: 1180, 7: 1000,
+            8: 830, 9: 690, 10: 550, 11: 420, 12: 290, 13: 180, 14: 110
+        },
+        # 労働能力喪失率
+        disability_loss_rate={
+            1: 100, 2: 100, 3: 100, 4: 92, 5: 79, 6: 67, 7: 56,
+            8: 45, 9: 35, 10: 27, 11: 20, 12: 14, 13: 9, 14: 5
+        },
+        # ライプニッツ係数（法定利率3%）
+        leibniz_coefficients={
+            1: 0.971, 2: 1.913, 3: 2.829, 4: 3.717, 5: 4.580,
+            6: 5.417, 7: 6.230, 8: 7.020, 9: 7.786, 10: 8.530,
+            11: 9.253, 12: 9.954, 13: 10.635, 14: 11.296, 15: 11.938,
+            16: 12.561, 17: 13.166, 18: 13.754, 19: 14.324, 20: 14.877,
+            21: 15.415, 22: 15.937, 23: 16.444, 24: 16.936, 25: 17.413,
+            26: 17.877, 27: 18.327, 28: 18.764, 29: 19.188, 30: 19.600,
+            31: 20.000, 32: 20.389, 33: 20.766, 34: 21.132, 35: 21.487,
+            36: 21.832, 37: 22.167, 38: 22.492, 39: 22.808, 40: 23.115,
+            41: 23.412, 42: 23.701, 43: 23.982, 44: 24.254, 45: 24.519,
+            46: 24.775, 47: 25.025, 48: 25.267, 49: 25.502, 50: 25.730,
+            51: 25.951, 52: 26.166, 53: 26.374, 54: 26.578, 55: 26.774,
+            56: 26.965, 57: 27.151, 58: 27.331, 59: 27.506, 60: 27.676,
+            61: 27.840, 62: 28.000, 63: 28.155, 64: 28.306, 65: 28.453,
+            66: 28.595, 67: 28.733
+        },
+        # 年齢別平均余命（簡易版）
+        life_expectancy={
+            0: 81.41, 1: 80.43, 5: 76.48, 10: 71.52, 15: 66.56,
+            20: 61.63, 25: 56.72, 30: 51.84, 35: 47.00, 40: 42.21,
+            45: 37.48, 50: 32.84, 55: 28.31, 60: 23.91, 65: 19.70,
+            70: 15.71, 75: 12.05, 80: 8.78, 85: 6.04, 90: 3.95
+        },
+        # 家事従事者の年収基準
+        housework_annual_income={
+            "全年齢平均": 3936000,  # 2023年基準
+            "30代": 4200000,
+            "40代": 4500000,
+            "50代": 4300000,
+            "60代": 3800000
+        },
+    )
+
+
+def _builtin_pack_legacy(current: StandardsPack) -> StandardsPack:
+    """2020年3月31日以前の事故（改正前民法の法定利率5%）
+
+    基準表は現行版と共通とし、ライプニッツ係数のみ5%の係数表を用いる。
+    """
+    rate = Decimal('0.05')
+    periods = range(1, len(current.leibniz_milli))
+    leibniz = get_coefficient_service().coefficients(periods, LEIBNIZ, rate, YEAR)
+    return build_pack(
+        edition_id="akai-hon-legacy-5pct",
+        edition_name="赤い本（法定利率5%・2020年3月以前の事故）",
+        effective_from=date(2000, 1, 1),
+        statutory_rate=rate,
+        hospitalization_table=current.hospitalization_table_1_map,
+        disability_compensation=current.disability_compensation_map,
+        disability_loss_rate=current.disability_loss_rate_map,
+        leibniz_coefficients={period: float(value) for period, value in zip(periods, leibniz)},
+        life_expectancy=current.life_expectancy_map,
+        housework_annual_income=current.housework_annual_income,
+    )
+
+
+def to_accident_date(value: Any) -> Optional[date]:
+    """事故日を date に変換（画面から渡される "YYYY-MM-DD" 文字列・datetime を含む。変換できなければ None）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip()).date()
+        except ValueError:
+            return None
+    return None
+
+
+class StandardsRegistry:
+    """版ごとの基準パックの登録簿（事故日から適用版を選択）"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._packs: Dict[str, StandardsPack] = {}
+        self._by_date: List[StandardsPack] = []
+        self._lock = threading.Lock()
+
+    def register(self, pack: StandardsPack) -> None:
+        """パックを登録（同じ edition_id は置き換え）"""
+        with self._lock:
+            self._packs[pack.edition_id] = pack
+            self._by_date = sorted(self._packs.values(), key=lambda p: p.effective_from)
+
+    def get(self, edition_id: str) -> StandardsPack:
+        """edition_id でパックを取得"""
+        try:
+            return self._packs[edition_id]
+        except KeyError:
+            raise ConfigurationError(
+                f"基準パックが見つかりません: {edition_id}",
+                user_message=f"指定された基準（{edition_id}）は登録されていません。"
+            ) from None
+
+    def latest(self) -> StandardsPack:
+        """最新（適用開始日が最も新しい）の版"""
+        if not self._by_date:
+            raise ConfigurationError("基準パックが登録されていません", user_message="基準データが読み込まれていません。")
+        return self._by_date[-1]
+
+    def for_date(self, accident_date: Any) -> StandardsPack:
+        """事故日に適用される版（適用開始日が事故日以前で最新のもの）
+
+        事故日が未入力・日付として解釈できない場合は最新版、全ての版より前の場合は最も古い版を返す。
+        """
+        accident_date = to_accident_date(accident_date)
+        packs = self._by_date
+        if accident_date is None:
+            return self.latest()
+        applicable = packs[0] if packs else self.latest()
+        for pack in packs:
+            if pack.effective_from <= accident_date:
+                applicable = pack
+            else:
+                break
+        return applicable
+
+    def group_by_date(self, accident_dates: Any) -> List[Tuple[StandardsPack, np.ndarray]]:
+        """事故日の配列（datetime64[D]、未入力は NaT）を適用版ごとの行のマスクに分ける
+
+        各行の版は for_date と同じ規則で選択し、該当する行がある版のみを返す。
+        """
+        self.latest()  # 未登録なら ConfigurationError
+        packs = self._by_date
+        dates = np.asarray(accident_dates, dtype='datetime64[D]')
+        starts = np.array([pack.effective_from for pack in packs], dtype='datetime64[D]')
+        index = np.maximum(np.searchsorted(starts, dates, side='right') - 1, 0)
+        index = np.where(np.isnat(dates), len(packs) - 1, index)
+        groups = []
+        for position, pack in enumerate(packs):
+            mask = index == position
+            if mask.any():
+                groups.append((pack, mask))
+        return groups
+
+    def editions(self) -> List[Dict[str, Any]]:
+        """登録済みの版の一覧"""
+        return [
+            {'edition_id': p.edition_id, 'edition_name': p.edition_name,
+             'effective_from': p.effective_from.isoformat(), 'statutory_rate': str(p.statutory_rate)}
+            for p in self._by_date
+        ]
+
+    def load_directory(self, directory: Union[str, Path]) -> int:
+        """ディレクトリ配下のコンパイル済みパックを全て登録し、件数を返す"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return 0
+        loaded = 0
+        for meta_file in sorted(directory.glob("*/meta.json")):
+            try:
+                self.register(StandardsPack.load(meta_file.parent))
+                loaded += 1
+            except Exception as e:
+                self.logger.warning(f"基準パックの読み込みに失敗しました: {meta_file.parent} - {e}")
+        return loaded
+
+
+def _apply_leibniz_override(pack: StandardsPack, leibniz_file: Union[str, Path]) -> StandardsPack:
+    """設定の leibniz_coefficients_file（{"期間": 係数}）で係数表を差し替えたパックを返す"""
+    with open(leibniz_file, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)
+    coefficients = dict(pack.leibniz_coefficients_map)
+    coefficients.update({int(period): float(value) for period, value in overrides.items()})
+    return build_pack(
+        edition_id=pack.edition_id,
+        edition_name=pack.edition_name,
+        effective_from=pack.effective_from,
+        statutory_rate=pack.statutory_rate,
+        hospitalization_table=pack.hospitalization_table_1_map,
+        disability_compensation=pack.disability_compensation_map,
+        disability_loss_rate=pack.disability_loss_rate_map,
+        leibniz_coefficients=coefficients,
+        life_expectancy=pack.life_expectancy_map,
+        housework_annual_income=pack.housework_annual_income,
+    )
+
+
+# グローバル登録簿（プロセス内で一度だけ構築）
+_global_registry: Optional[StandardsRegistry] = None
+_global_registry_lock = threading.Lock()
+
+
+def get_standards_registry() -> StandardsRegistry:
+    """グローバル基準パック登録簿を取得"""
+    global _global_registry
+    if _global_registry is None:
+        with _global_registry_lock:
+            if _global_registry is None:
+                registry = StandardsRegistry()
+                pack = _builtin_pack_2023()
+                pack_dir = None
+                try:
+                    from config.app_config import get_config
+                    calculation_config = get_config().calculation
+                    pack_dir = calculation_config.standards_pack_dir
+                    leibniz_file = Path(calculation_config.leibniz_coefficients_file)
+                    if leibniz_file.exists():
+                        pack = _apply_leibniz_override(pack, leibniz_file)
+                except Exception as e:
+                    registry.logger.warning(f"基準設定の読み込みに失敗しました（組み込み基準を使用）: {e}")
+                registry.register(_builtin_pack_legacy(pack))
+                registry.register(pack)
+                if pack_dir:
+                    registry.load_directory(pack_dir)
+                _global_registry = registry
+    return _global_registry
+
+
+if __name__ == "__main__":
+    # 組み込み基準パックのコンパイル
+    import sys
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "config/standards"
+    for edition in get_standards_registry()._by_date:
+        print(f"コンパイル: {edition.edition_name} -> {edition.save(output_dir)}")
@@ -39,6 +39,19 @@ class DatabaseConfig:
     connection_timeout_seconds: int = 30
     journal_mode: str = "WAL"
     enable_foreign_keys: bool = True
+    pool_size: int = 5  # 同時に使用する接続数の上限
+    cached_statements: int = 128  # 接続ごとのプリペアドステートメントキャッシュ数
+    batch_chunk_size: int = 1000  # 一括保存の1トランザクションあたりの件数
+    backup_compress: bool = False  # バックアップをgzip圧縮する
+    backup_pages_per_step: int = 256  # バックアップAPIの1ステップで複製するページ数
+    backup_step_sleep_seconds: float = 0.005  # ステップ間の待機（業務中の負荷抑制）
+    history_keyframe_interval: int = 50  # 計算履歴で全体を保存する間隔（間は差分のみ保存）
+    case_cache_size: int = 64  # 読み込み済み案件のキャッシュ件数（0で無効）
+    payload_encoding: str = "json"  # 案件データの保存形式（json / zlib-json / msgpack-zlib）
+    archive_file_path: str = ""  # アーカイブDBのファイル（空欄ならデータベースと同じ場所の <名前>_archive.db）
+    archive_after_months: int = 24  # 最終更新からこの月数を過ぎた案件をアーカイブDBに移す（0で削除済みのみ）
+    query_log_enabled: bool = True  # SQL文ごとの実行時間を集計する
+    slow_query_threshold_ms: float = 100.0  # この時間を超えた文の実行計画を記録する
     
 @dataclass
 class UIConfig:
@@ -50,6 +63,7 @@ class UIConfig:
     font_size: int = 10
     enable_tooltips: bool = True
     auto_save_interval: int = 300  # 秒
+    auto_save_idle_seconds: float = 3.0  # 入力が止まってから自動保存するまでの秒数
     # 設定ファイルから読み込まれる追加の属性
     appearance_mode: str = "light"
     font_family: str = "Meiryo UI"
@@ -161,6 +175,7 @@ class CalculationConfig:
     # 設定ファイルから読み込まれる追加の属性
     default_interest_rate_pa: float = 3.0
     leibniz_coefficients_file: str = "config/leibniz_coefficients.json"
+    standards_pack_dir: str = "config/standards"
     lawyer_fee_calculation_standard: str = "old_standard"
     enable_detailed_calculation_log: bool = False
 
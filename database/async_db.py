@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DatabaseManager の非同期ファサード
+
+書き込みは専用の書き込みスレッドがキューから1件ずつ実行して直列化し、
+読み込みは読み込みスレッド群がプールの別接続で並行に実行する（WALモードでは
+書き込み中も読み込みは待たされない）。各メソッドは concurrent.futures.Future を
+返し、asyncio からは run() で await できる。
+
+完了時の callback(result, error) は dispatcher を経由して呼び出す。Tk などの
+UIスレッドで受け取る場合は CallbackPump.dispatch を dispatcher に指定し、
+CallbackPump.attach でUIのイベントループから定期的に処理させる。
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.error_handler import get_error_handler, DatabaseError
+from database.db_manager import DatabaseManager
+
+# 書き込みスレッドで直列に実行する DatabaseManager のメソッド
+WRITE_METHODS = frozenset({
+    'save_case', 'delete_case', 'batch_save_cases', 'migrate_payloads',
+    'save_template', 'delete_template', 'rebuild_statistics', 'optimize_database',
+    'create_backup', 'execute_query', 'execute_script', 'archive_cases', 'restore_case',
+})
+
+Callback = Callable[[Any, Optional[BaseException]], None]
+
+_STOP = object()
+
+
+class CallbackPump:
+    """別スレッドで完了した処理の callback をUIスレッドで実行するための中継
+
+    dispatch はどのスレッドから呼んでもよい。drain（attach した場合は
+    UIのイベントループから定期的に呼ばれる）を呼んだスレッドで callback を実行する。
+    """
+
+    def __init__(self):
+        self._pending: "queue.SimpleQueue[Callable[[], None]]" = queue.SimpleQueue()
+        self.logger = logging.getLogger(__name__)
+
+    def dispatch(self, func: Callable[[], None]):
+        self._pending.put(func)
+
+    def drain(self) -> int:
+        """待機中の callback をすべて実行し、実行した件数を返す"""
+        count = 0
+        while True:
+            try:
+                func = self._pending.get_nowait()
+            except queue.Empty:
+                return count
+            try:
+                func()
+            except Exception as e:
+                self.logger.error(f"データベース処理の完了通知でエラー: {e}", exc_info=True)
+            count += 1
+
+    def attach(self, widget: Any, interval_ms: int = 20):
+        """widget.after で interval_ms ごとに drain を実行する（Tk のメインループ用）"""
+        def poll():
+            self.drain()
+            widget.after(interval_ms, poll)
+        widget.after(interval_ms, poll)
+
+
+class AsyncDatabase:
+    """書き込み専用スレッドと読み込みスレッド群による DatabaseManager の非同期ファサード"""
+
+    def __init__(self, db_manager: DatabaseManager, reader_threads: Optional[int] = None,
+                 dispatcher: Optional[Callable[[Callable[[], None]], None]] = None):
+        self.db_manager = db_manager
+        self.logger = logging.getLogger(__name__)
+        self._error_handler = get_error_handler()
+        self._dispatcher = dispatcher
+
+        # 書き込みスレッド用に接続を1本残す
+        if reader_threads is None:
+            reader_threads = max(1, db_manager.get_pool_statistics()['pool_size'] - 1)
+        self._readers = ThreadPoolExecutor(max_workers=reader_threads, thread_name_prefix="db-reader")
+        self._writes: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+        self._closed = False
+
+        # 同じ key の新しい要求が出た場合に古い要求の callback を抑止するための世代番号
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {'reads': 0, 'writes': 0, 'superseded': 0, 'errors': 0,
+                       'total_write_wait': 0.0, 'max_write_wait': 0.0}
+        self._writer.start()
+
+    # --- 投入 ---
+
+    def call(self, method: str, *args, callback: Optional[Callback] = None,
+             key: Optional[str] = None, **kwargs) -> Future:
+        """DatabaseManager のメソッドを非同期に実行（書き込み系は書き込みスレッドで直列に実行）
+
+        key を指定すると、同じ key で後から投入した要求がある場合に callback を呼ばない
+        （検索欄の入力ごとの再検索で、古い結果が新しい結果を上書きしないようにする）。
+        """
+        func = getattr(self.db_manager, method)
+        if method in WRITE_METHODS:
+            return self.submit_write(func, *args, callback=callback, key=key, **kwargs)
+        return self.submit_read(func, *args, callback=callback, key=key, **kwargs)
+
+    def submit_read(self, func: Callable[..., Any], *args, callback: Optional[Callback] = None,
+                    key: Optional[str] = None, **kwargs) -> Future:
+        """読み込み処理を読み込みスレッドで実行"""
+        self._check_open()
+        future = self._readers.submit(func, *args, **kwargs)
+        self._attach_callback(future, func, callback, key, 'reads')
+        return future
+
+    def submit_write(self, func: Callable[..., Any], *args, callback: Optional[Callback] = None,
+                     key: Optional[str] = None, **kwargs) -> Future:
+        """書き込み処理を書き込みスレッドのキューに投入（投入順に1件ずつ実行）"""
+        self._check_open()
+        future: Future = Future()
+        self._attach_callback(future, func, callback, key, 'writes')
+        self._writes.put((future, func, args, kwargs, time.perf_counter()))
+        return future
+
+    async def run(self, method: str, *args, **kwargs) -> Any:
+        """asyncio から await するための call"""
+        return await asyncio.wrap_future(self.call(method, *args, **kwargs))
+
+    # --- よく使う操作 ---
+
+    def save_case(self, case_data, callback: Optional[Callback] = None) -> Future:
+        return self.call('save_case', case_data, callback=callback)
+
+    def delete_case(self, case_number: str, callback: Optional[Callback] = None) -> Future:
+        return self.call('delete_case', case_number, callback=callback)
+
+    def load_case_data_by_id(self, case_id: int, callback: Optional[Callback] = None) -> Future:
+        return self.call('load_case_data_by_id', case_id, callback=callback, key='load_case')
+
+    def search_cases(self, callback: Optional[Callback] = None, key: Optional[str] = None, **criteria) -> Future:
+        return self.call('search_cases', callback=callback, key=key, **criteria)
+
+    def search_cases_fulltext(self, query: str, limit: int = 50, callback: Optional[Callback] = None,
+                              key: Optional[str] = None) -> Future:
+        return self.call('search_cases_fulltext', query, limit, callback=callback, key=key)
+
+    # --- 内部処理 ---
+
+    def _check_open(self):
+        if self._closed:
+            raise DatabaseError(
+                "終了した非同期データベースに処理が投入されました",
+                user_message="データベース処理は既に終了しています。"
+            )
+
+    def _attach_callback(self, future: Future, func: Callable[..., Any], callback: Optional[Callback],
+                         key: Optional[str], kind: str):
+        generation = None
+        if key is not None:
+            with self._lock:
+                generation = self._generations.get(key, 0) + 1
+                self._generations[key] = generation
+
+        def is_superseded() -> bool:
+            with self._lock:
+                superseded = key is not None and self._generations.get(key) != generation
+                if superseded:
+                    self._stats['superseded'] += 1
+                return superseded
+
+        def done(completed: Future):
+            if completed.cancelled():
+                return
+            error = completed.exception()
+            with self._lock:
+                self._stats[kind] += 1
+                if error is not None:
+                    self._stats['errors'] += 1
+            if isinstance(error, Exception):
+                self._error_handler.handle_exception(
+                    error, context={'operation': getattr(func, '__name__', repr(func)), 'async': kind}
+                )
+            if callback is None:
+                return
+            result = None if error is not None else completed.result()
+
+            def deliver():
+                # 通知の時点で判定する（UIスレッドでの処理待ちの間に新しい要求が出た場合も抑止）
+                if not is_superseded():
+                    callback(result, error)
+
+            if self._dispatcher is not None:
+                self._dispatcher(deliver)
+            else:
+                deliver()
+
+        future.add_done_callback(done)
+
+    def _writer_loop(self):
+        while True:
+            item = self._writes.get()
+            if item is _STOP:
+                return
+            future, func, args, kwargs, queued_at = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            wait = time.perf_counter() - queued_at
+            with self._lock:
+                self._stats['total_write_wait'] += wait
+                self._stats['max_write_wait'] = max(self._stats['max_write_wait'], wait)
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """処理件数・書き込み待ち時間などの統計"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending_writes'] = self._writes.qsize()
+        stats['avg_write_wait'] = stats['total_write_wait'] / stats['writes'] if stats['writes'] else 0.0
+        return stats
+
+    def close(self, wait: bool = True):
+        """投入済みの処理を完了させてからスレッドを終了"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(_STOP)
+        if wait:
+            self._writer.join()
+        self._readers.shutdown(wait=wait)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件データの自動保存（ライトビハインド）
+
+編集中の案件のスナップショットを mark_dirty で受け取り、同じ案件への
+繰り返しの変更は最新のものにまとめる。入力が止まってから idle_seconds 後、
+または最初の未保存の変更から interval_seconds 後に、未保存の全案件を
+1トランザクションで保存する（前回保存時から変更のあった項目の列のみ書き換え）。
+
+未保存のスナップショットはジャーナル（JSON Lines）に追記しておき、
+異常終了した場合は次回起動時に recover で復元して保存する。
+close で未保存の変更をすべて保存してから終了する。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from models import CaseData
+from utils.error_handler import get_error_handler
+from database.db_manager import DatabaseManager, CASE_SECTION_COLUMNS
+from database.case_cache import copy_case_data
+
+DEFAULT_IDLE_SECONDS = 3.0
+JOURNAL_SUFFIX = ".autosave.jsonl"
+
+
+def section_snapshot(case_data: CaseData) -> Dict[str, Any]:
+    """変更の有無を比較するための項目ごとの値"""
+    snapshot = {}
+    for column in CASE_SECTION_COLUMNS:
+        value = getattr(case_data, column)
+        snapshot[column] = value.to_dict() if hasattr(value, 'to_dict') else value
+    return snapshot
+
+
+class AutosaveQueue:
+    """変更をまとめて後から保存する自動保存キュー
+
+    writer に AsyncDatabase を指定すると、保存を書き込みスレッドのキュー経由で
+    実行する（手動保存などの他の書き込みと投入順に直列化される）。
+    """
+
+    def __init__(self, db_manager: DatabaseManager, interval_seconds: float,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS, journal_path: Optional[Path] = None,
+                 writer: Any = None):
+        self.db_manager = db_manager
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self.journal_path = Path(journal_path) if journal_path else db_manager.db_path.with_suffix(JOURNAL_SUFFIX)
+        self.writer = writer
+        self.logger = logging.getLogger(__name__)
+        self._error_handler = get_error_handler()
+
+        # 案件番号 -> (スナップショット, 最初に未保存になった時刻)
+        self._pending: Dict[str, Tuple[CaseData, float]] = {}
+        # 案件番号 -> DBに保存済みの項目ごとの値（変更項目の判定に使用）
+        self._baselines: Dict[str, Dict[str, Any]] = {}
+        self._last_mark = 0.0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {'marks': 0, 'coalesced': 0, 'flushes': 0, 'cases_written': 0,
+                       'sections_written': 0, 'sections_skipped': 0, 'errors': 0, 'last_flush_seconds': 0.0}
+
+    # --- 変更の受け付け ---
+
+    def track(self, case_data: CaseData):
+        """DBの内容と一致している案件を登録（読み込み・手動保存の直後に呼ぶ）"""
+        with self._condition:
+            self._baselines[case_data.case_number] = section_snapshot(case_data)
+
+    def mark_dirty(self, case_data: CaseData):
+        """案件の変更を受け付ける（現在の内容を複製して保持し、ジャーナルに追記）"""
+        if not case_data or not case_data.case_number:
+            return
+        snapshot = copy_case_data(case_data)
+        now = time.monotonic()
+        with self._condition:
+            previous = self._pending.get(snapshot.case_number)
+            self._pending[snapshot.case_number] = (snapshot, previous[1] if previous else now)
+            self._last_mark = now
+            self._stats['marks'] += 1
+            if previous:
+                self._stats['coalesced'] += 1
+            self._append_journal(snapshot)
+            self._condition.notify()
+
+    def discard(self, case_number: str):
+        """未保存の変更を破棄（手動保存で全体を保存する場合など）"""
+        with self._condition:
+            self._pending.pop(case_number, None)
+
+    @property
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    # --- 保存 ---
+
+    def flush(self) -> Dict[str, Any]:
+        """未保存の変更をすべて保存（1トランザクション）"""
+        with self._flush_lock:
+            with self._condition:
+                pending = dict(self._pending)
+                self._pending.clear()
+                baselines = {number: self._baselines.get(number) for number in pending}
+            if not pending:
+                return {'success_count': 0, 'failed_count': 0, 'sections_written': 0, 'row_errors': []}
+
+            changes = []
+            snapshots = {}
+            skipped = 0
+            for number, (case_data, _) in pending.items():
+                snapshots[number] = section_snapshot(case_data)
+                baseline = baselines[number]
+                if baseline is None:
+                    changes.append((case_data, None))
+                    continue
+                sections = [c for c in CASE_SECTION_COLUMNS if snapshots[number][c] != baseline[c]]
+                skipped += len(CASE_SECTION_COLUMNS) - len(sections)
+                changes.append((case_data, sections))
+
+            start = time.perf_counter()
+            try:
+                results = self._write(self.db_manager.save_case_changes, changes)
+            except Exception as e:
+                self._error_handler.handle_exception(e, context={'operation': 'autosave_flush'})
+                results = {'success_count': 0, 'failed_count': len(changes), 'sections_written': 0,
+                           'row_errors': [{'case_number': number, 'error': str(e)} for number in pending]}
+            elapsed = time.perf_counter() - start
+
+            failed = {error['case_number'] for error in results['row_errors']}
+            with self._condition:
+                for number, (case_data, first_marked) in pending.items():
+                    if number in failed:
+                        # 保存できなかった変更は、より新しい変更が無ければ次回に再試行
+                        self._pending.setdefault(number, (case_data, first_marked))
+                    else:
+                        self._baselines[number] = snapshots[number]
+                self._stats['flushes'] += 1
+                self._stats['cases_written'] += results['success_count']
+                self._stats['sections_written'] += results['sections_written']
+                self._stats['sections_skipped'] += skipped
+                self._stats['errors'] += results['failed_count']
+                self._stats['last_flush_seconds'] = elapsed
+                self._rewrite_journal()
+            if failed:
+                self.logger.warning(f"自動保存できなかった案件があります: {', '.join(sorted(failed))}")
+            else:
+                self.logger.debug(f"自動保存しました: {results['success_count']}件（{elapsed:.3f}秒）")
+            return results
+
+    def _write(self, func: Callable[..., Any], *args) -> Any:
+        if self.writer is not None:
+            return self.writer.submit_write(func, *args).result()
+        return func(*args)
+
+    def _is_due(self, now: float) -> bool:
+        if not self._pending:
+            return False
+        oldest = min(first_marked for _, first_marked in self._pending.values())
+        return now - self._last_mark >= self.idle_seconds or now - oldest >= self.interval_seconds
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping and not self._is_due(time.monotonic()):
+                    self._condition.wait(timeout=min(self.idle_seconds, 1.0) if self._pending else None)
+                if self._stopping:
+                    return
+            self.flush()
+
+    # --- ジャーナル ---
+
+    def _append_journal(self, case_data: CaseData):
+        """スナップショットをジャーナルに追記（_condition を保持して呼ぶ）"""
+        try:
+            if self._journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            record = {'journaled_at': datetime.now().isoformat(), 'case': case_data.to_dict()}
+            self._journal.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._journal.flush()
+        except OSError as e:
+            self.logger.error(f"自動保存ジャーナルへの書き込みに失敗しました: {e}")
+
+    def _rewrite_journal(self):
+        """ジャーナルを未保存の変更のみに書き直す（_condition を保持して呼ぶ）"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        try:
+            if not self._pending:
+                if self.journal_path.exists():
+                    self.journal_path.unlink()
+                return
+            temp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for case_data, _ in self._pending.values():
+                    record = {'journaled_at': datetime.now().isoformat(), 'case': case_data.to_dict()}
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.journal_path)
+        except OSError as e:
+            self.logger.error(f"自動保存ジャーナルの更新に失敗しました: {e}")
+
+    def recover(self) -> int:
+        """前回異常終了した際のジャーナルから未保存の変更を復元して保存し、復元した件数を返す"""
+        if not self.journal_path.exists():
+            return 0
+        recovered: Dict[str, CaseData] = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    case_data = CaseData.from_dict(json.loads(line)['case'])
+                except (ValueError, KeyError, TypeError) as e:
+                    # 書き込み途中で終了した最終行など
+                    self.logger.warning(f"自動保存ジャーナルの{line_number}行目を読み込めません: {e}")
+                    continue
+                recovered[case_data.case_number] = case_data
+        if not recovered:
+            self.journal_path.unlink()
+            return 0
+        for case_data in recovered.values():
+            self.mark_dirty(case_data)
+        self.flush()
+        self.logger.info(f"前回終了時に未保存だった案件を復元しました: {len(recovered)}件")
+        return len(recovered)
+
+    # --- 開始・終了 ---
+
+    def start(self):
+        """保存スレッドを開始"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """保存スレッドを停止し、未保存の変更をすべて保存"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._condition:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """受け付け・まとめた変更数、保存した件数・項目数などの統計"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計算履歴（差分圧縮）
+
+計算の実行ごとに、入力項目と計算結果を calculation_history に追記する。
+各エントリは同じ案件の直前のエントリとの差分（JSON Patch 形式の
+add / remove / replace の並び）を圧縮して保存し、keyframe_interval 件ごとに
+全体（キーフレーム）を保存する。任意の時点の内容は、直前のキーフレームから
+最大 keyframe_interval - 1 件の差分を適用して復元する。
+
+履歴は追記のみで、更新・削除は行わない。
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.error_handler import get_error_handler, DatabaseError
+from database.db_manager import DatabaseManager
+from database import payload_codec
+
+DEFAULT_KEYFRAME_INTERVAL = 50
+TAIL_CACHE_SIZE = 32
+
+# 差分の種類（RFC 6902 の op の一部）
+OP_ADD = "add"
+OP_REMOVE = "remove"
+OP_REPLACE = "replace"
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def normalize(document: Any) -> Any:
+    """JSONで表せる値に正規化（Decimal・日付などは文字列化）"""
+    return json.loads(json.dumps(document, ensure_ascii=False, default=str))
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """old を new にする差分（辞書は項目単位、それ以外の値・リストは置き換え）"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': OP_REMOVE, 'path': f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                ops.extend(make_patch(old[key], value, child))
+            else:
+                ops.append({'op': OP_ADD, 'path': child, 'value': value})
+        return ops
+    if type(old) is type(new) and old == new:
+        return []
+    return [{'op': OP_REPLACE, 'path': path, 'value': new}]
+
+
+def _copy(document: Any) -> Any:
+    if isinstance(document, dict):
+        return {key: _copy(value) for key, value in document.items()}
+    if isinstance(document, list):
+        return [_copy(value) for value in document]
+    return document
+
+
+def apply_patch(document: Any, ops: List[Dict[str, Any]], in_place: bool = False) -> Any:
+    """差分を適用した結果を返す（in_place=False なら document は変更しない）"""
+    if not in_place:
+        document = _copy(document)
+    for op in ops:
+        if op['path'] == "":
+            document = _copy(op['value'])
+            continue
+        tokens = [_unescape(token) for token in op['path'].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[token]
+        if op['op'] == OP_REMOVE:
+            del parent[tokens[-1]]
+        else:
+            parent[tokens[-1]] = _copy(op['value'])
+    return document
+
+
+class CalculationHistory:
+    """calculation_history への記録・時点復元・差分取得"""
+
+    def __init__(self, db_manager: DatabaseManager, keyframe_interval: Optional[int] = None):
+        self.db_manager = db_manager
+        self.keyframe_interval = keyframe_interval or db_manager.history_keyframe_interval
+        self.logger = logging.getLogger(__name__)
+        self._error_handler = get_error_handler()
+        self._lock = threading.Lock()
+        # case_id -> (直近のエントリID, キーフレームID, キーフレームからの件数, 入力, 結果)
+        self._tails: 'OrderedDict[int, Tuple[int, int, int, Any, Any]]' = OrderedDict()
+
+    # --- 記録 ---
+
+    def record(self, case_number: str, inputs: Dict[str, Any], results: Dict[str, Any],
+               calculation_type: str = "calculate_all", notes: Optional[str] = None) -> Optional[int]:
+        """計算の実行を記録し、エントリIDを返す（案件が未保存なら記録せず None）"""
+        inputs, results = normalize(inputs), normalize(results)
+        with self._lock, self.db_manager.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            case = conn.execute("SELECT id FROM cases WHERE case_number = ?", (case_number,)).fetchone()
+            if case is None:
+                self.logger.debug(f"未保存の案件のため計算履歴を記録しません: {case_number}")
+                return None
+            case_id = case['id']
+            tail = self._tail(conn, case_id)
+
+            if tail is None or tail[2] + 1 >= self.keyframe_interval:
+                input_data, result_data = {'full': inputs}, {'full': results}
+                keyframe_id = None
+                count = 0
+            else:
+                input_data = {'patch': make_patch(tail[3], inputs)}
+                result_data = {'patch': make_patch(tail[4], results)}
+                keyframe_id = tail[1]
+                count = tail[2] + 1
+
+            cursor = conn.execute(
+                "INSERT INTO calculation_history (case_id, calculation_date, calculation_type, "
+                "input_data, results, notes, keyframe_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (case_id, datetime.now().isoformat(), calculation_type,
+                 payload_codec.encode(input_data, payload_codec.ENCODING_ZLIB_JSON),
+                 payload_codec.encode(result_data, payload_codec.ENCODING_ZLIB_JSON),
+                 notes, keyframe_id)
+            )
+            entry_id = cursor.lastrowid
+            if keyframe_id is None:
+                keyframe_id = entry_id
+                conn.execute("UPDATE calculation_history SET keyframe_id = ? WHERE id = ?", (entry_id, entry_id))
+            self._remember(case_id, (entry_id, keyframe_id, count, inputs, results))
+        return entry_id
+
+    def _tail(self, conn, case_id: int) -> Optional[Tuple[int, int, int, Any, Any]]:
+        """案件の直近のエントリの内容（他のプロセスが追記していればDBから復元）"""
+        latest = conn.execute(
+            "SELECT id, keyframe_id FROM calculation_history WHERE case_id = ? ORDER BY id DESC LIMIT 1", (case_id,)
+        ).fetchone()
+        if latest is None:
+            return None
+        cached = self._tails.get(case_id)
+        if cached is not None and cached[0] == latest['id']:
+            self._tails.move_to_end(case_id)
+            return cached
+        rows = self._chain(conn, case_id, latest['id'], latest['keyframe_id'])
+        inputs, results = self._replay(rows)
+        tail = (latest['id'], latest['keyframe_id'], len(rows) - 1, inputs, results)
+        self._remember(case_id, tail)
+        return tail
+
+    def _remember(self, case_id: int, tail: Tuple[int, int, int, Any, Any]):
+        self._tails[case_id] = tail
+        self._tails.move_to_end(case_id)
+        while len(self._tails) > TAIL_CACHE_SIZE:
+            self._tails.popitem(last=False)
+
+    # --- 復元 ---
+
+    @staticmethod
+    def _chain(conn, case_id: int, entry_id: int, keyframe_id: Optional[int]) -> List[Any]:
+        """キーフレームから entry_id までのエントリ"""
+        if keyframe_id is None:
+            raise DatabaseError(
+                f"計算履歴のキーフレームが見つかりません: {entry_id}",
+                user_message="計算履歴が破損しています。"
+            )
+        return conn.execute(
+            "SELECT id, calculation_date, calculation_type, input_data, results, notes FROM calculation_history "
+            "WHERE case_id = ? AND id BETWEEN ? AND ? ORDER BY id",
+            (case_id, keyframe_id, entry_id)
+        ).fetchall()
+
+    @staticmethod
+    def _replay(rows: List[Any]) -> Tuple[Any, Any]:
+        inputs = results = None
+        for row in rows:
+            input_data, result_data = payload_codec.decode(row['input_data']), payload_codec.decode(row['results'])
+            if 'full' in input_data:
+                inputs, results = input_data['full'], result_data['full']
+            else:
+                inputs = apply_patch(inputs, input_data['patch'], in_place=True)
+                results = apply_patch(results, result_data['patch'], in_place=True)
+        return inputs, results
+
+    def get_state(self, case_number: str, entry_id: Optional[int] = None,
+                  at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """指定エントリ（省略時は at 時点、両方省略時は最新）の入力・結果を復元"""
+        with self.db_manager.get_connection() as conn:
+            conditions, params = ["c.case_number = ?"], [case_number]
+            if entry_id is not None:
+                conditions.append("h.id = ?")
+                params.append(entry_id)
+            if at is not None:
+                conditions.append("h.calculation_date <= ?")
+                params.append(at.isoformat())
+            target = conn.execute(
+                f"SELECT h.id, h.case_id, h.keyframe_id FROM calculation_history h JOIN cases c ON c.id = h.case_id "
+                f"WHERE {' AND '.join(conditions)} ORDER BY h.id DESC LIMIT 1",
+                params
+            ).fetchone()
+            if target is None:
+                return None
+            rows = self._chain(conn, target['case_id'], target['id'], target['keyframe_id'])
+        inputs, results = self._replay(rows)
+        last = rows[-1]
+        return {
+            'id': last['id'],
+            'calculation_date': last['calculation_date'],
+            'calculation_type': last['calculation_type'],
+            'notes': last['notes'],
+            'inputs': inputs,
+            'results': results,
+        }
+
+    def list_entries(self, case_number: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """案件の計算履歴の一覧（新しい順。内容は含まない）"""
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT h.id, h.calculation_date, h.calculation_type, h.notes, h.keyframe_id = h.id AS is_keyframe "
+                "FROM calculation_history h JOIN cases c ON c.id = h.case_id "
+                "WHERE c.case_number = ? ORDER BY h.id DESC LIMIT ?",
+                (case_number, -1 if limit is None else limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def diff(self, case_number: str, from_id: int, to_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """2つのエントリ間の入力・結果の差分（to_id 省略時は最新）"""
+        before = self.get_state(case_number, from_id)
+        after = self.get_state(case_number, to_id)
+        if before is None or after is None:
+            return None
+        return {
+            'from_id': before['id'],
+            'to_id': after['id'],
+            'inputs': make_patch(before['inputs'], after['inputs']),
+            'results': make_patch(before['results'], after['results']),
+        }
+
+    def get_statistics(self, case_number: Optional[str] = None) -> Dict[str, Any]:
+        """履歴の件数・キーフレーム数・保存サイズ"""
+        condition, params = "", ()
+        if case_number is not None:
+            condition, params = "WHERE case_id = (SELECT id FROM cases WHERE case_number = ?)", (case_number,)
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(keyframe_id = id), 0), "
+                f"COALESCE(SUM(length(input_data) + length(results)), 0) FROM calculation_history {condition}",
+                params
+            ).fetchone()
+        return {'entries': row[0], 'keyframes': row[1], 'stored_bytes': row[2]}
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件データ（CaseData）の読み込みキャッシュ
+
+復元済みの CaseData を案件番号・案件IDで引ける LRU として保持する。
+各エントリは読み込み時点の last_modified と PRAGMA data_version を記録し、
+有効性の判定（data_version が変わっていなければそのまま使用、変わって
+いれば last_modified を照合）は DatabaseManager が行う。
+格納・取得時には複製を渡し、呼び出し元の変更がキャッシュに波及しないようにする。
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from models import CaseData
+
+DEFAULT_CASE_CACHE_SIZE = 64
+
+
+def _copy_value(value: Any) -> Any:
+    """JSON由来の値（dict・list の入れ子）を複製"""
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    return value
+
+
+def _copy_section(section: Any) -> Any:
+    """項目がすべて不変値のデータクラスを浅く複製（copy.copy より高速）"""
+    duplicate = object.__new__(type(section))
+    duplicate.__dict__.update(section.__dict__)
+    return duplicate
+
+
+def copy_case_data(case_data: CaseData) -> CaseData:
+    """CaseData の複製（各情報セクションは浅く、辞書項目は入れ子まで複製）"""
+    duplicate = _copy_section(case_data)
+    duplicate.person_info = _copy_section(case_data.person_info)
+    duplicate.accident_info = _copy_section(case_data.accident_info)
+    duplicate.medical_info = _copy_section(case_data.medical_info)
+    duplicate.income_info = _copy_section(case_data.income_info)
+    duplicate.custom_fields = _copy_value(case_data.custom_fields)
+    duplicate.calculation_results = _copy_value(case_data.calculation_results)
+    return duplicate
+
+
+@dataclass
+class CachedCase:
+    """キャッシュのエントリ"""
+    case_id: int
+    case_number: str
+    last_modified: str
+    data_version: Optional[int]  # None は未照合（次回参照時に last_modified を照合する）
+    case_data: CaseData
+
+
+class CaseCache:
+    """案件番号・案件IDで引ける CaseData の LRU キャッシュ（スレッドセーフ）"""
+
+    def __init__(self, max_size: int = DEFAULT_CASE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, CachedCase]' = OrderedDict()
+        self._ids: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+
+    def get(self, case_number: Optional[str] = None, case_id: Optional[int] = None) -> Optional[CachedCase]:
+        """エントリを取得（有効性は呼び出し元が判定し、hit / miss / invalidate で結果を通知する）"""
+        with self._lock:
+            if case_number is None:
+                case_number = self._ids.get(case_id)
+            entry = self._entries.get(case_number) if case_number is not None else None
+            if entry is not None:
+                self._entries.move_to_end(case_number)
+            return entry
+
+    def hit(self, entry: CachedCase, data_version: Optional[int] = None) -> CaseData:
+        """有効と判定したエントリの複製を返す（照合済みの data_version を記録）"""
+        with self._lock:
+            self._hits += 1
+            if data_version is not None:
+                entry.data_version = data_version
+        return copy_case_data(entry.case_data)
+
+    def miss(self):
+        """キャッシュを使えなかった読み込みを記録"""
+        with self._lock:
+            self._misses += 1
+
+    def put(self, case_id: int, case_data: CaseData, last_modified: str, data_version: Optional[int]):
+        """案件データを格納（上限を超えた分は古いものから破棄）"""
+        if self.max_size <= 0:
+            return
+        entry = CachedCase(case_id, case_data.case_number, last_modified, data_version, copy_case_data(case_data))
+        with self._lock:
+            self._remove(case_data.case_number)
+            self._entries[entry.case_number] = entry
+            self._ids[case_id] = entry.case_number
+            while len(self._entries) > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._ids.pop(evicted.case_id, None)
+
+    def invalidate(self, case_number: str, stale: bool = False):
+        """エントリを破棄（stale は有効性の照合で古いと判定された場合）"""
+        with self._lock:
+            if self._remove(case_number) and stale:
+                self._stale += 1
+
+    def _remove(self, case_number: str) -> bool:
+        entry = self._entries.pop(case_number, None)
+        if entry is None:
+            return False
+        if self._ids.get(entry.case_id) == case_number:
+            del self._ids[entry.case_id]
+        return True
+
+    def clear(self):
+        """全エントリを破棄"""
+        with self._lock:
+            self._entries.clear()
+            self._ids.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """ヒット率などの統計"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'stale': self._stale,
+                'hit_rate': self._hits / total if total else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
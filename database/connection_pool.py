@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite接続プール
+
+接続は初回要求時に生成し（PRAGMA設定は生成時の1回のみ）、使用後はプールに
+返却して再利用する。同時に貸し出せる接続数は pool_size で制限し、空きが
+ない場合は timeout 秒まで返却を待つ。貸出回数・待ち時間などの統計を保持する。
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+from utils.error_handler import DatabaseError
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_TIMEOUT = 30.0
+
+
+class ConnectionPool:
+    """上限付きキューによる接続プール
+
+    connect は新しい接続を生成して返す関数（PRAGMA設定済みの接続を返すこと）。
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_POOL_TIMEOUT):
+        if pool_size < 1:
+            raise DatabaseError(
+                f"接続プールのサイズが不正です: {pool_size}",
+                user_message="データベース接続数の設定は1以上を指定してください。"
+            )
+        self._connect = connect
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._in_use = 0
+
+    def _try_create(self) -> Optional[sqlite3.Connection]:
+        """上限に達していなければ新しい接続を生成（達していれば None）"""
+        with self._lock:
+            if len(self._all) >= self.pool_size:
+                return None
+            conn = self._connect()
+            self._all.append(conn)
+            return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """接続を借りる（空きがなければ返却を待つ）"""
+        if self._closed:
+            raise DatabaseError(
+                "閉じられた接続プールが使用されました",
+                user_message="データベース接続は既に閉じられています。"
+            )
+        waited = 0.0
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._try_create()
+            if conn is None:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise DatabaseError(
+                        f"接続プールの待ち時間が上限を超えました（{self.timeout}秒）",
+                        user_message="データベースが混み合っています。しばらくしてから再度お試しください。",
+                        context={"pool_size": self.pool_size, "timeout": self.timeout}
+                    ) from None
+                waited = time.perf_counter() - start
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            if waited:
+                self._waits += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """接続を返却（未確定のトランザクションは取り消す）"""
+        with self._lock:
+            self._in_use -= 1
+        if self._closed:
+            conn.close()
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # 壊れた接続は破棄し、次回要求時に作り直す
+            with self._lock:
+                if conn in self._all:
+                    self._all.remove(conn)
+            conn.close()
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """接続を借りるコンテキストマネージャー
+
+        正常終了時はトランザクションを確定し、例外時は取り消してから返却する。
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """全接続を閉じる（貸出中の接続は返却時に閉じる）"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._all.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """プールの統計情報"""
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'connections': len(self._all),
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'total_wait_seconds': self._total_wait,
+                'max_wait_seconds': self._max_wait,
+                'avg_wait_seconds': self._total_wait / self._checkouts if self._checkouts else 0.0,
+            }
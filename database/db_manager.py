@@ -9,13 +9,22 @@ import sqlite3
 import logging
 import json
 import shutil
+import gzip
+import threading
+import time
 from datetime import datetime, timedelta, date
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any, List, Dict, Optional, Tuple, Union, Callable
+from typing import Any, List, Dict, Optional, Tuple, Union, Callable, Iterable, Iterator, NamedTuple
 
 from utils.error_handler import get_error_handler, DatabaseError, ErrorSeverity
 from config.app_config import ConfigManager
 from models import CaseData
+from database.connection_pool import ConnectionPool
+from database import payload_codec
+from database.case_cache import CaseCache
+from database import migrations as schema_migrations
+from database.query_log import QueryLog, TimedConnection
 
 # ロギング設定
 logging.basicConfig(
@@ -24,6 +33,141 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# 検索用の非正規化列（JSON列から保存時に抽出して格納する）
+# 列名: (型, 既存データの移行時に値を求めるSQL式)
+SEARCH_COLUMNS = {
+    'client_name': ('TEXT', "json_extract(payload_json(person_info), '$.name')"),
+    'accident_date': ('TEXT', "json_extract(payload_json(accident_info), '$.accident_date')"),
+    'disability_grade': ('INTEGER', "json_extract(payload_json(medical_info), '$.disability_grade')"),
+    'total_amount': ('INTEGER', "CAST(json_extract(NULLIF(payload_json(calculation_results), ''), '$.summary.amount') AS INTEGER)"),
+}
+
+# 検索用インデックス（アーカイブ済みを除く部分インデックス）
+SEARCH_INDEXES = {
+    # 一覧・ストリーミング取得用のカバリングインデックス（(last_modified, id) のキーセット）
+    'idx_cases_active_keyset': ('cases (last_modified, id, case_number, client_name, status, created_date, '
+                                'accident_date, disability_grade, total_amount)'),
+    'idx_cases_active_status': 'cases (status, last_modified)',
+    'idx_cases_active_client_name': 'cases (client_name, last_modified)',
+    'idx_cases_active_accident_date': 'cases (accident_date)',
+    'idx_cases_active_grade_amount': 'cases (disability_grade, total_amount)',
+}
+
+
+# 案件の保存時に書き込む列（UPSERT_CASE_SQL の値の順）
+CASE_WRITE_COLUMNS = (
+    'case_number', 'created_date', 'last_modified', 'status',
+    'person_info', 'accident_info', 'medical_info', 'income_info',
+    'notes', 'custom_fields', 'calculation_results',
+    'client_name', 'accident_date', 'disability_grade', 'total_amount',
+)
+
+# 案件番号が既存なら更新する INSERT（作成日時は新規作成時のみ設定）
+UPSERT_CASE_SQL = (
+    f"INSERT INTO cases ({', '.join(CASE_WRITE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in CASE_WRITE_COLUMNS)}) "
+    "ON CONFLICT(case_number) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in CASE_WRITE_COLUMNS if c not in ('case_number', 'created_date'))
+)
+
+# 部分更新（save_case_changes）で列単位に書き換えられる案件の項目
+CASE_SECTION_COLUMNS = ('person_info', 'accident_info', 'medical_info', 'income_info',
+                        'notes', 'custom_fields', 'calculation_results')
+
+# calculation_history に後から追加した列（差分圧縮の起点となるキーフレームのID）
+HISTORY_COLUMNS = {
+    'keyframe_id': 'INTEGER',
+}
+
+# backup_records に後から追加した列（既存データベースの移行用）
+BACKUP_RECORD_COLUMNS = {
+    'duration_seconds': 'REAL',
+    'compressed': 'BOOLEAN DEFAULT 0',
+    'error_message': 'TEXT',
+}
+
+BACKUP_FILE_PREFIX = "compensation_db_backup_"
+
+# 置き換え済みのインデックス（スキーマの移行時に削除する）
+OBSOLETE_INDEXES = ('idx_cases_active_last_modified',)
+
+# アーカイブDB（ATTACH 時のデータベース名）と、移動する表の列
+ARCHIVE_SCHEMA = 'archive'
+ARCHIVE_CASE_COLUMNS = (
+    'id', 'case_number', 'case_name', 'created_date', 'last_modified', 'status',
+    'client_name', 'accident_date', 'disability_grade', 'total_amount',
+    'person_info', 'accident_info', 'medical_info', 'income_info',
+    'calculation_results', 'notes', 'custom_fields', 'is_archived',
+)
+ARCHIVE_HISTORY_COLUMNS = (
+    'id', 'case_id', 'calculation_date', 'calculation_type', 'input_data', 'results', 'notes', 'keyframe_id',
+)
+
+# iter_cases の1回の問い合わせで取得する行数
+DEFAULT_CHUNK_SIZE = 500
+
+
+class CaseRow(NamedTuple):
+    """案件一覧の1行（ストリーミング取得用の軽量な行）"""
+    id: int
+    case_number: str
+    client_name: Optional[str]
+    status: Optional[str]
+    created_date: Optional[str]
+    last_modified: Optional[str]
+    accident_date: Optional[str]
+    disability_grade: Optional[int]
+    total_amount: Optional[int]
+
+    @property
+    def keyset(self) -> Tuple[Optional[str], int]:
+        """続きから取得する際に after に渡すキー"""
+        return self.last_modified, self.id
+
+
+# 全文検索（FTS5）の対象列と、cases の行から値を求めるSQL式（{row} は new. などの接頭辞）
+# {payload} は JSON列の参照に使う関数名。圧縮形式を使う場合のみ SQL関数 payload_json
+# （アプリの接続ごとに登録）を使い、それ以外は外部ツールからも更新できるよう素の参照とする
+# 列や式を変更した場合は、トリガーと索引を作り直すスキーマの移行を追加すること
+FULLTEXT_COLUMNS = {
+    'case_number': "{row}case_number",
+    'client_name': "{row}client_name",
+    'location': "CASE WHEN json_valid({payload}({row}accident_info)) THEN json_extract({payload}({row}accident_info), '$.location') END",
+    'accident_details': (
+        "CASE WHEN json_valid({payload}({row}accident_info)) THEN trim("
+        "coalesce(json_extract({payload}({row}accident_info), '$.accident_type'), '') || ' ' || "
+        "coalesce(json_extract({payload}({row}accident_info), '$.road_condition'), '') || ' ' || "
+        "coalesce(json_extract({payload}({row}accident_info), '$.weather'), '')) END"
+    ),
+    'notes': "{row}notes",
+    'disability_details': "CASE WHEN json_valid({payload}({row}medical_info)) THEN json_extract({payload}({row}medical_info), '$.disability_details') END",
+    'custom_fields': (
+        "CASE WHEN json_valid({payload}({row}custom_fields)) THEN "
+        "(SELECT group_concat(value, ' ') FROM json_tree({payload}({row}custom_fields)) WHERE atom IS NOT NULL) END"
+    ),
+}
+
+# 起動時に1回で読むスキーマの状態（バージョンと、全文検索の挿入トリガーの定義）
+SCHEMA_STATE_SQL = (
+    "SELECT user_version, (SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'cases_fts_insert') "
+    "FROM pragma_user_version"
+)
+
+# trigram トークナイザは3文字以上の語のみ索引で検索できる（短い語は LIKE で照合）
+FULLTEXT_MIN_TERM_LENGTH = 3
+
+# 統計ロールアップ（case_stats）の集計軸と、cases の行から区分を求めるSQL式（{row} は new. などの接頭辞）
+# アーカイブされていない案件を集計する。別に 'all' 軸でアーカイブ済みを含む全行数を保持する
+# 集計軸を変更した場合は、トリガーを作り直して rebuild_statistics するスキーマの移行を追加すること
+STATS_DIMENSIONS = {
+    'total': "''",
+    'status': "coalesce({row}status, '')",
+    'month': "coalesce(substr({row}created_date, 1, 7), '')",
+    'grade': "CAST(coalesce({row}disability_grade, 0) AS TEXT)",
+}
+STATS_ALL_ROWS = 'all'
+
+
 class DatabaseManager:
     """SQLiteデータベース管理クラス"""
     
@@ -39,6 +183,22 @@ class DatabaseManager:
         self.connection_timeout = db_config.connection_timeout_seconds
         self.backup_dir = Path(db_config.backup_dir)
         self.max_backup_files = db_config.max_backup_files
+        self.cached_statements = db_config.cached_statements
+        self.batch_chunk_size = db_config.batch_chunk_size
+        self.history_keyframe_interval = db_config.history_keyframe_interval
+        self.payload_encoding = payload_codec.validate_encoding(db_config.payload_encoding)
+        self.backup_compress = db_config.backup_compress
+        self.backup_pages_per_step = db_config.backup_pages_per_step
+        self.backup_step_sleep = db_config.backup_step_sleep_seconds
+        self._backup_lock = threading.Lock()
+        self._case_cache = CaseCache(db_config.case_cache_size)
+        self.archive_path = (Path(db_config.archive_file_path) if db_config.archive_file_path
+                             else self.db_path.with_name(f"{self.db_path.stem}_archive{self.db_path.suffix}"))
+        self.archive_after_months = db_config.archive_after_months
+        self.query_log = (QueryLog(db_config.slow_query_threshold_ms, on_slow=self._report_slow_query)
+                          if db_config.query_log_enabled else None)
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watch_lock = threading.Lock()
 
         if not self.db_path.parent.exists():
             try:
@@ -48,18 +208,26 @@ class DatabaseManager:
                 self._error_handler.handle_exception(e, context=err.context)
                 raise err from e # 再送してアプリケーションの起動を妨げる
         
-        self._create_connection() # 初期接続試行
+        self._pool = ConnectionPool(self._create_connection, pool_size=db_config.pool_size,
+                                    timeout=self.connection_timeout)
+        self._pool.release(self._pool.acquire()) # 初期接続試行
         self._initialize_db() # 初期化
     
     def _create_connection(self) -> sqlite3.Connection:
+        """新しい接続を生成しPRAGMAを設定（接続プールが接続ごとに1回だけ呼び出す）"""
         try:
-            conn = sqlite3.connect(self.db_path, timeout=self.connection_timeout, check_same_thread=False)
+            conn = sqlite3.connect(self.db_path, timeout=self.connection_timeout, check_same_thread=False,
+                                   cached_statements=self.cached_statements,
+                                   factory=sqlite3.Connection if self.query_log is None else TimedConnection)
+            if self.query_log is not None:
+                conn.query_log = self.query_log
             conn.row_factory = sqlite3.Row
+            conn.create_function("payload_json", 1, payload_codec.to_json_text, deterministic=True)
             if self.journal_mode:
                 conn.execute(f"PRAGMA journal_mode={self.journal_mode};")
             if self.enable_foreign_keys:
                 conn.execute("PRAGMA foreign_keys = ON;")
-            self.logger.info(f"データベースに接続しました: {self.db_path}")
+            self.logger.debug(f"データベースに接続しました: {self.db_path}")
             return conn
         except sqlite3.Error as e:
             db_err = DatabaseError(
@@ -71,19 +239,48 @@ class DatabaseManager:
             self._error_handler.handle_exception(e, context=db_err.context)
             raise db_err from e
 
-    def _close_connection(self, conn: Optional[sqlite3.Connection]):
-        if conn:
-            conn.close()
-            self.logger.info(f"データベース接続を閉じました: {self.db_path}")
-
     def get_connection(self):
-        """データベース接続をコンテキストマネージャーとして取得"""
-        return self._create_connection()
+        """データベース接続をコンテキストマネージャーとして取得
+
+        接続はプールから貸し出され、ブロックを抜けるとトランザクションを確定
+        （例外時は取り消し）してプールに返却される。
+        """
+        return self._pool.connection()
+
+    def get_query_statistics(self, limit: Optional[int] = 20) -> Dict[str, Any]:
+        """SQL文の形ごとの実行回数・合計・95パーセンタイル時間と、遅い文の実行計画"""
+        if self.query_log is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.query_log.get_statistics(limit)}
+
+    def reset_query_statistics(self):
+        """SQL文の実行時間の集計を破棄"""
+        if self.query_log is not None:
+            self.query_log.reset()
+
+    def _report_slow_query(self, entry: Dict[str, Any]):
+        """遅い文をパフォーマンス監視に通知"""
+        from utils.performance_monitor import get_performance_monitor
+        get_performance_monitor().record_slow_query({'database': str(self.db_path), **entry})
+
+    def get_pool_statistics(self) -> Dict[str, Any]:
+        """接続プールの統計情報（貸出回数・待ち時間など）"""
+        return self._pool.get_statistics()
+
+    def close(self) -> None:
+        """プール内の全接続を閉じる"""
+        self._pool.close()
+        with self._watch_lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+        self._case_cache.clear()
+        self.logger.debug(f"データベース接続を閉じました: {self.db_path}")
 
     def execute_query(self, query: str, params: Optional[Union[Dict[str, Any], Tuple[Any, ...]]] = None, commit: bool = False, fetch_one: bool = False, fetch_all: bool = False) -> Any:
         conn = None
         try:
-            conn = self._create_connection()
+            conn = self._pool.acquire()
             cursor = conn.cursor()
             self.logger.debug(f"Executing query: {query} with params: {params}")
             if params:
@@ -93,14 +290,19 @@ class DatabaseManager:
 
             if commit:
                 conn.commit()
-                self.logger.info(f"Query committed: {query[:50]}...")
+                self.logger.debug(f"Query committed: {query[:50]}...")
                 return cursor.lastrowid
             
             if fetch_one:
                 return cursor.fetchone()
             if fetch_all:
                 return cursor.fetchall()
-            return cursor # DDLなどの場合
+            # DDLなどの場合も接続をプールに返す前に結果を読み切り、変更を確定する
+            # （返却時に未確定の変更は取り消され、接続は他のスレッドに貸し出される）
+            rows = cursor.fetchall()
+            if conn.in_transaction:
+                conn.commit()
+            return rows
         except sqlite3.IntegrityError as e:
             db_err = DatabaseError(
                 message=f"データベース整合性エラー: {e}", 
@@ -142,12 +344,12 @@ class DatabaseManager:
             if conn: conn.rollback()
             raise unknown_err from e
         finally:
-            self._close_connection(conn)
+            if conn: self._pool.release(conn)
 
     def execute_script(self, script: str) -> None:
         conn = None
         try:
-            conn = self._create_connection()
+            conn = self._pool.acquire()
             cursor = conn.cursor()
             self.logger.info("Executing script...")
             cursor.executescript(script)
@@ -164,12 +366,62 @@ class DatabaseManager:
             if conn: conn.rollback()
             raise db_err from e
         finally:
-            self._close_connection(conn)
+            if conn: self._pool.release(conn)
 
     def _initialize_db(self):
-        """データベースの初期化（テーブル作成など）"""
-        try:            # 案件テーブル
-            create_cases_table = """
+        """データベースの初期化（スキーマのバージョンを確認し、未適用の移行があれば適用）
+
+        スキーマが最新であれば問い合わせ1回で終わる。
+        """
+        try:
+            migrations = self._schema_migrations()
+            with self.get_connection() as conn:
+                version, fulltext_trigger = conn.execute(SCHEMA_STATE_SQL).fetchone()
+                applied = schema_migrations.migrate(conn, migrations, current=version)
+                if applied:
+                    version, fulltext_trigger = conn.execute(SCHEMA_STATE_SQL).fetchone()
+            self.schema_version = version
+            self.fulltext_enabled = fulltext_trigger is not None
+            
+            if (self.fulltext_enabled and self.payload_encoding != payload_codec.ENCODING_JSON
+                    and 'payload_json' not in fulltext_trigger):
+                # 圧縮形式で保存する設定に変えた場合は、圧縮形式の列を読めるトリガーにする
+                self._install_fulltext_triggers(compressed=True)
+            
+            if applied:
+                self.logger.info(f"データベースの初期化が完了しました（スキーマ バージョン {version}）")
+        except DatabaseError as e: # 移行処理から送出されるエラー
+            # 初期化時のエラーは致命的である可能性が高い
+            self.logger.critical(f"データベース初期化に失敗: {e}")
+            self._error_handler.handle_exception(e, context=e.context)
+            raise # アプリケーションの起動を止めるために再送
+        except Exception as e: # 万が一 DatabaseError 以外が来た場合
+            db_err = DatabaseError(
+                message=f"データベース初期化中に予期せぬエラー: {e}",
+                user_message="データベースのセットアップ中に重大なエラーが発生しました。",
+                severity=ErrorSeverity.CRITICAL,
+                context={"original_error": str(e)}
+            )
+            self._error_handler.handle_exception(e, context=db_err.context)
+            raise db_err from e
+
+    def _schema_migrations(self) -> List[schema_migrations.Migration]:
+        """スキーマの移行（バージョン順。適用済みの定義は変更せず、末尾に追加すること）"""
+        Migration = schema_migrations.Migration
+        return [
+            Migration(1, "基本テーブル・検索用列とインデックス", self._migrate_base_schema),
+            Migration(2, "全文検索インデックス", self._migrate_fulltext_index),
+            Migration(3, "統計ロールアップ", self._migrate_statistics_rollup),
+        ]
+
+    def _migrate_base_schema(self, conn: sqlite3.Connection):
+        """バージョン 1: 基本テーブルとインデックス
+        
+        バージョン管理の導入前のデータベース（途中までの列・インデックスを持つ）も
+        この状態に揃える。
+        """
+        # 案件テーブル
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS cases (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 case_number TEXT UNIQUE NOT NULL,
@@ -178,6 +430,9 @@ class DatabaseManager:
                 last_modified TEXT,
                 status TEXT DEFAULT '作成中',
                 client_name TEXT,
+                accident_date TEXT,
+                disability_grade INTEGER,
+                total_amount INTEGER,
                 person_info TEXT,
                 accident_info TEXT,
                 medical_info TEXT,
@@ -186,11 +441,11 @@ class DatabaseManager:
                 notes TEXT,
                 custom_fields TEXT DEFAULT '{}',
                 is_archived BOOLEAN DEFAULT 0
-            );
-            """
-            
-            # 計算履歴テーブル
-            create_history_table = """
+            )
+        """)
+        
+        # 計算履歴テーブル
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS calculation_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 case_id INTEGER,
@@ -199,32 +454,36 @@ class DatabaseManager:
                 input_data TEXT,
                 results TEXT,
                 notes TEXT,
+                keyframe_id INTEGER,
                 FOREIGN KEY (case_id) REFERENCES cases (id)
-            );
-            """
-            
-            # バックアップ記録テーブル
-            create_backup_table = """
+            )
+        """)
+        
+        # バックアップ記録テーブル
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS backup_records (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 backup_date TEXT,
                 backup_path TEXT,
                 file_size INTEGER,
-                success BOOLEAN
-            );
-            """
-            
-            # 設定テーブル
-            create_settings_table = """
+                success BOOLEAN,
+                duration_seconds REAL,
+                compressed BOOLEAN DEFAULT 0,
+                error_message TEXT
+            )
+        """)
+        
+        # 設定テーブル
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS settings (
                 key TEXT PRIMARY KEY,
                 value TEXT,
                 last_modified TEXT
-            );
-            """
-            
-            # テンプレートテーブル
-            create_templates_table = """
+            )
+        """)
+        
+        # テンプレートテーブル
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS case_templates (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 template_name TEXT UNIQUE NOT NULL,
@@ -232,38 +491,252 @@ class DatabaseManager:
                 created_date TEXT,
                 last_modified TEXT,
                 description TEXT
-            );
-            """
-            
-            # テーブルを作成
-            self.execute_query(create_cases_table)
-            self.execute_query(create_history_table)
-            self.execute_query(create_backup_table)
-            self.execute_query(create_settings_table)
-            self.execute_query(create_templates_table)
-            
-            # インデックス作成
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_cases_case_number ON cases (case_number);")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_cases_client_name ON cases (client_name);")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_cases_status ON cases (status);")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_history_case_id ON calculation_history (case_id);")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_templates_name ON case_templates (template_name);")
-            
-            self.logger.info("データベースの初期化が完了しました")
-        except DatabaseError as e: # execute_query/script から送出されるエラー
-            # 初期化時のエラーは致命的である可能性が高い
-            self.logger.critical(f"データベース初期化に失敗: {e.message}")
-            # _error_handler.handle_exception は execute_query/script 内で呼ばれているのでここでは不要
-            raise # アプリケーションの起動を止めるために再送
-        except Exception as e: # 万が一 DatabaseError 以外が来た場合
-            db_err = DatabaseError(
-                message=f"データベース初期化中に予期せぬエラー: {e}",
-                user_message="データベースのセットアップ中に重大なエラーが発生しました。",
-                severity=ErrorSeverity.CRITICAL,
-                context={"original_error": str(e)}
             )
-            self._error_handler.handle_exception(e, context=db_err.context)
-            raise db_err from e
+        """)
+        
+        # 既存データベースに後から追加した列
+        self._ensure_columns(conn, 'backup_records', BACKUP_RECORD_COLUMNS)
+        self._ensure_columns(conn, 'calculation_history', HISTORY_COLUMNS)
+        self._migrate_search_columns(conn)
+        
+        # インデックス作成
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_case_number ON cases (case_number)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_client_name ON cases (client_name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_status ON cases (status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_case_id ON calculation_history (case_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_case_date ON calculation_history (case_id, calculation_date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_templates_name ON case_templates (template_name)")
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+        for index_name, target in SEARCH_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target} WHERE is_archived = 0")
+
+    @staticmethod
+    def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> List[str]:
+        """テーブルに無い列を追加し、追加した列名を返す"""
+        existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+        added = [name for name in columns if name not in existing]
+        for name in added:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {columns[name]}")
+        return added
+
+    def _migrate_search_columns(self, conn: sqlite3.Connection):
+        """検索用列が無いデータベースに列を追加し、JSON列の値で埋める"""
+        added = self._ensure_columns(conn, 'cases', {name: sql_type for name, (sql_type, _) in SEARCH_COLUMNS.items()})
+        if not added:
+            return
+        
+        # client_name は列として存在していたが保存時に設定されていなかったため併せて埋める
+        assignments = ", ".join(f"{name} = {expression}" for name, (_, expression) in SEARCH_COLUMNS.items())
+        conn.execute(
+            f"UPDATE cases SET {assignments} WHERE json_valid(payload_json(person_info)) "
+            "AND json_valid(payload_json(accident_info)) AND json_valid(payload_json(medical_info)) "
+            "AND json_valid(COALESCE(NULLIF(payload_json(calculation_results), ''), '{}'))"
+        )
+        self.logger.info(f"検索用列を追加しました: {', '.join(added)}")
+
+    def _migrate_fulltext_index(self, conn: sqlite3.Connection):
+        """バージョン 2: FTS5 全文検索テーブルと同期用トリガー（FTS5 が使えなければ作成しない）"""
+        columns = ", ".join(FULLTEXT_COLUMNS)
+        try:
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5({columns}, tokenize = 'trigram')")
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"全文検索（FTS5 trigram）を利用できません。LIKE検索で代替します: {e}")
+            return
+        
+        # 圧縮形式を設定しているか、既に圧縮形式の案件がある（トリガーが payload_json を使用）場合
+        trigger = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'cases_fts_insert'"
+        ).fetchone()
+        compressed = (self.payload_encoding != payload_codec.ENCODING_JSON
+                      or bool(trigger and 'payload_json' in trigger[0]))
+        self._install_fulltext_triggers(compressed, conn)
+        
+        # 既存の案件を索引に登録し直す
+        conn.execute("DELETE FROM cases_fts")
+        conn.execute(f"INSERT INTO cases_fts (rowid, {columns}) SELECT id, {self._fulltext_values('', True)} FROM cases")
+        self.logger.info("全文検索インデックスを作成しました")
+
+    @staticmethod
+    def _fulltext_values(row: str, compressed: bool) -> str:
+        """FULLTEXT_COLUMNS の値を求めるSQL式の並び"""
+        payload = "payload_json" if compressed else ""
+        return ", ".join(expression.format(row=row, payload=payload) for expression in FULLTEXT_COLUMNS.values())
+
+    def _install_fulltext_triggers(self, compressed: bool, conn: Optional[sqlite3.Connection] = None):
+        """全文検索の同期用トリガーを作り直す（compressed は圧縮形式の列を読めるトリガーにする）
+        
+        conn を省略した場合は1トランザクションで置き換える（置き換え中の書き込みが索引から漏れない）。
+        """
+        if conn is None:
+            with self.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._install_fulltext_triggers(compressed, conn)
+            return
+        columns = ", ".join(FULLTEXT_COLUMNS)
+        values = self._fulltext_values('new.', compressed)
+        watched = "case_number, client_name, accident_info, medical_info, notes, custom_fields"
+        for statement in (
+            "DROP TRIGGER IF EXISTS cases_fts_insert",
+            "DROP TRIGGER IF EXISTS cases_fts_update",
+            "DROP TRIGGER IF EXISTS cases_fts_delete",
+            f"""CREATE TRIGGER cases_fts_insert AFTER INSERT ON cases BEGIN
+                INSERT INTO cases_fts (rowid, {columns}) VALUES (new.id, {values});
+            END""",
+            f"""CREATE TRIGGER cases_fts_update AFTER UPDATE OF {watched} ON cases BEGIN
+                DELETE FROM cases_fts WHERE rowid = old.id;
+                INSERT INTO cases_fts (rowid, {columns}) VALUES (new.id, {values});
+            END""",
+            """CREATE TRIGGER cases_fts_delete AFTER DELETE ON cases BEGIN
+                DELETE FROM cases_fts WHERE rowid = old.id;
+            END""",
+        ):
+            conn.execute(statement)
+
+    def _migrate_statistics_rollup(self, conn: sqlite3.Connection):
+        """バージョン 3: 統計ロールアップ表と、cases の変更を反映するトリガー"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS case_stats (
+                dimension TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                case_count INTEGER NOT NULL DEFAULT 0,
+                total_amount INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, bucket)
+            ) WITHOUT ROWID
+        """)
+        
+        def delta(row: str, sign: str) -> str:
+            buckets = ", ".join(f"('{name}', {expression.format(row=row)})"
+                                for name, expression in STATS_DIMENSIONS.items())
+            return f"""
+                INSERT INTO case_stats (dimension, bucket, case_count, total_amount)
+                SELECT column1, column2, {sign}1, {sign}coalesce({row}total_amount, 0) FROM (VALUES {buckets})
+                WHERE {row}is_archived = 0
+                ON CONFLICT (dimension, bucket) DO UPDATE SET
+                    case_count = case_count + excluded.case_count,
+                    total_amount = total_amount + excluded.total_amount;"""
+        
+        def count_all(sign: str) -> str:
+            return f"""
+                INSERT INTO case_stats (dimension, bucket, case_count) VALUES ('{STATS_ALL_ROWS}', '', {sign}1)
+                ON CONFLICT (dimension, bucket) DO UPDATE SET case_count = case_count + excluded.case_count;"""
+        
+        watched = "status, created_date, disability_grade, total_amount, is_archived"
+        changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in watched.split(", "))
+        for statement in (
+            "DROP TRIGGER IF EXISTS case_stats_insert",
+            "DROP TRIGGER IF EXISTS case_stats_update",
+            "DROP TRIGGER IF EXISTS case_stats_delete",
+            f"""CREATE TRIGGER case_stats_insert AFTER INSERT ON cases BEGIN
+                {count_all('')}
+                {delta('new.', '')}
+            END""",
+            f"""CREATE TRIGGER case_stats_update AFTER UPDATE OF {watched} ON cases WHEN {changed} BEGIN
+                {delta('old.', '-')}
+                {delta('new.', '')}
+            END""",
+            f"""CREATE TRIGGER case_stats_delete AFTER DELETE ON cases BEGIN
+                {count_all('-')}
+                {delta('old.', '-')}
+            END""",
+        ):
+            conn.execute(statement)
+        self.rebuild_statistics(conn)
+
+    @staticmethod
+    def _statistics_source_sql(source: str = "cases") -> str:
+        """source（表または副問い合わせ）から集計したロールアップの内容（dimension, bucket, case_count, total_amount）"""
+        queries = [f"SELECT '{STATS_ALL_ROWS}' AS dimension, '' AS bucket, COUNT(*) AS case_count, "
+                   f"0 AS total_amount FROM {source}"]
+        queries.extend(
+            f"SELECT '{name}', {expression.format(row='')}, COUNT(*), coalesce(SUM(total_amount), 0) "
+            f"FROM {source} WHERE is_archived = 0 GROUP BY 2"
+            for name, expression in STATS_DIMENSIONS.items()
+        )
+        return " UNION ALL ".join(queries)
+
+    def rebuild_statistics(self, conn: Optional[sqlite3.Connection] = None):
+        """統計ロールアップを cases から作り直す（conn を省略した場合は1トランザクションで行う）"""
+        if conn is None:
+            with self.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self.rebuild_statistics(conn)
+            return
+        conn.execute("DELETE FROM case_stats")
+        conn.execute(f"INSERT INTO case_stats (dimension, bucket, case_count, total_amount) "
+                     f"{self._statistics_source_sql()}")
+        self.logger.info("統計ロールアップを再作成しました")
+
+    def check_statistics(self, repair: bool = False) -> Dict[str, Any]:
+        """統計ロールアップと cases の集計結果を照合（repair=True なら不一致時に作り直す）
+        
+        差異は (dimension, bucket, ロールアップの値, 集計し直した値) の一覧で返す。
+        """
+        with self.get_connection() as conn:
+            differences = self._statistics_differences(conn)
+        if differences:
+            self.logger.warning(f"統計ロールアップに不一致があります: {len(differences)}件")
+            if repair:
+                self.rebuild_statistics()
+        return {'consistent': not differences, 'differences': differences, 'repaired': bool(differences and repair)}
+
+    def _statistics_differences(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """統計ロールアップと cases の集計結果の差異（呼び出し側の接続で照合）"""
+        expected = {(row[0], row[1]): (row[2], row[3])
+                    for row in conn.execute(self._statistics_source_sql()) if row[2] or row[3]}
+        actual = {(row[0], row[1]): (row[2], row[3])
+                  for row in conn.execute("SELECT dimension, bucket, case_count, total_amount FROM case_stats "
+                                          "WHERE case_count != 0 OR total_amount != 0")}
+        return [
+            {'dimension': key[0], 'bucket': key[1], 'rollup': actual.get(key), 'expected': expected.get(key)}
+            for key in sorted(expected.keys() | actual.keys()) if actual.get(key) != expected.get(key)
+        ]
+
+    @staticmethod
+    def _search_column_values(case_data: CaseData) -> Tuple[Any, ...]:
+        """検索用列（SEARCH_COLUMNS の順）の値を案件データから求める"""
+        accident_date = case_data.accident_info.accident_date
+        total_amount = None
+        summary = (case_data.calculation_results or {}).get('summary')
+        if isinstance(summary, dict) and summary.get('amount') is not None:
+            try:
+                total_amount = int(Decimal(str(summary['amount'])))
+            except (InvalidOperation, ValueError, TypeError):
+                total_amount = None
+        return (
+            case_data.person_info.name or None,
+            accident_date.isoformat() if accident_date else None,
+            case_data.medical_info.disability_grade,
+            total_amount,
+        )
+
+    def _safe_json_dumps(self, obj: Any) -> Union[str, bytes]:
+        """安全な保存形式への変換（payload_encoding に従う。変換できない場合は空辞書で代替）"""
+        try:
+            if hasattr(obj, 'to_dict'):
+                return payload_codec.encode(obj.to_dict(), self.payload_encoding)
+            else:
+                return payload_codec.encode(obj, self.payload_encoding)
+        except Exception as e:
+            self.logger.warning(f"JSON変換エラー（空辞書で代替）: {e}")
+            return payload_codec.encode({}, self.payload_encoding)
+
+    def _case_row_values(self, case_data: CaseData) -> Tuple[Any, ...]:
+        """案件データを CASE_WRITE_COLUMNS の順の列値に変換"""
+        return (
+            case_data.case_number,
+            (case_data.created_date or datetime.now()).isoformat(),
+            case_data.last_modified.isoformat(),
+            case_data.status or '作成中',
+            self._safe_json_dumps(case_data.person_info),
+            self._safe_json_dumps(case_data.accident_info),
+            self._safe_json_dumps(case_data.medical_info),
+            self._safe_json_dumps(case_data.income_info),
+            case_data.notes or '',
+            self._safe_json_dumps(case_data.custom_fields or {}),
+            self._safe_json_dumps(case_data.calculation_results or {}),
+            *self._search_column_values(case_data),
+        )
 
     def save_case(self, case_data: CaseData) -> bool:
         """案件データを保存（新規作成・更新両対応）"""
@@ -273,78 +746,18 @@ class DatabaseManager:
             
         try:
             case_data.last_modified = datetime.now()
+            values = self._case_row_values(case_data)
             
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # 既存データの確認
-                cursor.execute('SELECT id FROM cases WHERE case_number = ?', (case_data.case_number,))
-                existing = cursor.fetchone()
-                
-                # JSONシリアライゼーションの安全化
-                def safe_json_dumps(obj):
-                    """安全なJSON変換"""
-                    try:
-                        if hasattr(obj, 'to_dict'):
-                            return json.dumps(obj.to_dict(), ensure_ascii=False, default=str)
-                        else:
-                            return json.dumps(obj, ensure_ascii=False, default=str)
-                    except (TypeError, ValueError) as e:
-                        self.logger.warning(f"JSON変換エラー（空辞書で代替）: {e}")
-                        return json.dumps({}, ensure_ascii=False)
-                
-                if existing:
-                    # 更新
-                    cursor.execute('''
-                        UPDATE cases SET
-                            last_modified = ?,
-                            status = ?,
-                            person_info = ?,
-                            accident_info = ?,
-                            medical_info = ?,
-                            income_info = ?,
-                            notes = ?,
-                            custom_fields = ?,
-                            calculation_results = ?
-                        WHERE case_number = ?
-                    ''', (
-                        case_data.last_modified.isoformat(),
-                        case_data.status or '作成中',
-                        safe_json_dumps(case_data.person_info),
-                        safe_json_dumps(case_data.accident_info),
-                        safe_json_dumps(case_data.medical_info),
-                        safe_json_dumps(case_data.income_info),
-                        case_data.notes or '',
-                        safe_json_dumps(case_data.custom_fields or {}),
-                        safe_json_dumps(case_data.calculation_results or {}),
-                        case_data.case_number
-                    ))
-                    self.logger.info(f"案件データを更新しました: {case_data.case_number}")
-                else:
-                    # 新規作成
-                    cursor.execute('''
-                        INSERT INTO cases (
-                            case_number, created_date, last_modified, status,
-                            person_info, accident_info, medical_info, income_info,
-                            notes, custom_fields, calculation_results
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        case_data.case_number,
-                        (case_data.created_date or datetime.now()).isoformat(),
-                        case_data.last_modified.isoformat(),
-                        case_data.status or '作成中',
-                        safe_json_dumps(case_data.person_info),
-                        safe_json_dumps(case_data.accident_info),
-                        safe_json_dumps(case_data.medical_info),
-                        safe_json_dumps(case_data.income_info),
-                        case_data.notes or '',
-                        safe_json_dumps(case_data.custom_fields or {}),
-                        safe_json_dumps(case_data.calculation_results or {})
-                    ))
-                    self.logger.info(f"新規案件データを作成しました: {case_data.case_number}")
-                
-                conn.commit()
-                return True
+                saved = conn.execute(UPSERT_CASE_SQL + " RETURNING id, is_archived", values).fetchone()
+            
+            # 書き込みスルー（data_version は未照合とし、次回参照時に last_modified を照合する）
+            if saved['is_archived']:
+                self._case_cache.invalidate(case_data.case_number)
+            else:
+                self._case_cache.put(saved['id'], case_data, case_data.last_modified.isoformat(), None)
+            self.logger.info(f"案件データを保存しました: {case_data.case_number}")
+            return True
                 
         except sqlite3.IntegrityError as e:
             self.logger.error(f"案件番号重複エラー: {case_data.case_number} - {e}")
@@ -353,114 +766,152 @@ class DatabaseManager:
             self.logger.error(f"案件保存エラー: {e}")
             return False
 
-    def load_case(self, case_number: str) -> Optional[CaseData]:
-        """案件番号で案件データを読み込み"""
+    def _row_to_case_data(self, row: sqlite3.Row) -> CaseData:
+        """cases の行を CaseData に変換（壊れた値はデフォルト値で代替）"""
+        def safe_json_loads(json_str, default=None):
+            """安全な読み込み（従来のJSON文字列・圧縮形式の両方に対応）"""
+            try:
+                return payload_codec.decode(json_str) or default or {}
+            except Exception as e:
+                self.logger.warning(f"JSON読み込みエラー（デフォルト値で代替）: {e}")
+                return default or {}
+
+        case_data = CaseData()
+        case_data.case_number = row['case_number']
+
+        # 日付の安全な変換
+        try:
+            case_data.created_date = datetime.fromisoformat(row['created_date'])
+        except (ValueError, TypeError):
+            case_data.created_date = datetime.now()
+            self.logger.warning(f"作成日時の変換に失敗: {row['created_date']}")
+
+        try:
+            case_data.last_modified = datetime.fromisoformat(row['last_modified'])
+        except (ValueError, TypeError):
+            case_data.last_modified = datetime.now()
+            self.logger.warning(f"更新日時の変換に失敗: {row['last_modified']}")
+
+        case_data.status = row['status'] or '作成中'
+
+        # 各情報セクションの安全な読み込み
+        try:
+            person_data = safe_json_loads(row['person_info'])
+            case_data.person_info = case_data.person_info.from_dict(person_data)
+        except Exception as e:
+            self.logger.warning(f"個人情報の読み込みエラー: {e}")
+
+        try:
+            accident_data = safe_json_loads(row['accident_info'])
+            case_data.accident_info = case_data.accident_info.from_dict(accident_data)
+        except Exception as e:
+            self.logger.warning(f"事故情報の読み込みエラー: {e}")
+
+        try:
+            medical_data = safe_json_loads(row['medical_info'])
+            case_data.medical_info = case_data.medical_info.from_dict(medical_data)
+        except Exception as e:
+            self.logger.warning(f"医療情報の読み込みエラー: {e}")
+
+        try:
+            income_data = safe_json_loads(row['income_info'])
+            case_data.income_info = case_data.income_info.from_dict(income_data)
+        except Exception as e:
+            self.logger.warning(f"収入情報の読み込みエラー: {e}")
+
+        case_data.notes = row['notes'] or ""
+        case_data.custom_fields = safe_json_loads(row['custom_fields'], {})
+        case_data.calculation_results = safe_json_loads(row['calculation_results'], {})
+        return case_data
+
+    def _data_version(self) -> int:
+        """PRAGMA data_version（他の接続・他のプロセスによる確定のたびに変わる値）
+        
+        プール外の専用接続で取得するため、同じプロセス内の書き込みも検知できる。
+        """
+        with self._watch_lock:
+            if self._watch_conn is None:
+                self._watch_conn = self._create_connection()
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_case_cached(self, key_column: str, key: Union[str, int]) -> Optional[CaseData]:
+        """キャッシュを経由して案件を読み込み（key_column は case_number か id）
+        
+        data_version が記録時から変わっていなければ照合なしでキャッシュを使い、
+        変わっていれば last_modified を照合して一致する場合のみ使う。
+        """
+        data_version = self._data_version()
+        if key_column == 'id':
+            entry = self._case_cache.get(case_id=key)
+        else:
+            entry = self._case_cache.get(case_number=key)
+
+        if entry is not None and entry.data_version == data_version:
+            return self._case_cache.hit(entry)
+
+        with self.get_connection() as conn:
+            if entry is not None:
+                stamp = conn.execute(
+                    'SELECT id, last_modified FROM cases WHERE case_number = ? AND is_archived = 0',
+                    (entry.case_number,)
+                ).fetchone()
+                if stamp and (stamp['id'], stamp['last_modified']) == (entry.case_id, entry.last_modified):
+                    return self._case_cache.hit(entry, data_version)
+                self._case_cache.invalidate(entry.case_number, stale=True)
+
+            self._case_cache.miss()
+            row = conn.execute(f'SELECT * FROM cases WHERE {key_column} = ? AND is_archived = 0', (key,)).fetchone()
+        if row is None:
+            return None
+        case_data = self._row_to_case_data(row)
+        self._case_cache.put(row['id'], case_data, row['last_modified'], data_version)
+        return case_data
+
+    def load_case(self, case_number: str, include_archived: bool = False) -> Optional[CaseData]:
+        """案件番号で案件データを読み込み（直近に読み込んだ案件はキャッシュから返す）
+        
+        include_archived=True ならホット側に無い場合にアーカイブDBからも探す。
+        """
         if not case_number or not case_number.strip():
             self.logger.error("案件番号が空です")
             return None
             
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM cases WHERE case_number = ? AND is_archived = 0', (case_number.strip(),))
-                row = cursor.fetchone()
-                
-                if row:
-                    def safe_json_loads(json_str, default=None):
-                        """安全なJSON読み込み"""
-                        if not json_str:
-                            return default or {}
-                        try:
-                            return json.loads(json_str)
-                        except (json.JSONDecodeError, TypeError) as e:
-                            self.logger.warning(f"JSON読み込みエラー（デフォルト値で代替）: {e}")
-                            return default or {}
-                    
-                    case_data = CaseData()
-                    case_data.case_number = row['case_number']
-                    
-                    # 日付の安全な変換
-                    try:
-                        case_data.created_date = datetime.fromisoformat(row['created_date'])
-                    except (ValueError, TypeError):
-                        case_data.created_date = datetime.now()
-                        self.logger.warning(f"作成日時の変換に失敗: {row['created_date']}")
-                    
-                    try:
-                        case_data.last_modified = datetime.fromisoformat(row['last_modified'])
-                    except (ValueError, TypeError):
-                        case_data.last_modified = datetime.now()
-                        self.logger.warning(f"更新日時の変換に失敗: {row['last_modified']}")
-                    
-                    case_data.status = row['status'] or '作成中'
-                    
-                    # 各情報セクションの安全な読み込み
-                    try:
-                        person_data = safe_json_loads(row['person_info'])
-                        case_data.person_info = case_data.person_info.from_dict(person_data)
-                    except Exception as e:
-                        self.logger.warning(f"個人情報の読み込みエラー: {e}")
-                        
-                    try:
-                        accident_data = safe_json_loads(row['accident_info'])
-                        case_data.accident_info = case_data.accident_info.from_dict(accident_data)
-                    except Exception as e:
-                        self.logger.warning(f"事故情報の読み込みエラー: {e}")
-                        
-                    try:
-                        medical_data = safe_json_loads(row['medical_info'])
-                        case_data.medical_info = case_data.medical_info.from_dict(medical_data)
-                    except Exception as e:
-                        self.logger.warning(f"医療情報の読み込みエラー: {e}")
-                        
-                    try:
-                        income_data = safe_json_loads(row['income_info'])
-                        case_data.income_info = case_data.income_info.from_dict(income_data)
-                    except Exception as e:
-                        self.logger.warning(f"収入情報の読み込みエラー: {e}")
-                    
-                    case_data.notes = row['notes'] or ""
-                    case_data.custom_fields = safe_json_loads(row['custom_fields'], {})
-                    case_data.calculation_results = safe_json_loads(row['calculation_results'], {})
-                    
-                    self.logger.debug(f"案件データを正常に読み込みました: {case_number}")
-                    return case_data
-                else:
-                    self.logger.info(f"指定された案件が見つかりません: {case_number}")
+            case_data = self._load_case_cached('case_number', case_number.strip())
+            if case_data is None and include_archived:
+                case_data = self._load_archived_case('case_number', case_number.strip())
+            if case_data:
+                self.logger.debug(f"案件データを正常に読み込みました: {case_number}")
+                return case_data
+            else:
+                self.logger.info(f"指定された案件が見つかりません: {case_number}")
                     
         except Exception as e:
             self.logger.error(f"案件読み込みエラー: {case_number} - {e}")
         
         return None
     
-    def load_case_by_id(self, case_id: int) -> Optional[Dict[str, Any]]:
-        """案件IDで案件データを読み込み（辞書形式で返す）"""
+    def load_case_data_by_id(self, case_id: int, include_archived: bool = False) -> Optional[CaseData]:
+        """案件IDで案件データを読み込み（直近に読み込んだ案件はキャッシュから返す）"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM cases WHERE id = ? AND is_archived = 0', (case_id,))
-                row = cursor.fetchone()
-                
-                if row:
-                    return {
-                        'id': row['id'],
-                        'case_number': row['case_number'],
-                        'created_date': row['created_date'],
-                        'last_modified': row['last_modified'],
-                        'status': row['status'],
-                        'person_info': json.loads(row['person_info']),
-                        'accident_info': json.loads(row['accident_info']),
-                        'medical_info': json.loads(row['medical_info']),
-                        'income_info': json.loads(row['income_info']),
-                        'notes': row['notes'] or "",
-                        'custom_fields': json.loads(row['custom_fields']) if row['custom_fields'] else {},
-                        'calculation_results': json.loads(row['calculation_results']) if row['calculation_results'] else {}
-                    }
-                    
+            case_data = self._load_case_cached('id', case_id)
+            if case_data is None and include_archived:
+                case_data = self._load_archived_case('id', case_id)
+            return case_data
         except Exception as e:
             self.logger.error(f"案件読み込みエラー (ID: {case_id}): {e}")
-        
         return None
+
+    def load_case_by_id(self, case_id: int) -> Optional[Dict[str, Any]]:
+        """案件IDで案件データを読み込み（辞書形式で返す）"""
+        case_data = self.load_case_data_by_id(case_id)
+        if case_data is None:
+            return None
+        return {'id': case_id, **case_data.to_dict()}
+
+    def get_case_cache_statistics(self) -> Dict[str, Any]:
+        """案件キャッシュの統計情報（ヒット率など）"""
+        return self._case_cache.get_statistics()
     
     def search_cases(self, 
                     case_number_pattern: str = None,
@@ -469,46 +920,72 @@ class DatabaseManager:
                     date_from: date = None,
                     date_to: date = None,
                     search_term: str = None,
-                    limit: int = 100) -> List[Dict[str, Any]]:
-        """案件検索"""
+                    limit: int = 100,
+                    disability_grade: int = None,
+                    min_total_amount: int = None,
+                    max_total_amount: int = None,
+                    include_archived: bool = False) -> List[Dict[str, Any]]:
+        """案件検索（検索用列と部分インデックスを使用し、JSONは解析しない）
+        
+        include_archived=True ならアーカイブDBの（削除済みを除く）案件も対象とし、各結果の archived で区別する。
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                query = '''
-                    SELECT id, case_number, created_date, last_modified, status,
-                           json_extract(person_info, '$.name') as client_name,
-                           json_extract(accident_info, '$.accident_date') as accident_date
-                    FROM cases 
-                    WHERE is_archived = 0
-                '''
+                filters = ''
                 params = []
                 
                 if case_number_pattern:
-                    query += ' AND case_number LIKE ?'
+                    filters += ' AND case_number LIKE ?'
                     params.append(f'%{case_number_pattern}%')
                 
                 if client_name_pattern:
-                    query += ' AND json_extract(person_info, "$.name") LIKE ?'
+                    filters += ' AND client_name LIKE ?'
                     params.append(f'%{client_name_pattern}%')
                 
                 if status:
-                    query += ' AND status = ?'
+                    filters += ' AND status = ?'
                     params.append(status)
                 
                 if date_from:
-                    query += ' AND created_date >= ?'
+                    filters += ' AND created_date >= ?'
                     params.append(date_from.isoformat())
                 
                 if date_to:
-                    query += ' AND created_date <= ?'
+                    filters += ' AND created_date <= ?'
                     params.append(date_to.isoformat())
                 
+                if disability_grade is not None:
+                    filters += ' AND disability_grade = ?'
+                    params.append(disability_grade)
+                
+                if min_total_amount is not None:
+                    filters += ' AND total_amount >= ?'
+                    params.append(min_total_amount)
+                
+                if max_total_amount is not None:
+                    filters += ' AND total_amount <= ?'
+                    params.append(max_total_amount)
+                
                 # 汎用検索条件（案件番号または依頼者名に一致）
                 if search_term:
-                    query += ' AND (case_number LIKE ? OR json_extract(person_info, "$.name") LIKE ?)'
+                    filters += ' AND (case_number LIKE ? OR client_name LIKE ?)'
                     params.extend([f'%{search_term}%', f'%{search_term}%'])
                 
+                columns = '''id, case_number, created_date, last_modified, status,
+                           client_name, accident_date, disability_grade, total_amount'''
+                if include_archived and self._attach_archive(conn):
+                    query = (
+                        f"SELECT {columns}, 0 AS archived FROM main.cases WHERE is_archived = 0{filters} "
+                        f"UNION ALL SELECT {columns}, 1 FROM {ARCHIVE_SCHEMA}.cases AS a WHERE is_archived = 0 "
+                        f"AND NOT EXISTS (SELECT 1 FROM main.cases AS c WHERE c.id = a.id){filters}"
+                    )
+                    params = params * 2
+                elif include_archived:
+                    query = f"SELECT {columns}, 0 AS archived FROM cases WHERE is_archived = 0{filters}"
+                else:
+                    query = f"SELECT {columns} FROM cases WHERE is_archived = 0{filters}"
                 query += ' ORDER BY last_modified DESC LIMIT ?'
                 params.append(limit)
                 
@@ -521,6 +998,149 @@ class DatabaseManager:
             self.logger.error(f"案件検索エラー: {e}")
             return []
     
+    def _iter_keyset_chunks(self, columns: str, status: Optional[str], chunk_size: int,
+                            after: Optional[Tuple[str, int]]) -> Iterator[List[sqlite3.Row]]:
+        """(last_modified, id) の降順にキーセットで chunk_size 行ずつ取得
+        
+        各問い合わせの間は接続をプールに返却するため、利用側の処理が長くても接続を占有しない。
+        """
+        if chunk_size < 1:
+            raise DatabaseError(
+                f"取得単位が不正です: {chunk_size}",
+                user_message="一括取得の件数は1以上を指定してください。"
+            )
+        base = f"SELECT {columns} FROM cases WHERE is_archived = 0"
+        base_params: List[Any] = []
+        if status:
+            base += " AND status = ?"
+            base_params.append(status)
+        order = " ORDER BY last_modified DESC, id DESC LIMIT ?"
+        
+        # last_modified が NULL の行は降順の末尾に並ぶため、非NULLの行の後に別途取得する
+        null_phase = after is not None and after[0] is None
+        while True:
+            if null_phase:
+                condition = " AND last_modified IS NULL" + (" AND id < ?" if after else "")
+                keyset_params = [after[1]] if after else []
+            elif after is None:
+                condition, keyset_params = " AND last_modified IS NOT NULL", []
+            else:
+                condition, keyset_params = " AND (last_modified, id) < (?, ?)", list(after)
+            with self.get_connection() as conn:
+                rows = conn.execute(base + condition + order, base_params + keyset_params + [chunk_size]).fetchall()
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                if null_phase:
+                    return
+                null_phase, after = True, None
+                continue
+            after = (rows[-1]['last_modified'], rows[-1]['id'])
+
+    def iter_cases(self, status: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   after: Optional[Tuple[str, int]] = None) -> Iterator[CaseRow]:
+        """アーカイブされていない案件を更新日時の新しい順に1行ずつ返す（メモリ使用量は一定）
+        
+        行の取得はカバリングインデックスのみで完結する。after に CaseRow.keyset を渡すと
+        その行の次から再開する。
+        """
+        columns = ", ".join(CaseRow._fields)
+        for rows in self._iter_keyset_chunks(columns, status, chunk_size, after):
+            for row in rows:
+                yield CaseRow(*row)
+
+    def iter_case_data(self, status: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       after: Optional[Tuple[str, int]] = None) -> Iterator[CaseData]:
+        """iter_cases と同じ順序で CaseData を返す（エクスポート・再計算などの一括処理用）"""
+        for rows in self._iter_keyset_chunks("*", status, chunk_size, after):
+            for row in rows:
+                yield self._row_to_case_data(row)
+
+    def search_cases_fulltext(self, query: str, limit: int = 50,
+                              include_archived: bool = False) -> List[Dict[str, Any]]:
+        """全文検索（案件番号・依頼者名・事故場所・事故状況・備考・後遺障害の内容・カスタム項目）
+        
+        空白区切りの語をすべて含む案件を関連度順に返す。各結果の snippet は一致箇所の抜粋。
+        3文字未満の語は索引を使わず LIKE で照合する（その語のみの場合は更新日時順）。
+        include_archived=True ならアーカイブDBの（削除済みを除く）案件も対象とし、各結果の archived で区別する。
+        """
+        terms = [term for term in (query or "").split() if term]
+        if not terms:
+            return self.search_cases(limit=limit, include_archived=include_archived)
+        if not getattr(self, 'fulltext_enabled', False):
+            return self.search_cases(search_term=" ".join(terms), limit=limit, include_archived=include_archived)
+        
+        match_terms = [t for t in terms if len(t) >= FULLTEXT_MIN_TERM_LENGTH]
+        like_terms = [t for t in terms if len(t) < FULLTEXT_MIN_TERM_LENGTH]
+        
+        conditions = []
+        params: List[Any] = []
+        if match_terms:
+            conditions.append('cases_fts MATCH ?')
+            params.append(" ".join('"' + t.replace('"', '""') + '"' for t in match_terms))
+        for term in like_terms:
+            escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append("(" + " OR ".join(f"cases_fts.{c} LIKE ? ESCAPE '\\'" for c in FULLTEXT_COLUMNS) + ")")
+            params.extend([f'%{escaped}%'] * len(FULLTEXT_COLUMNS))
+        
+        if match_terms:
+            snippet = "snippet(cases_fts, -1, '【', '】', '…', 16)"
+            rank = 'bm25(cases_fts)'
+        else:
+            snippet = 'NULL'
+            rank = '0'
+        
+        def select(schema: str, condition: str, archived: Optional[int]) -> str:
+            """schema（main / archive）の索引と案件表に対する問い合わせ"""
+            flag = '' if archived is None else f'{archived} AS archived, '
+            return f'''
+                SELECT c.id, c.case_number, c.client_name, c.status, c.last_modified,
+                       c.accident_date, c.disability_grade, c.total_amount, {flag}
+                       {snippet} AS snippet, {rank} AS fts_rank,
+                       {", ".join(f"cases_fts.{c} AS fts_{c}" for c in FULLTEXT_COLUMNS)}
+                FROM {schema}.cases_fts JOIN {schema}.cases c ON c.id = cases_fts.rowid
+                WHERE {" AND ".join([condition] + conditions)}
+            '''
+        
+        try:
+            with self.get_connection() as conn:
+                if include_archived and self._attach_archive(conn) and self._has_archive_fulltext(conn):
+                    sql = (select('main', 'c.is_archived = 0', 0) + " UNION ALL "
+                           + select(ARCHIVE_SCHEMA, 'c.is_archived = 0 AND NOT EXISTS '
+                                    '(SELECT 1 FROM main.cases AS m WHERE m.id = c.id)', 1))
+                    params = params * 2
+                else:
+                    sql = select('main', 'c.is_archived = 0', 0 if include_archived else None)
+                sql += ' ORDER BY fts_rank, last_modified DESC LIMIT ?'
+                rows = conn.execute(sql, params + [limit]).fetchall()
+        except Exception as e:
+            self.logger.error(f"全文検索エラー: {query} - {e}")
+            return []
+        
+        results = []
+        for row in rows:
+            result = {key: row[key] for key in row.keys() if not key.startswith('fts_')}
+            if result['snippet'] is None:
+                result['snippet'] = self._like_snippet([row[f'fts_{c}'] for c in FULLTEXT_COLUMNS], like_terms[0])
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _like_snippet(texts: List[Optional[str]], term: str, width: int = 16) -> str:
+        """LIKE 照合時の抜粋（最初に一致した列の前後 width 文字）"""
+        lowered = term.lower()
+        for text in texts:
+            if not text:
+                continue
+            position = text.lower().find(lowered)
+            if position < 0:
+                continue
+            start = max(position - width, 0)
+            end = min(position + len(term) + width, len(text))
+            return (("…" if start > 0 else "") + text[start:position] + "【" + text[position:position + len(term)]
+                    + "】" + text[position + len(term):end] + ("…" if end < len(text) else ""))
+        return ""
+
     def delete_case(self, case_number: str) -> bool:
         """案件を論理削除（アーカイブ）"""
         try:
@@ -530,6 +1150,7 @@ class DatabaseManager:
                 
                 if cursor.rowcount > 0:
                     conn.commit()
+                    self._case_cache.invalidate(case_number)
                     self.logger.info(f"案件をアーカイブしました: {case_number}")
                     return True
                 else:
@@ -540,37 +1161,391 @@ class DatabaseManager:
             self.logger.error(f"案件削除エラー: {case_number} - {e}")
             return False
     
-    def create_backup(self, backup_dir: str = "backups") -> bool:
-        """データベースのバックアップ作成"""
+    # ホット／コールドの分割（アーカイブDB）
+    def _attach_archive(self, conn: sqlite3.Connection, create: bool = False) -> bool:
+        """アーカイブDBを接続に ATTACH する（ファイルが無く create=False なら False）
+        
+        ATTACH は接続ごとに1回だけ行う。アーカイブを使わない処理ではファイルを開かない。
+        """
+        if conn.execute("SELECT 1 FROM pragma_database_list WHERE name = ?", (ARCHIVE_SCHEMA,)).fetchone():
+            return True
+        if not create and not self.archive_path.exists():
+            return False
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(self.archive_path),))
+        # 移動・削除する案件IDの作業表（接続ごと）
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+        if self.journal_mode:
+            conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.journal_mode={self.journal_mode};")
+        schema_migrations.migrate(conn, self._archive_migrations(), schema=ARCHIVE_SCHEMA)
+        return True
+
+    def _archive_migrations(self) -> List[schema_migrations.Migration]:
+        """アーカイブDBのスキーマの移行（バージョン順）"""
+        return [schema_migrations.Migration(1, "アーカイブ表", self._migrate_archive_schema)]
+
+    def _migrate_archive_schema(self, conn: sqlite3.Connection):
+        """アーカイブDBのバージョン 1: 移した案件・計算履歴と、その統計ロールアップ・全文検索索引"""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.cases (
+                id INTEGER PRIMARY KEY,
+                case_number TEXT NOT NULL,
+                case_name TEXT,
+                created_date TEXT,
+                last_modified TEXT,
+                status TEXT,
+                client_name TEXT,
+                accident_date TEXT,
+                disability_grade INTEGER,
+                total_amount INTEGER,
+                person_info TEXT,
+                accident_info TEXT,
+                medical_info TEXT,
+                income_info TEXT,
+                calculation_results TEXT,
+                notes TEXT,
+                custom_fields TEXT,
+                is_archived BOOLEAN DEFAULT 0,
+                archived_date TEXT
+            )
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.calculation_history (
+                id INTEGER PRIMARY KEY,
+                case_id INTEGER,
+                calculation_date TEXT,
+                calculation_type TEXT,
+                input_data TEXT,
+                results TEXT,
+                notes TEXT,
+                keyframe_id INTEGER
+            )
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.case_stats (
+                dimension TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                case_count INTEGER NOT NULL DEFAULT 0,
+                total_amount INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, bucket)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_cases_case_number ON cases (case_number)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_cases_last_modified ON cases (last_modified)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_history_case_id ON calculation_history (case_id)")
+        if self.fulltext_enabled:
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.cases_fts "
+                         f"USING fts5({', '.join(FULLTEXT_COLUMNS)}, tokenize = 'trigram')")
+
+    def _has_archive_fulltext(self, conn: sqlite3.Connection) -> bool:
+        return self.fulltext_enabled and conn.execute(
+            f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE name = 'cases_fts'"
+        ).fetchone() is not None
+
+    def _add_archive_statistics(self, conn: sqlite3.Connection, source: str, sign: str = ''):
+        """source の案件の集計をアーカイブDBの統計ロールアップに加える（sign='-' で差し引く）"""
+        conn.execute(f"""
+            INSERT INTO {ARCHIVE_SCHEMA}.case_stats (dimension, bucket, case_count, total_amount)
+            SELECT dimension, bucket, {sign}case_count, {sign}total_amount FROM ({self._statistics_source_sql(source)})
+            WHERE case_count != 0 OR total_amount != 0
+            ON CONFLICT (dimension, bucket) DO UPDATE SET
+                case_count = case_count + excluded.case_count,
+                total_amount = total_amount + excluded.total_amount
+        """)
+
+    def _remove_archived(self, conn: sqlite3.Connection, condition: str, params: Tuple[Any, ...] = ()) -> int:
+        """condition（archive.cases a の行の条件）に一致するアーカイブの案件を計算履歴・索引・集計ごと削除"""
+        batch = "SELECT id FROM temp.archive_batch"
+        conn.execute("DELETE FROM temp.archive_batch")
+        conn.execute(f"INSERT INTO temp.archive_batch SELECT id FROM {ARCHIVE_SCHEMA}.cases AS a WHERE {condition}", params)
+        self._add_archive_statistics(conn, f"(SELECT * FROM {ARCHIVE_SCHEMA}.cases WHERE id IN ({batch}))", '-')
+        conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.calculation_history WHERE case_id IN ({batch})")
+        if self._has_archive_fulltext(conn):
+            conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.cases_fts WHERE rowid IN ({batch})")
+        return conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.cases WHERE id IN ({batch})").rowcount
+
+    def _months_ago(self, months: int) -> str:
+        """months か月前の日付（ISO形式。last_modified との比較用）"""
+        today = date.today()
+        year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+        return date(year, month + 1, min(today.day, 28)).isoformat()
+
+    def archive_cases(self, older_than_months: Optional[int] = None, chunk_size: Optional[int] = None,
+                      vacuum: bool = False) -> Dict[str, Any]:
+        """削除（アーカイブ）済みの案件と、最終更新から older_than_months か月を過ぎた案件を
+        計算履歴ごとアーカイブDBに移す（older_than_months 省略時は設定値、0 なら削除済みのみ）
+        
+        chunk_size 件ずつ、アーカイブDBへの複製を確定してから元の行を削除する
+        （WALモードでは複数のデータベースにまたがるトランザクションの確定が
+        データベースごとになるため、途中で異常終了しても案件が失われない順序にする）。
+        複製後に変更された案件は移さず、元の行の削除と同じトランザクションでアーカイブ側の複製を
+        集計ごと削除する。途中で異常終了して両方に残った行は次回の実行時にアーカイブ側から削除する。
+        vacuum=True なら移動後にデータベースを最適化してファイルを縮小する。
+        """
+        months = self.archive_after_months if older_than_months is None else older_than_months
+        chunk_size = chunk_size or self.batch_chunk_size
+        cutoff = self._months_ago(months) if months > 0 else ''
+        report = {'cases_moved': 0, 'history_moved': 0, 'stale_removed': 0, 'skipped': 0, 'cutoff': cutoff or None}
+        batch = "SELECT id FROM temp.archive_batch"
+        
+        with self.get_connection() as conn:
+            self._attach_archive(conn, create=True)
+            fulltext = self._has_archive_fulltext(conn)
+            # 前回の移動が途中で終わった行（ホット側を正とする）
+            conn.execute("BEGIN IMMEDIATE")
+            report['stale_removed'] = self._remove_archived(
+                conn, "EXISTS (SELECT 1 FROM main.cases AS c WHERE c.id = a.id)"
+            )
+        
+        last_id = 0
+        while True:
+            with self.get_connection() as conn:
+                self._attach_archive(conn, create=True)
+                
+                # 1. アーカイブDBに複製して確定
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM temp.archive_batch")
+                selected = conn.execute(
+                    "INSERT INTO temp.archive_batch SELECT id FROM main.cases "
+                    "WHERE id > ? AND (is_archived = 1 OR last_modified < ?) ORDER BY id LIMIT ?",
+                    (last_id, cutoff, chunk_size)
+                ).rowcount
+                if selected == 0:
+                    break
+                first_id = last_id
+                last_id = conn.execute("SELECT MAX(id) FROM temp.archive_batch").fetchone()[0]
+                self._add_archive_statistics(conn, f"(SELECT * FROM main.cases WHERE id IN ({batch}))")
+                columns = ", ".join(ARCHIVE_CASE_COLUMNS)
+                conn.execute(
+                    f"INSERT INTO {ARCHIVE_SCHEMA}.cases ({columns}, archived_date) "
+                    f"SELECT {columns}, ? FROM main.cases WHERE id IN ({batch})",
+                    (datetime.now().isoformat(),)
+                )
+                history_columns = ", ".join(ARCHIVE_HISTORY_COLUMNS)
+                conn.execute(
+                    f"INSERT INTO {ARCHIVE_SCHEMA}.calculation_history ({history_columns}) "
+                    f"SELECT {history_columns} FROM main.calculation_history WHERE case_id IN ({batch})"
+                )
+                if fulltext:
+                    conn.execute(
+                        f"INSERT INTO {ARCHIVE_SCHEMA}.cases_fts (rowid, {', '.join(FULLTEXT_COLUMNS)}) "
+                        f"SELECT id, {self._fulltext_values('', True)} FROM main.cases WHERE id IN ({batch})"
+                    )
+                conn.commit()
+                
+                # 2. 複製した時点から変わっていない案件のみ元の行を削除
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(f"""
+                    DELETE FROM temp.archive_batch WHERE NOT EXISTS (
+                        SELECT 1 FROM main.cases AS c JOIN {ARCHIVE_SCHEMA}.cases AS a ON a.id = c.id
+                        WHERE c.id = archive_batch.id AND a.last_modified IS c.last_modified
+                            AND a.is_archived IS c.is_archived
+                    ) OR EXISTS (
+                        SELECT 1 FROM main.calculation_history AS h
+                        WHERE h.case_id = archive_batch.id
+                            AND NOT EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.calculation_history AS ah WHERE ah.id = h.id)
+                    )
+                """)
+                case_numbers = [row[0] for row in conn.execute(
+                    f"SELECT case_number FROM main.cases WHERE id IN ({batch})"
+                )]
+                report['history_moved'] += conn.execute(
+                    f"DELETE FROM main.calculation_history WHERE case_id IN ({batch})"
+                ).rowcount
+                moved = conn.execute(f"DELETE FROM main.cases WHERE id IN ({batch})").rowcount
+                # 移さなかった案件の複製（統計ロールアップに加えた分を含む）を取り消す
+                self._remove_archived(
+                    conn, "a.id > ? AND a.id <= ? AND EXISTS (SELECT 1 FROM main.cases AS c WHERE c.id = a.id)",
+                    (first_id, last_id)
+                )
+                report['cases_moved'] += moved
+                report['skipped'] += selected - moved
+            for case_number in case_numbers:
+                self._case_cache.invalidate(case_number)
+        
+        if vacuum and report['cases_moved']:
+            self.execute_query("VACUUM main")
+        with self.get_connection() as conn:
+            report['freelist_pages'] = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+        report['hot_file_size'] = self.db_path.stat().st_size
+        report['archive_file_size'] = self.archive_path.stat().st_size
+        self.logger.info(
+            f"案件をアーカイブDBに移しました: {report['cases_moved']}件（計算履歴 {report['history_moved']}件、"
+            f"変更されたため見送り {report['skipped']}件）"
+        )
+        return report
+
+    def restore_case(self, case_number: str) -> bool:
+        """アーカイブDBの案件を計算履歴ごとホット側に戻す（未削除・最終更新を現在時刻として戻す）"""
         try:
-            backup_path = Path(backup_dir)
-            backup_path.mkdir(exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = backup_path / f"compensation_db_backup_{timestamp}.db"
-            
-            shutil.copy2(self.db_path, backup_file)
-            
-            # バックアップ記録を保存
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO backup_records (backup_date, backup_file_path, backup_type, file_size)
-                    VALUES (?, ?, ?, ?)
-                ''', (
-                    datetime.now().isoformat(),
-                    str(backup_file),
-                    "自動バックアップ",
-                    backup_file.stat().st_size
-                ))
+                if not self._attach_archive(conn):
+                    self.logger.warning(f"復元対象の案件が見つかりません: {case_number}")
+                    return False
+                
+                # 1. ホット側に書き込んで確定（同じ案件番号の案件が既にあれば戻さない）
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    f"SELECT id FROM {ARCHIVE_SCHEMA}.cases AS a WHERE case_number = ? "
+                    f"AND NOT EXISTS (SELECT 1 FROM main.cases AS c WHERE c.id = a.id) "
+                    f"ORDER BY archived_date DESC, id DESC LIMIT 1",
+                    (case_number,)
+                ).fetchone()
+                if row is None:
+                    self.logger.warning(f"復元対象の案件が見つかりません: {case_number}")
+                    return False
+                if conn.execute("SELECT 1 FROM main.cases WHERE case_number = ?", (case_number,)).fetchone():
+                    self.logger.warning(f"同じ案件番号の案件があるため復元できません: {case_number}")
+                    return False
+                case_id = row['id']
+                values = {'is_archived': "0", 'last_modified': "?"}
+                conn.execute(
+                    f"INSERT INTO main.cases ({', '.join(ARCHIVE_CASE_COLUMNS)}) "
+                    f"SELECT {', '.join(values.get(c, c) for c in ARCHIVE_CASE_COLUMNS)} "
+                    f"FROM {ARCHIVE_SCHEMA}.cases WHERE id = ?",
+                    (datetime.now().isoformat(), case_id)
+                )
+                history_columns = ", ".join(ARCHIVE_HISTORY_COLUMNS)
+                conn.execute(
+                    f"INSERT INTO main.calculation_history ({history_columns}) "
+                    f"SELECT {history_columns} FROM {ARCHIVE_SCHEMA}.calculation_history WHERE case_id = ?",
+                    (case_id,)
+                )
                 conn.commit()
+                
+                # 2. アーカイブ側を削除
+                conn.execute("BEGIN IMMEDIATE")
+                self._remove_archived(conn, "a.id = ?", (case_id,))
             
-            self.logger.info(f"バックアップを作成しました: {backup_file}")
+            self.logger.info(f"案件をアーカイブDBから復元しました: {case_number}")
             return True
-            
         except Exception as e:
-            self.logger.error(f"バックアップ作成エラー: {e}")
+            self.logger.error(f"案件復元エラー: {case_number} - {e}")
             return False
+
+    def _load_archived_case(self, key_column: str, key: Union[str, int]) -> Optional[CaseData]:
+        """アーカイブDBから（削除済みを除く）案件を読み込み（キャッシュは使わない）"""
+        with self.get_connection() as conn:
+            if not self._attach_archive(conn):
+                return None
+            row = conn.execute(
+                f"SELECT * FROM {ARCHIVE_SCHEMA}.cases AS a WHERE {key_column} = ? AND is_archived = 0 "
+                f"AND NOT EXISTS (SELECT 1 FROM main.cases AS c WHERE c.id = a.id) "
+                f"ORDER BY archived_date DESC, id DESC LIMIT 1",
+                (key,)
+            ).fetchone()
+        return self._row_to_case_data(row) if row else None
+
+    def create_backup(self, backup_dir: Optional[str] = None, compress: Optional[bool] = None) -> bool:
+        """データベースのバックアップ作成（SQLiteバックアップAPIによるオンラインバックアップ）
+        
+        WALの内容を含む一貫したスナップショットを、他の処理を止めずに作成する。
+        backup_dir・compress を省略した場合は設定値を使用する。
+        """
+        return self._run_backup(backup_dir, compress)['success']
+
+    def create_backup_async(self, backup_dir: Optional[str] = None, compress: Optional[bool] = None,
+                            on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[threading.Thread]:
+        """バックグラウンドスレッドでバックアップを作成（UIを止めない）
+        
+        完了時に on_complete(結果) を呼び出す。結果は success / path / file_size /
+        duration_seconds / compressed / error を持つ辞書。実行中のバックアップがあれば None を返す。
+        """
+        if self._backup_lock.locked():
+            self.logger.warning("バックアップは既に実行中です")
+            return None
+        
+        def worker():
+            result = self._run_backup(backup_dir, compress)
+            if on_complete:
+                try:
+                    on_complete(result)
+                except Exception as e:
+                    self.logger.error(f"バックアップ完了通知エラー: {e}")
+        
+        thread = threading.Thread(target=worker, name="database-backup", daemon=True)
+        thread.start()
+        return thread
+
+    def _run_backup(self, backup_dir: Optional[str], compress: Optional[bool]) -> Dict[str, Any]:
+        """バックアップを実行し、backup_records に記録して結果を返す"""
+        compress = self.backup_compress if compress is None else compress
+        backup_path = Path(backup_dir) if backup_dir else self.backup_dir
+        result = {'success': False, 'path': None, 'file_size': 0, 'duration_seconds': 0.0,
+                  'compressed': compress, 'error': None}
+        
+        with self._backup_lock:
+            start = time.perf_counter()
+            partial_file = None
+            try:
+                backup_path.mkdir(parents=True, exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                backup_file = backup_path / f"{BACKUP_FILE_PREFIX}{timestamp}.db"
+                partial_file = backup_file.with_name(backup_file.name + ".part")
+                
+                self._copy_database(partial_file)
+                if compress:
+                    backup_file = backup_file.with_name(backup_file.name + ".gz")
+                    with open(partial_file, 'rb') as source, gzip.open(backup_file, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    partial_file.unlink()
+                else:
+                    partial_file.replace(backup_file)
+                
+                result.update(success=True, path=str(backup_file), file_size=backup_file.stat().st_size)
+                self.logger.info(f"バックアップを作成しました: {backup_file}")
+                self._apply_backup_retention(backup_path)
+            except Exception as e:
+                result['error'] = str(e)
+                self.logger.error(f"バックアップ作成エラー: {e}")
+                if partial_file is not None and partial_file.exists():
+                    partial_file.unlink()
+            result['duration_seconds'] = time.perf_counter() - start
+        
+        try:
+            with self.get_connection() as conn:
+                conn.execute('''
+                    INSERT INTO backup_records
+                        (backup_date, backup_path, file_size, success, duration_seconds, compressed, error_message)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    datetime.now().isoformat(), result['path'], result['file_size'], result['success'],
+                    result['duration_seconds'], result['compressed'], result['error']
+                ))
+        except Exception as e:
+            self.logger.error(f"バックアップ記録の保存エラー: {e}")
+        return result
+
+    def _copy_database(self, target: Path) -> None:
+        """バックアップAPIで target に複製（backup_pages_per_step ページごとに待機して負荷を抑える）"""
+        def throttle(status, remaining, total):
+            if remaining and self.backup_step_sleep > 0:
+                time.sleep(self.backup_step_sleep)
+        
+        # 長時間かかるためプールの接続は使わず専用の接続で実行する
+        source = sqlite3.connect(self.db_path, timeout=self.connection_timeout)
+        try:
+            destination = sqlite3.connect(target)
+            try:
+                source.backup(destination, pages=self.backup_pages_per_step, progress=throttle)
+            finally:
+                destination.close()
+        finally:
+            source.close()
+
+    def _apply_backup_retention(self, backup_path: Path) -> None:
+        """max_backup_files を超えた古いバックアップファイルを削除"""
+        if self.max_backup_files <= 0:
+            return
+        backups = sorted(
+            (p for p in backup_path.glob(f"{BACKUP_FILE_PREFIX}*") if not p.name.endswith(".part")),
+            key=lambda p: p.name, reverse=True
+        )
+        for old_backup in backups[self.max_backup_files:]:
+            try:
+                old_backup.unlink()
+                self.logger.info(f"古いバックアップを削除しました: {old_backup}")
+            except OSError as e:
+                self.logger.warning(f"古いバックアップの削除に失敗: {old_backup} - {e}")
     
     def get_statistics(self) -> Dict[str, Any]:
         """データベース統計情報を取得"""
@@ -578,25 +1553,34 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
+                # 統計ロールアップ（トリガーで更新される集計表。アーカイブDBの分は移動時に集計）から取得
+                sources = "SELECT dimension, bucket, case_count, total_amount FROM main.case_stats"
+                if self._attach_archive(conn):
+                    sources += f" UNION ALL SELECT dimension, bucket, case_count, total_amount FROM {ARCHIVE_SCHEMA}.case_stats"
+                cursor.execute(
+                    f"SELECT dimension, bucket, SUM(case_count), SUM(total_amount) FROM ({sources}) "
+                    f"GROUP BY dimension, bucket HAVING SUM(case_count) > 0"
+                )
+                rollup: Dict[str, Dict[str, Tuple[int, int]]] = {}
+                for dimension, bucket, count, amount in cursor.fetchall():
+                    rollup.setdefault(dimension, {})[bucket] = (count, amount)
+                
                 stats = {}
                 
-                # 総案件数
-                cursor.execute('SELECT COUNT(*) FROM cases WHERE is_archived = 0')
-                stats['total_cases'] = cursor.fetchone()[0]
+                # 総案件数・損害賠償額の合計
+                total = rollup.get('total', {}).get('', (0, 0))
+                stats['total_cases'], stats['total_amount'] = total
                 
                 # ステータス別件数
-                cursor.execute('SELECT status, COUNT(*) FROM cases WHERE is_archived = 0 GROUP BY status')
-                stats['status_counts'] = dict(cursor.fetchall())
+                stats['status_counts'] = {status: count for status, (count, _) in rollup.get('status', {}).items()}
                 
                 # 月別作成件数（直近12ヶ月）
-                cursor.execute('''
-                    SELECT strftime('%Y-%m', created_date) as month, COUNT(*) 
-                    FROM cases 
-                    WHERE is_archived = 0 AND created_date >= date('now', '-12 months')
-                    GROUP BY month 
-                    ORDER BY month
-                ''')
-                stats['monthly_cases'] = dict(cursor.fetchall())
+                since = (date.today().replace(day=1) - timedelta(days=365)).strftime('%Y-%m')
+                stats['monthly_cases'] = {month: count for month, (count, _) in sorted(rollup.get('month', {}).items())
+                                          if month >= since}
+                
+                # 後遺障害等級別件数（0 は等級なし）
+                stats['grade_counts'] = {int(grade): count for grade, (count, _) in rollup.get('grade', {}).items()}
                 
                 return stats
                 
@@ -629,33 +1613,18 @@ class DatabaseManager:
             }, ensure_ascii=False)
             
             with self.get_connection() as conn:
-                cursor = conn.cursor()
                 now = datetime.now().isoformat()
                 
-                # 既存テンプレートの確認
-                cursor.execute('SELECT template_id FROM case_templates WHERE name = ?', (name,))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # 更新
-                    cursor.execute('''
-                        UPDATE case_templates SET 
-                            data_json = ?,
-                            updated_at = ?
-                        WHERE name = ?
-                    ''', (template_json, now, name))
-                    template_id = existing[0]
-                    self.logger.info(f"テンプレート '{name}' を更新しました")
-                else:
-                    # 新規作成
-                    cursor.execute('''
-                        INSERT INTO case_templates (name, data_json, created_at, updated_at)
-                        VALUES (?, ?, ?, ?)
-                    ''', (name, template_json, now, now))
-                    template_id = cursor.lastrowid
-                    self.logger.info(f"新規テンプレート '{name}' を作成しました")
-                
-                conn.commit()
+                # 同名のテンプレートがあれば内容を更新（作成日時は新規作成時のみ設定）
+                template_id = conn.execute('''
+                    INSERT INTO case_templates (template_name, template_data, created_date, last_modified)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(template_name) DO UPDATE SET
+                        template_data = excluded.template_data,
+                        last_modified = excluded.last_modified
+                    RETURNING id
+                ''', (name, template_json, now, now)).fetchone()[0]
+                self.logger.info(f"テンプレート '{name}' を保存しました")
                 return template_id
                 
         except sqlite3.IntegrityError as e:
@@ -670,7 +1639,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT data_json FROM case_templates WHERE template_id = ?', (template_id,))
+                cursor.execute('SELECT template_data FROM case_templates WHERE id = ?', (template_id,))
                 row = cursor.fetchone()
                 
                 if row:
@@ -698,9 +1667,9 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT template_id, name, updated_at 
+                    SELECT id, template_name, last_modified 
                     FROM case_templates 
-                    ORDER BY updated_at DESC
+                    ORDER BY last_modified DESC
                 ''')
                 return cursor.fetchall()
                 
@@ -713,7 +1682,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('DELETE FROM case_templates WHERE template_id = ?', (template_id,))
+                cursor.execute('DELETE FROM case_templates WHERE id = ?', (template_id,))
                 
                 if cursor.rowcount > 0:
                     conn.commit()
@@ -732,11 +1701,12 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT template_id FROM case_templates WHERE name = ?', (name,))
+                cursor.execute('SELECT id FROM case_templates WHERE template_name = ?', (name,))
                 row = cursor.fetchone()
-                
-                if row:
-                    return self.load_template(row[0])
+            
+            # 接続を返却してから読み込む（プールの接続を同時に2本使わない）
+            if row:
+                return self.load_template(row[0])
                     
         except Exception as e:
             self.logger.error(f"テンプレート名検索エラー: {name} - {e}")
@@ -744,32 +1714,61 @@ class DatabaseManager:
         return None
 
     # バッチ処理とメンテナンス機能
-    def batch_save_cases(self, cases: List[CaseData]) -> Dict[str, Any]:
-        """複数案件の一括保存"""
+    def batch_save_cases(self, cases: List[CaseData], chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """複数案件の一括保存（案件番号が既存なら更新）
+        
+        chunk_size 件ごとに1トランザクションで executemany により書き込む。チャンク内で
+        エラーが発生した場合はそのチャンクを1件ずつ（SAVEPOINT 単位で）保存し直し、
+        失敗した行のみを row_errors（添字・案件番号・エラー内容）に記録する。
+        """
+        chunk_size = chunk_size or self.batch_chunk_size
         results = {
             'success_count': 0,
             'failed_count': 0,
-            'errors': []
+            'errors': [],
+            'row_errors': []
         }
         
+        def record_error(index: int, case_number: Any, message: str):
+            results['failed_count'] += 1
+            results['errors'].append(f"{case_number}: {message}")
+            results['row_errors'].append({'index': index, 'case_number': case_number, 'error': message})
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                for case_data in cases:
+            for chunk_start in range(0, len(cases), chunk_size):
+                rows = []
+                for index in range(chunk_start, min(chunk_start + chunk_size, len(cases))):
+                    case_data = cases[index]
+                    if not case_data or not case_data.case_number:
+                        record_error(index, getattr(case_data, 'case_number', None), "案件番号が空です")
+                        continue
                     try:
-                        # 個別の保存処理（トランザクション内で実行）
-                        if self._save_single_case_in_transaction(cursor, case_data):
-                            results['success_count'] += 1
-                        else:
-                            results['failed_count'] += 1
-                            results['errors'].append(f"保存失敗: {case_data.case_number}")
+                        case_data.last_modified = datetime.now()
+                        rows.append((index, case_data, self._case_row_values(case_data)))
                     except Exception as e:
-                        results['failed_count'] += 1
-                        results['errors'].append(f"{case_data.case_number}: {str(e)}")
+                        record_error(index, case_data.case_number, str(e))
                 
-                conn.commit()
-                self.logger.info(f"バッチ保存完了: 成功{results['success_count']}件、失敗{results['failed_count']}件")
+                if not rows:
+                    continue
+                for _, case_data, _ in rows:
+                    self._case_cache.invalidate(case_data.case_number)
+                try:
+                    with self.get_connection() as conn:
+                        conn.executemany(UPSERT_CASE_SQL, [values for _, _, values in rows])
+                    results['success_count'] += len(rows)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"チャンクの一括保存に失敗したため1件ずつ保存します: {e}")
+                    with self.get_connection() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute("BEGIN")
+                        for index, case_data, values in rows:
+                            try:
+                                if self._save_single_case_in_transaction(cursor, case_data, values):
+                                    results['success_count'] += 1
+                            except sqlite3.Error as row_error:
+                                record_error(index, case_data.case_number, str(row_error))
+            
+            self.logger.info(f"バッチ保存完了: 成功{results['success_count']}件、失敗{results['failed_count']}件")
                 
         except Exception as e:
             self.logger.error(f"バッチ保存エラー: {e}")
@@ -777,12 +1776,150 @@ class DatabaseManager:
         
         return results
 
-    def _save_single_case_in_transaction(self, cursor, case_data: CaseData) -> bool:
-        """トランザクション内での単一案件保存（内部使用）"""
-        # save_caseメソッドのロジックをトランザクション用に分離
-        # 実装詳細は省略（必要に応じて追加）
+    def save_case_changes(self, changes: List[Tuple[CaseData, Optional[Iterable[str]]]]) -> Dict[str, Any]:
+        """複数案件の変更を1トランザクションで保存（変更のあった項目の列のみ書き換え）
+        
+        changes は (案件データ, 変更された項目名) の並び。項目名は CASE_SECTION_COLUMNS の
+        いずれかで、None の場合（またはDBに未保存・アーカイブ済みの案件）は全体を保存する。
+        status・last_modified・検索用列は常に更新する。失敗した案件は row_errors に記録する。
+        """
+        results = {'success_count': 0, 'failed_count': 0, 'sections_written': 0, 'row_errors': []}
+        if not changes:
+            return results
+        saved = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            for index, (case_data, sections) in enumerate(changes):
+                try:
+                    case_data.last_modified = datetime.now()
+                    case_id = None
+                    if sections is not None:
+                        columns = [c for c in CASE_SECTION_COLUMNS if c in set(sections)]
+                        assignments = ['last_modified', 'status', *SEARCH_COLUMNS, *columns]
+                        values = [case_data.last_modified.isoformat(), case_data.status or '作成中',
+                                  *self._search_column_values(case_data),
+                                  *(self._case_section_value(case_data, c) for c in columns)]
+                        cursor.execute("SAVEPOINT save_case")
+                        try:
+                            row = cursor.execute(
+                                f"UPDATE cases SET {', '.join(f'{c} = ?' for c in assignments)} "
+                                f"WHERE case_number = ? AND is_archived = 0 RETURNING id",
+                                (*values, case_data.case_number)
+                            ).fetchone()
+                        except sqlite3.Error:
+                            cursor.execute("ROLLBACK TO SAVEPOINT save_case")
+                            cursor.execute("RELEASE SAVEPOINT save_case")
+                            raise
+                        cursor.execute("RELEASE SAVEPOINT save_case")
+                        if row is not None:
+                            case_id = row[0]
+                            results['sections_written'] += len(columns)
+                    if case_id is None:
+                        self._save_single_case_in_transaction(cursor, case_data)
+                        results['sections_written'] += len(CASE_SECTION_COLUMNS)
+                    results['success_count'] += 1
+                    saved.append((case_data, case_id))
+                except sqlite3.Error as e:
+                    results['failed_count'] += 1
+                    results['row_errors'].append({'index': index, 'case_number': case_data.case_number, 'error': str(e)})
+        
+        for case_data, case_id in saved:
+            if case_id is None:
+                self._case_cache.invalidate(case_data.case_number)
+            else:
+                self._case_cache.put(case_id, case_data, case_data.last_modified.isoformat(), None)
+        self.logger.debug(f"案件の変更を保存しました: {results['success_count']}件（{results['sections_written']}項目）")
+        return results
+
+    def _case_section_value(self, case_data: CaseData, column: str) -> Any:
+        """CASE_SECTION_COLUMNS の列に保存する値"""
+        if column == 'notes':
+            return case_data.notes or ''
+        value = getattr(case_data, column)
+        if column in ('custom_fields', 'calculation_results'):
+            value = value or {}
+        return self._safe_json_dumps(value)
+
+    def _save_single_case_in_transaction(self, cursor: sqlite3.Cursor, case_data: CaseData,
+                                         values: Optional[Tuple[Any, ...]] = None) -> bool:
+        """トランザクション内での単一案件保存（内部使用）
+        
+        SAVEPOINT 内で書き込み、失敗した場合はこの案件の変更のみを取り消して例外を再送する。
+        """
+        if values is None:
+            values = self._case_row_values(case_data)
+        cursor.execute("SAVEPOINT save_case")
+        try:
+            cursor.execute(UPSERT_CASE_SQL, values)
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT save_case")
+            cursor.execute("RELEASE SAVEPOINT save_case")
+            raise
+        cursor.execute("RELEASE SAVEPOINT save_case")
         return True
 
+    def migrate_payloads(self, encoding: Optional[str] = None, chunk_size: Optional[int] = None,
+                         progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """既存案件のJSON列を指定の保存形式に変換（オンライン移行）
+        
+        id 順に chunk_size 件ずつ短いトランザクションで書き換えるため、移行中も
+        他の読み書きを妨げない。既に目的の形式の値は書き換えない。
+        progress を指定すると変換済み件数を引数にチャンクごとに呼び出す。
+        """
+        encoding = payload_codec.validate_encoding(encoding or self.payload_encoding)
+        chunk_size = chunk_size or self.batch_chunk_size
+        columns = payload_codec.PAYLOAD_COLUMNS
+        if self.fulltext_enabled and encoding != payload_codec.ENCODING_JSON:
+            self._install_fulltext_triggers(compressed=True)
+        report = {'encoding': encoding, 'rows_scanned': 0, 'rows_converted': 0, 'errors': [],
+                  'before_bytes': 0, 'after_bytes': 0}
+        last_id = 0
+        
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    f"SELECT id, {', '.join(columns)} FROM cases WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for row in rows:
+                    report['rows_scanned'] += 1
+                    before = [row[c] for c in columns]
+                    try:
+                        after = [
+                            value if value is None or payload_codec.is_current(value, encoding)
+                            else payload_codec.encode(payload_codec.decode(value), encoding)
+                            for value in before
+                        ]
+                    except Exception as e:
+                        report['errors'].append({'id': row['id'], 'error': str(e)})
+                        after = before
+                    report['before_bytes'] += sum(payload_codec.encoded_size(v) for v in before)
+                    report['after_bytes'] += sum(payload_codec.encoded_size(v) for v in after)
+                    if after != before:
+                        updates.append((*after, row['id']))
+                if updates:
+                    conn.executemany(
+                        f"UPDATE cases SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?", updates
+                    )
+                    report['rows_converted'] += len(updates)
+                last_id = rows[-1]['id']
+            if progress:
+                progress(report['rows_scanned'])
+        
+        if (self.fulltext_enabled and encoding == payload_codec.ENCODING_JSON
+                and self.payload_encoding == payload_codec.ENCODING_JSON and not report['errors']):
+            # 圧縮形式の案件が無くなったので外部ツールからも更新できるトリガーに戻す
+            self._install_fulltext_triggers(compressed=False)
+        self.logger.info(
+            f"案件データの保存形式を変換しました（{encoding}）: {report['rows_converted']}件、"
+            f"{report['before_bytes']:,} → {report['after_bytes']:,} バイト"
+        )
+        return report
+
     def optimize_database(self) -> bool:
         """データベースの最適化とメンテナンス"""
         try:
@@ -819,17 +1956,35 @@ class DatabaseManager:
                 # SQLiteバージョン
                 cursor.execute('SELECT sqlite_version()')
                 info['sqlite_version'] = cursor.fetchone()[0]
+                info['schema_version'] = schema_migrations.get_version(conn)
                 
                 # テーブル情報
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
                 info['tables'] = [row[0] for row in cursor.fetchall()]
                 
-                # 各テーブルの行数
+                # 各テーブルの行数（cases と全文検索の表は統計ロールアップの全行数で代替）
+                cursor.execute("SELECT case_count FROM case_stats WHERE dimension = ? AND bucket = ''",
+                               (STATS_ALL_ROWS,))
+                all_rows = cursor.fetchone()
                 table_counts = {}
                 for table in info['tables']:
+                    if table in ('cases', 'cases_fts', 'cases_fts_content', 'cases_fts_docsize'):
+                        table_counts[table] = all_rows[0] if all_rows else 0
+                        continue
                     cursor.execute(f'SELECT COUNT(*) FROM {table}')
                     table_counts[table] = cursor.fetchone()[0]
                 info['table_counts'] = table_counts
+                info['connection_pool'] = self._pool.get_statistics()
+                if self._attach_archive(conn):
+                    cursor.execute(f"SELECT case_count FROM {ARCHIVE_SCHEMA}.case_stats "
+                                   f"WHERE dimension = ? AND bucket = ''", (STATS_ALL_ROWS,))
+                    archived_rows = cursor.fetchone()
+                    info['archive'] = {
+                        'path': str(self.archive_path),
+                        'file_size': self.archive_path.stat().st_size,
+                        'cases': archived_rows[0] if archived_rows else 0,
+                    }
+                info['case_cache'] = self._case_cache.get_statistics()
                 
                 return info
                 
@@ -867,11 +2022,34 @@ class DatabaseManager:
                     health['issues'].append(f"孤立した計算履歴: {orphaned_calculations}件")
                     health['recommendations'].append("孤立レコードのクリーンアップを実行してください")
                 
+                # 統計ロールアップの照合（同じ接続で行い、プールから2本目を借りない）
+                statistics_differences = self._statistics_differences(conn)
+                if statistics_differences:
+                    health['issues'].append(f"統計ロールアップの不一致: {len(statistics_differences)}件")
+                    health['recommendations'].append("統計ロールアップを再作成してください（rebuild_statistics）")
+                
                 # ファイルサイズチェック
                 file_size_mb = self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
                 if file_size_mb > 100:  # 100MB以上の場合
                     health['recommendations'].append(f"データベースサイズが大きいです({file_size_mb:.1f}MB)。最適化を検討してください")
                 
+                # 遅いクエリ（全件走査はインデックス不足の可能性）
+                if self.query_log is not None:
+                    slow = self.query_log.get_slow_statements()
+                    health['slow_queries'] = [
+                        {key: s[key] for key in ('fingerprint', 'count', 'slow_count', 'p95_ms', 'max_ms',
+                                                 'full_scans', 'temp_btree', 'plan')}
+                        for s in slow[:10]
+                    ]
+                    for statement in slow:
+                        if statement['full_scans']:
+                            tables = ', '.join(statement['full_scans'])
+                            health['issues'].append(
+                                f"全件走査で遅いクエリ（{tables}、最大{statement['max_ms']:.0f}ms）: "
+                                f"{statement['fingerprint'][:120]}"
+                            )
+                            health['recommendations'].append(f"{tables} の検索条件に使う列へのインデックス追加を検討してください")
+                
                 return health
                 
         except Exception as e:
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件データの保存形式の移行ツール
+
+既存の cases の JSON列を指定の保存形式（json / zlib-json / msgpack-zlib）に
+変換し、変換前後のサイズを表示する。アプリケーション起動中でも実行できる
+（チャンクごとの短いトランザクションで書き換える）。新しく保存する案件にも
+同じ形式を使うには、設定 database.payload_encoding を合わせて変更すること。
+
+    python database/migrate_payloads.py --encoding zlib-json
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config.app_config import get_config
+from database.db_manager import DatabaseManager
+from database.payload_codec import ENCODINGS, ENCODING_ZLIB_JSON
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="案件データの保存形式の移行")
+    parser.add_argument('--db', type=Path, help="データベースファイル（省略時は設定値）")
+    parser.add_argument('--encoding', choices=ENCODINGS, default=ENCODING_ZLIB_JSON, help="変換後の保存形式")
+    parser.add_argument('--chunk-size', type=int, default=500, help="1トランザクションで変換する件数")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    db_manager = DatabaseManager(str(args.db) if args.db else get_config().database.file_path)
+    try:
+        report = db_manager.migrate_payloads(
+            args.encoding, args.chunk_size,
+            progress=lambda scanned: print(f"\r{scanned:,}件を処理しました", end="", flush=True)
+        )
+    finally:
+        db_manager.close()
+
+    print()
+    before, after = report['before_bytes'], report['after_bytes']
+    print(f"保存形式:     {report['encoding']}")
+    print(f"対象件数:     {report['rows_scanned']:,}件（変換 {report['rows_converted']:,}件）")
+    print(f"データサイズ: {before:,} → {after:,} バイト"
+          + (f"（{after / before:.1%}）" if before else ""))
+    for error in report['errors']:
+        print(f"  変換できませんでした: id={error['id']} {error['error']}")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スキーマのバージョン管理（PRAGMA user_version）
+
+マイグレーションは version を 1 からの連番で定義し、適用済みのバージョンを
+データベースの PRAGMA user_version に記録する。起動時は user_version を読んで
+最新なら何もしない。未適用のものがあれば BEGIN IMMEDIATE で書き込みロックを
+取って読み直し（別のプロセスが先に適用した場合は何もしない）、未適用の
+マイグレーションと user_version の更新を1トランザクションで行う。
+途中で失敗した場合はすべて取り消され、バージョンも元のままとなる。
+
+マイグレーションの中では executescript（実行前に COMMIT する）を使わず、
+文ごとに execute すること。適用済みのマイグレーションは書き換えず、
+スキーマの変更は新しいバージョンとして末尾に追加する。
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from utils.error_handler import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """スキーマの1バージョン分の変更"""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def get_version(conn: sqlite3.Connection, schema: str = "main") -> int:
+    """データベース（schema は ATTACH したデータベースの名前）に記録されているスキーマのバージョン"""
+    return conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+
+
+def latest_version(migrations: Sequence[Migration]) -> int:
+    """マイグレーションをすべて適用した後のバージョン（連番でなければ DatabaseError）"""
+    for expected, migration in enumerate(migrations, 1):
+        if migration.version != expected:
+            raise DatabaseError(
+                f"マイグレーションのバージョンが連番ではありません: {migration.version}（期待値 {expected}）",
+                user_message="データベースの移行定義に誤りがあります。",
+                context={'version': migration.version, 'expected': expected}
+            )
+    return len(migrations)
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration],
+            current: Optional[int] = None, schema: str = "main") -> List[int]:
+    """未適用のマイグレーションを1トランザクションで適用し、適用したバージョンを返す
+
+    current に読み取り済みのバージョンを渡すと、最新の場合は問い合わせずに終了する。
+    schema に ATTACH したデータベースの名前を渡すと、そのデータベースのバージョンで管理する。
+    """
+    latest = latest_version(migrations)
+    if current is None:
+        current = get_version(conn, schema)
+    if current == latest:
+        return []
+    if current > latest:
+        raise DatabaseError(
+            f"データベースのスキーマ（バージョン {current}）がアプリケーション（{latest}）より新しいです",
+            user_message="新しいバージョンのアプリケーションで作成されたデータベースです。アプリケーションを更新してください。",
+            context={'schema': schema, 'schema_version': current, 'supported_version': latest}
+        )
+
+    applied: List[int] = []
+    version = current
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # ロックを取るまでの間に別のプロセスが適用している場合がある
+        version = get_version(conn, schema)
+        for migration in migrations[version:]:
+            logger.info(f"スキーマを移行します（{schema}）: バージョン {migration.version}（{migration.description}）")
+            migration.apply(conn)
+            applied.append(migration.version)
+        if applied:
+            conn.execute(f"PRAGMA {schema}.user_version = {applied[-1]}")
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        failed = version + len(applied) + 1
+        raise DatabaseError(
+            f"スキーマの移行に失敗しました（バージョン {failed}）: {e}",
+            user_message="データベースの更新に失敗しました。変更は取り消されています。",
+            context={'schema': schema, 'schema_version': version, 'failed_version': failed, 'original_error': str(e)}
+        ) from e
+    except BaseException:
+        conn.rollback()
+        raise
+    if applied:
+        logger.info(f"スキーマ（{schema}）をバージョン {applied[-1]} に更新しました")
+    return applied
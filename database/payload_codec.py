@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件データ（JSON列）の圧縮エンコード
+
+cases の person_info / accident_info / medical_info / income_info /
+custom_fields / calculation_results を、ヘッダ付きのバイナリ（BLOB）として
+保存するためのコーデック。形式は次のとおり。
+
+    b'\\x00CP' + 辞書バージョン(1バイト) + 直列化形式(1バイト) + zlib圧縮データ
+
+zlib の圧縮には、本システムの項目名・計算詳細の定型文から作成した
+プリセット辞書を使用する（短いペイロードでも圧縮が効く）。辞書は
+バージョンごとに固定し、内容を変える場合は新しいバージョンを追加する。
+先頭がヘッダでない値は従来のJSON文字列として読み込む。
+"""
+
+import json
+import zlib
+from typing import Any, Optional, Union
+
+from utils.error_handler import DatabaseError, ConfigurationError
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# 保存形式（設定値 database.payload_encoding）
+ENCODING_JSON = "json"              # 従来のJSON文字列（TEXT）
+ENCODING_ZLIB_JSON = "zlib-json"    # コンパクトJSON + zlib（辞書付き）
+ENCODING_MSGPACK = "msgpack-zlib"   # MessagePack + zlib（辞書付き、msgpack が必要）
+ENCODINGS = (ENCODING_JSON, ENCODING_ZLIB_JSON, ENCODING_MSGPACK)
+
+# 圧縮対象の列
+PAYLOAD_COLUMNS = ('person_info', 'accident_info', 'medical_info', 'income_info',
+                   'custom_fields', 'calculation_results')
+
+MAGIC = b"\x00CP"
+HEADER_SIZE = len(MAGIC) + 2
+
+_FORMAT_JSON = 1
+_FORMAT_MSGPACK = 2
+
+# プリセット辞書 v1（変更不可。zlib は辞書の末尾ほど優先して参照する）
+# 保存時のコンパクトJSON（to_dict() のキー順、計算結果は項目の順）の定型部分をそのまま並べる
+_DICTIONARY_V1_PHRASES = (
+    # 入力値（職業・事故類型など）
+    '給与所得者', '事業所得者', '学生・生徒等', '無職・その他', '幼児・児童', '自営業', 'パート', '無職',
+    '出会い頭', '右直', '歩行者', '追突', '級 神経症状',
+    # 計算できなかった場合
+    '","calculation_details":"計算エラー: ', '級は対応範囲外です',
+    '","legal_basis":"","notes":"等級を確認してください"}', '","legal_basis":"","notes":"計算できませんでした"}',
+    '家事従事者については全年齢平均の女性労働者の平均賃金を使用',
+    # 案件情報（to_dict のキー順）
+    '{"name":"', '","age":', ',"gender":"女性', ',"gender":"男性', '","occupation":"家事従事者', '","occupation":"会社員',
+    '","annual_income":"', '","fault_percentage":',
+    '{"accident_date":"', '","symptom_fixed_date":null,"location":"',
+    '","weather":"","road_condition":"","accident_type":"', '","police_report_number":""}',
+    '{"hospital_months":', ',"outpatient_months":', ',"actual_outpatient_days":', ',"is_whiplash":true',
+    ',"is_whiplash":false,"disability_grade":', ',"disability_details":"', '","medical_expenses":"',
+    '","transportation_costs":"', '","nursing_costs":"',
+    '{"lost_work_days":', ',"daily_income":"', '","loss_period_years":', ',"retirement_age":67,"basic_annual_income":"',
+    '","bonus_ratio":0.0}',
+    # 計算結果（項目の順。計算詳細の改行は JSON のエスケープ表記）
+    '{"hospitalization":{"item_name":"入通院慰謝料","amount":"', '","calculation_details":"入院期間: ',
+    'ヶ月\\n通院期間: ', 'ヶ月\\n実通院日数: ', '日\\n適用表: 赤い本別表II（むちうち症等）\\n基準額: ',
+    '日\\n適用表: 赤い本別表I\\n基準額: ', '万円","legal_basis":"民法第709条、赤い本（法定利率5%・2020年3月以前の事故）',
+    '万円","legal_basis":"民法第709条、赤い本2023年版', '","notes":"実通院日数が少ない場合は減額調整を行っています"},',
+    '"disability":{"item_name":"後遺障害慰謝料","amount":"', '","calculation_details":"後遺障害等級: 第',
+    '級\\n弁護士基準慰謝料: ', '","calculation_details":"後遺障害等級の認定なし","legal_basis":"","notes":""},',
+    '"lost_income":{"item_name":"休業損害","amount":"', '","calculation_details":"休業日数の入力なし","legal_basis":"","notes":""},',
+    '","calculation_details":"休業日数: ', '日\\n日額基礎収入: ', '円\\n計算式: ', '円 × ',
+    '日","legal_basis":"民法第709条","notes":"事故前3ヶ月の実収入を基に算定"},',
+    '"future_income_loss":{"item_name":"後遺障害逸失利益","amount":"',
+    '","calculation_details":"後遺障害等級の認定なし、または労働能力喪失期間の入力なし","legal_basis":"","notes":""},',
+    '","calculation_details":"基礎収入: ', '円/年\\n労働能力喪失率: ', '%（第', '級）\\n労働能力喪失期間: ',
+    '年\\nライプニッツ係数: ', '\\n計算式: ', '% × ', ' = ', '円","legal_basis":"民法第709条、最高裁判例","notes":"',
+    '"medical_expenses":{"item_name":"治療費・医療関係費","amount":"', '","calculation_details":"治療費: ',
+    '円\\n交通費: ', '円\\n看護費: ', '円","legal_basis":"民法第709条","notes":"実際に支出した費用"},',
+    '"summary":{"item_name":"総合計","amount":"', '","calculation_details":"損害合計（過失相殺前）: ',
+    '円\\n被害者過失割合: ', '%\\n損害合計（過失相殺後）: ', '円\\n弁護士費用（概算）: ', '円\\n最終支払見込額: ',
+    '円","legal_basis":"民法第709条、第722条","notes":"弁護士費用は概算です。実際の費用は事務所の基準により異なります"}}',
+)
+
+DICTIONARIES = {
+    1: "".join(_DICTIONARY_V1_PHRASES).encode('utf-8'),
+}
+CURRENT_DICTIONARY_VERSION = 1
+
+
+def _compress(data: bytes, version: int) -> bytes:
+    compressor = zlib.compressobj(level=9, zdict=DICTIONARIES[version])
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(data: bytes, version: int) -> bytes:
+    try:
+        dictionary = DICTIONARIES[version]
+    except KeyError:
+        raise DatabaseError(
+            f"未対応の圧縮辞書バージョンです: {version}",
+            user_message="案件データの形式が新しいバージョンのものです。アプリケーションを更新してください。"
+        ) from None
+    decompressor = zlib.decompressobj(zdict=dictionary)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def validate_encoding(encoding: str) -> str:
+    """保存形式の設定値を検証"""
+    if encoding not in ENCODINGS:
+        raise ConfigurationError(
+            f"未対応の保存形式です: {encoding}",
+            user_message=f"database.payload_encoding には {', '.join(ENCODINGS)} のいずれかを指定してください。"
+        )
+    if encoding == ENCODING_MSGPACK and not MSGPACK_AVAILABLE:
+        raise ConfigurationError(
+            "msgpack がインストールされていません",
+            user_message="保存形式 msgpack-zlib を使用するには msgpack をインストールしてください。"
+        )
+    return encoding
+
+
+def is_encoded(value: Any) -> bool:
+    """圧縮エンコードされた値か"""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:len(MAGIC)]) == MAGIC
+
+
+def is_current(value: Any, encoding: str) -> bool:
+    """保存値が既に指定の保存形式（現行の辞書バージョン）か"""
+    if encoding == ENCODING_JSON:
+        return isinstance(value, str)
+    if not is_encoded(value):
+        return False
+    fmt = _FORMAT_MSGPACK if encoding == ENCODING_MSGPACK else _FORMAT_JSON
+    header = bytes(value[len(MAGIC):HEADER_SIZE])
+    return header == bytes((CURRENT_DICTIONARY_VERSION, fmt))
+
+
+def encode(obj: Any, encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """値を保存形式に変換（json は従来どおりの文字列、それ以外はヘッダ付きBLOB）
+
+    日付・Decimal など JSON で表せない値は従来と同じく文字列化する。
+    """
+    if encoding == ENCODING_JSON:
+        return json.dumps(obj, ensure_ascii=False, default=str)
+    validate_encoding(encoding)
+    if encoding == ENCODING_MSGPACK:
+        serialized, fmt = msgpack.packb(obj, default=str, use_bin_type=True), _FORMAT_MSGPACK
+    else:
+        serialized = json.dumps(obj, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+        fmt = _FORMAT_JSON
+    version = CURRENT_DICTIONARY_VERSION
+    return MAGIC + bytes((version, fmt)) + _compress(serialized, version)
+
+
+def decode(value: Union[str, bytes, None]) -> Any:
+    """保存値を読み込み（従来のJSON文字列・圧縮形式の両方に対応、空値は None）"""
+    if value is None or value == "" or value == b"":
+        return None
+    if not is_encoded(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).decode('utf-8')
+        return json.loads(value)
+
+    value = bytes(value)
+    version, fmt = value[len(MAGIC)], value[len(MAGIC) + 1]
+    data = _decompress(value[HEADER_SIZE:], version)
+    if fmt == _FORMAT_JSON:
+        return json.loads(data.decode('utf-8'))
+    if fmt == _FORMAT_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise DatabaseError(
+                "msgpack 形式の案件データを読み込むには msgpack が必要です",
+                user_message="案件データの読み込みに必要なライブラリ（msgpack）がインストールされていません。"
+            )
+        return msgpack.unpackb(data, raw=False)
+    raise DatabaseError(
+        f"未対応の直列化形式です: {fmt}",
+        user_message="案件データの形式を認識できません。"
+    )
+
+
+def to_json_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """保存値をJSON文字列に変換（SQL関数 payload_json の実装。読めない値は None）
+
+    全文検索トリガーや移行SQLが json_extract で圧縮形式の列を参照するために使う。
+    """
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        return json.dumps(decode(value), ensure_ascii=False, default=str)
+    except Exception:
+        return None
+
+
+def encoded_size(value: Union[str, bytes, None]) -> int:
+    """保存値のバイト数"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(value)
+
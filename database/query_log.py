@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL文ごとの実行時間の記録（スロークエリログ）
+
+SQL文はリテラル・IN句の要素数・空白の違いを除いた形（フィンガープリント）に
+まとめ、形ごとに実行回数・合計時間・最大時間・直近の実行時間の95パーセンタイルを
+集計する。実行時間は execute から結果を読み終えるまで（または次の execute・
+close まで）の時間で、結果の読み込みにかかった時間を含む。
+
+slow_threshold_ms を超えた文は、その接続で EXPLAIN QUERY PLAN を取得して
+（形ごとに最初の1回）、インデックスを使わない表の全件走査（SCAN）と
+並べ替え用の一時B木の有無を記録し、直近の遅い文の一覧に追加する。
+
+接続は TimedConnection（sqlite3.connect の factory に指定）として作成し、
+query_log 属性に QueryLog を設定する。
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+DEFAULT_SLOW_THRESHOLD_MS = 100.0
+DEFAULT_SAMPLE_SIZE = 256
+DEFAULT_MAX_FINGERPRINTS = 500
+RECENT_SLOW_SIZE = 50
+
+# EXPLAIN QUERY PLAN を取得する文（DDL・PRAGMA・トランザクション制御は対象外）
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"(?::\w+|\?\d*)")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(\(\?\+\))(?:\s*,\s*\(\?\+\))+")
+_WHITESPACE = re.compile(r"\s+")
+# インデックスを使わない表の全件走査（"SCAN cases" / "SCAN c"。仮想表・インデックス走査・sqlite_master などを除く）
+_FULL_SCAN = re.compile(r"^SCAN (?!sqlite_)(\S+)(?: AS \S+)?$")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """リテラル・プレースホルダー・空白を正規化したSQL文の形"""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?+)", text)
+    text = _VALUES_LIST.sub(r"\1, ...", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def analyze_plan(plan: List[str]) -> Dict[str, Any]:
+    """EXPLAIN QUERY PLAN の各行から、全件走査する表と一時B木の使用を取り出す"""
+    full_scans = []
+    for detail in plan:
+        match = _FULL_SCAN.match(detail)
+        if match:
+            full_scans.append(match.group(1))
+    return {
+        'full_scans': full_scans,
+        'temp_btree': any('USE TEMP B-TREE' in detail for detail in plan),
+    }
+
+
+class QueryLog:
+    """SQL文の形ごとの実行時間の集計とスロークエリの記録（スレッドセーフ）
+
+    on_slow を指定すると、遅い文を記録するたびにその内容（辞書）を引数に呼び出す。
+    """
+
+    def __init__(self, slow_threshold_ms: float = DEFAULT_SLOW_THRESHOLD_MS,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE, max_fingerprints: int = DEFAULT_MAX_FINGERPRINTS,
+                 on_slow: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.slow_threshold = slow_threshold_ms / 1000.0
+        self.sample_size = sample_size
+        self.max_fingerprints = max_fingerprints
+        self.on_slow = on_slow
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._statements: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._recent_slow: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SLOW_SIZE)
+
+    def record(self, sql: str, parameters: Any, elapsed: float, conn: Optional[sqlite3.Connection] = None):
+        """実行した文を記録（遅い文は conn で実行計画を取得）"""
+        shape = fingerprint(sql)
+        with self._lock:
+            stats = self._statements.get(shape)
+            if stats is None:
+                stats = {'count': 0, 'total': 0.0, 'max': 0.0, 'slow_count': 0,
+                         'samples': deque(maxlen=self.sample_size), 'plan': None}
+                self._statements[shape] = stats
+                while len(self._statements) > self.max_fingerprints:
+                    self._statements.popitem(last=False)
+            else:
+                self._statements.move_to_end(shape)
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['samples'].append(elapsed)
+            if elapsed < self.slow_threshold:
+                return
+            stats['slow_count'] += 1
+            plan = stats['plan']
+
+        if plan is None and conn is not None:
+            plan = self._explain(conn, sql, parameters)
+            with self._lock:
+                stats['plan'] = plan
+        entry = {
+            'fingerprint': shape,
+            'elapsed_ms': elapsed * 1000.0,
+            'timestamp': datetime.now().isoformat(),
+            'plan': plan['plan'] if plan else [],
+            'full_scans': plan['full_scans'] if plan else [],
+            'temp_btree': plan['temp_btree'] if plan else False,
+        }
+        with self._lock:
+            self._recent_slow.append(entry)
+        self.logger.warning(
+            f"遅いクエリ（{entry['elapsed_ms']:.1f}ms）: {shape[:200]}"
+            + (f" 全件走査: {', '.join(entry['full_scans'])}" if entry['full_scans'] else "")
+        )
+        if self.on_slow is not None:
+            try:
+                self.on_slow(entry)
+            except Exception as e:
+                self.logger.error(f"スロークエリの通知エラー: {e}")
+
+    def _explain(self, conn: sqlite3.Connection, sql: str, parameters: Any) -> Optional[Dict[str, Any]]:
+        """EXPLAIN QUERY PLAN の結果（取得できない文は None）"""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return None
+        try:
+            # 記録対象にならないよう計測しないカーソルで実行する
+            cursor = sqlite3.Cursor(conn)
+            plan = [row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters or ())]
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.debug(f"実行計画を取得できません: {e}")
+            return None
+        return {'plan': plan, **analyze_plan(plan)}
+
+    @staticmethod
+    def _percentile(samples: List[float], ratio: float) -> float:
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    def get_statistics(self, limit: Optional[int] = 20) -> Dict[str, Any]:
+        """合計時間の長い順の文ごとの統計と、直近の遅い文の一覧（時間はミリ秒）"""
+        with self._lock:
+            snapshot = [(shape, dict(stats), list(stats['samples'])) for shape, stats in self._statements.items()]
+            recent = list(self._recent_slow)
+        statements = []
+        for shape, stats, samples in snapshot:
+            plan = stats['plan'] or {}
+            statements.append({
+                'fingerprint': shape,
+                'count': stats['count'],
+                'total_ms': stats['total'] * 1000.0,
+                'avg_ms': stats['total'] * 1000.0 / stats['count'],
+                'p95_ms': self._percentile(samples, 0.95) * 1000.0,
+                'max_ms': stats['max'] * 1000.0,
+                'slow_count': stats['slow_count'],
+                'full_scans': plan.get('full_scans', []),
+                'temp_btree': plan.get('temp_btree', False),
+                'plan': plan.get('plan', []),
+            })
+        statements.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {
+            'slow_threshold_ms': self.slow_threshold * 1000.0,
+            'statement_count': sum(s['count'] for s in statements),
+            'fingerprint_count': len(statements),
+            'statements': statements[:limit] if limit else statements,
+            'recent_slow': recent,
+        }
+
+    def get_slow_statements(self) -> List[Dict[str, Any]]:
+        """遅い実行があった文（全件走査を含むものを先に、合計時間の長い順）"""
+        slow = [s for s in self.get_statistics(limit=None)['statements'] if s['slow_count']]
+        slow.sort(key=lambda s: (not s['full_scans'], -s['total_ms']))
+        return slow
+
+    def reset(self):
+        """集計をすべて破棄"""
+        with self._lock:
+            self._statements.clear()
+            self._recent_slow.clear()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """実行時間を接続の query_log に記録するカーソル"""
+
+    _statement = None
+    _elapsed = 0.0
+
+    def _finish(self, explain: bool = True):
+        statement, self._statement = self._statement, None
+        if statement is None:
+            return
+        query_log = getattr(self.connection, 'query_log', None)
+        if query_log is not None:
+            query_log.record(statement[0], statement[1], self._elapsed, self.connection if explain else None)
+
+    def _timed(self, func: Callable[..., Any], *args) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._elapsed = 0.0
+        self._statement = (sql, parameters)
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._elapsed = 0.0
+        # 実行計画は取得しない（パラメーターの組ごとに実行されるため）
+        self._statement = (sql, None)
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # 結果を読み切らずに破棄されたカーソル（fetchone で1行だけ読んだ場合など）。
+        # 接続は既にプールに返され別のスレッドが使用している場合があるため、実行計画は取得しない
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass
+
+
+class TimedConnection(sqlite3.Connection):
+    """TimedCursor を使う接続（sqlite3.connect の factory に指定する）"""
+
+    query_log: Optional[QueryLog] = None
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -292,3 +292,350 @@ class TestCompensationEngine:
         assert result1['total_compensation'] == result2['total_compensation']
         assert result1['pain_and_suffering'] == result2['pain_and_suffering']
         assert result1['lost_income'] == result2['lost_income']
+
+
+class TestCalculateBatch:
+    """calculate_batch（列指向一括計算）のテスト"""
+
+    def _make_cases(self):
+        """代表的な入力パターンの案件を作成"""
+        cases = []
+        patterns = [
+            # (入院, 通院, 実通院日数, むちうち, 等級, 休業日数, 日額, 喪失期間, 年収, 職業, 過失)
+            (0, 6, 90, False, 0, 30, 10000, 0, 0, "会社員", 0),
+            (1, 3, 10, True, 14, 0, 0, 5, 4000000, "会社員", 10),
+            (2, 25, 200, False, 9, 60, 15000, 30, 6000000, "会社員", 12.5),
+            (0, 0, 0, False, 5, 0, 0, 70, 0, "家事従事者", 30),
+            (12, 3, 20, False, 1, 100, 20000, 67, 12345678, "会社員", 100),
+            (0, 0, 0, False, 0, 0, 0, 0, 0, "", 0),
+        ]
+        for (hospital, outpatient, days, whiplash, grade, lost_days, daily,
+             period, annual, occupation, fault) in patterns:
+            case = CaseData()
+            case.medical_info.hospital_months = hospital
+            case.medical_info.outpatient_months = outpatient
+            case.medical_info.actual_outpatient_days = days
+            case.medical_info.is_whiplash = whiplash
+            case.medical_info.disability_grade = grade
+            case.medical_info.medical_expenses = Decimal('350000')
+            case.medical_info.transportation_costs = Decimal('12000')
+            case.income_info.lost_work_days = lost_days
+            case.income_info.daily_income = Decimal(daily)
+            case.income_info.loss_period_years = period
+            case.income_info.basic_annual_income = Decimal(annual)
+            case.person_info.occupation = occupation
+            case.person_info.fault_percentage = fault
+            cases.append(case)
+        return cases
+
+    def test_batch_matches_scalar_path(self):
+        """一括計算の結果が calculate_all と一致することを確認"""
+        from calculation.compensation_engine import cases_to_columns
+
+        engine = CompensationEngine()
+        cases = self._make_cases()
+        batch = engine.calculate_batch(cases_to_columns(cases))
+
+        for index, case in enumerate(cases):
+            scalar = engine.calculate_all(case)
+            for key, result in scalar.items():
+                assert Decimal(int(batch[key][index])) == result.amount, (index, key)
+
+    def test_batch_selects_edition_per_accident_date(self):
+        """事故日の異なる案件を混在させても、行ごとの版で calculate_all と一致することを確認"""
+        from calculation.compensation_engine import cases_to_columns
+
+        engine = CompensationEngine()
+        cases = self._make_cases()
+        accident_dates = [date(2018, 5, 1), date(2021, 5, 1), date(2020, 3, 31), None, date(2020, 4, 1), date(1999, 1, 1)]
+        for case, accident_date in zip(cases, accident_dates):
+            case.accident_info.accident_date = accident_date
+        batch = engine.calculate_batch(cases_to_columns(cases))
+
+        editions = {engine.standards_for(case).edition_id for case in cases}
+        assert len(editions) == 2
+        for index, case in enumerate(cases):
+            scalar = engine.calculate_all(case)
+            for key, result in scalar.items():
+                assert Decimal(int(batch[key][index])) == result.amount, (index, key)
+
+    def test_batch_broadcasts_scalar_columns(self):
+        """スカラー列がブロードキャストされ、省略列がデフォルト値になることを確認"""
+        engine = CompensationEngine()
+        result = engine.calculate_batch({
+            'disability_grade': [0, 14, 12],
+            'fault_percentage': 20,
+        })
+
+        assert result['disability'].tolist() == [0, 1100000, 2900000]
+        assert result['summary'].shape == (3,)
+
+    def test_batch_rejects_unknown_columns(self):
+        """未知の列名はエラーになることを確認"""
+        from utils.error_handler import CalculationError
+
+        engine = CompensationEngine()
+        with pytest.raises(CalculationError):
+            engine.calculate_batch({'unknown_column': [1]})
+
+
+class TestStandardsPack:
+    """基準パック（版ごとの基準表）のテスト"""
+
+    def test_engines_share_one_pack(self):
+        """エンジン生成ごとに基準表を再構築しない"""
+        first = CompensationEngine()
+        second = CompensationEngine()
+        assert first.standards is second.standards
+        assert first.hospitalization_table_1 is second.hospitalization_table_1
+
+    def test_pack_is_read_only(self):
+        """基準表は不変"""
+        pack = CompensationEngine().standards
+        with pytest.raises(ValueError):
+            pack.hospitalization_table_1[0, 1] = 0
+        with pytest.raises(TypeError):
+            pack.disability_compensation_map[14] = 0
+
+    def test_for_date_selects_edition(self):
+        """事故日から適用版を選択"""
+        from calculation.standards import StandardsRegistry, StandardsPack
+        import dataclasses
+        base = CompensationEngine().standards
+        old = dataclasses.replace(base, edition_id="old", effective_from=date(2010, 1, 1))
+        registry = StandardsRegistry()
+        registry.register(base)
+        registry.register(old)
+        assert registry.for_date(date(2015, 6, 1)) is old
+        assert registry.for_date(date(2023, 6, 1)) is base
+        assert registry.for_date(date(2000, 1, 1)) is old
+        assert registry.for_date(None) is base
+
+    def test_string_accident_date(self):
+        """画面から渡される文字列の事故日でも版を選択して計算できることを確認"""
+        from calculation.compensation_engine import cases_to_columns
+        from calculation.standards import get_standards_registry
+        engine = CompensationEngine()
+        cases = []
+        for accident_date in ("2018-05-01", "2021-05-01", "不明", ""):
+            case_data = CaseData()
+            case_data.accident_info.accident_date = accident_date
+            case_data.medical_info.disability_grade = 9
+            case_data.income_info.basic_annual_income = Decimal('5000000')
+            case_data.income_info.loss_period_years = 10
+            cases.append(case_data)
+
+        assert engine.standards_for(cases[0]).statutory_rate == Decimal('0.05')
+        assert engine.standards_for(cases[2]) is get_standards_registry().latest()
+        expected = [Decimal('13513500'), Decimal('14927500'), Decimal('14927500'), Decimal('14927500')]
+        assert [engine.calculate_all(case)['future_income_loss'].amount for case in cases] == expected
+        assert [engine.calculate_amounts(case)['future_income_loss'] for case in cases] == expected
+        batch = engine.calculate_batch(cases_to_columns(cases))
+        assert [Decimal(int(amount)) for amount in batch['future_income_loss']] == expected
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """コンパイル済みパックをメモリマップで読み込み同一の結果を得る"""
+        from calculation.standards import StandardsPack
+        import numpy as np
+        pack = CompensationEngine().standards
+        loaded = StandardsPack.load(pack.save(tmp_path))
+        assert loaded.version == pack.version
+        assert isinstance(loaded.hospitalization_table_1, np.memmap)
+        assert np.array_equal(loaded.hospitalization_table_2, pack.hospitalization_table_2)
+        assert loaded.leibniz_coefficient(30) == pack.leibniz_coefficient(30) == Decimal('19.6')
+        assert dict(loaded.housework_annual_income) == dict(pack.housework_annual_income)
+
+
+class TestCoefficientService:
+    """中間利息控除係数サービスのテスト"""
+
+    def test_leibniz_matches_closed_form(self):
+        """年単位ライプニッツ係数は閉形式を小数点以下3桁で四捨五入した値"""
+        from calculation.coefficients import CoefficientService
+        service = CoefficientService()
+        assert service.coefficient(1, rate='0.05') == Decimal('0.952')
+        assert service.coefficient(10, rate='0.05') == Decimal('7.722')
+        assert service.coefficient(10, rate='0.03') == Decimal('8.530')
+        assert service.coefficient(0) == Decimal('0')
+
+    def test_hoffmann_and_monthly(self):
+        """ホフマン係数・月単位の係数"""
+        from calculation.coefficients import CoefficientService, HOFFMANN, MONTH
+        service = CoefficientService()
+        assert service.coefficient(2, HOFFMANN, '0.05') == Decimal('1.861')
+        assert service.coefficient(12, rate='0.03', granularity=MONTH) == Decimal('0.984')
+
+    def test_bulk_lookup_and_growth(self):
+        """一括参照と表の拡張"""
+        import numpy as np
+        from calculation.coefficients import CoefficientService
+        service = CoefficientService()
+        periods = [1, 10, 250]
+        expected = [service.coefficient(p, rate='0.05') for p in periods]
+        assert service.coefficients(periods, rate='0.05') == expected
+        milli = service.coefficients_milli(np.array(periods), rate='0.05')
+        assert list(milli) == [int(c * 1000) for c in expected]
+        assert len(service.cached_tables()) == 1
+
+    def test_pre_2020_accident_uses_five_percent(self):
+        """2020年3月以前の事故は法定利率5%の係数を使用"""
+        engine = CompensationEngine()
+        case_data = CaseData()
+        case_data.accident_info.accident_date = date(2019, 5, 1)
+        assert engine.standards_for(case_data).statutory_rate == Decimal('0.05')
+        assert engine.standards_for(case_data).leibniz_coefficient(10) == Decimal('7.722')
+        case_data.accident_info.accident_date = date(2021, 5, 1)
+        assert engine.standards_for(case_data).leibniz_coefficient(10) == Decimal('8.530')
+
+    def test_pre_2020_accident_amounts(self):
+        """2020年3月以前の事故は calculate_all・calculate_batch とも5%の係数で逸失利益を計算"""
+        from calculation.compensation_engine import cases_to_columns
+        engine = CompensationEngine()
+        cases = []
+        for accident_date in (date(2018, 5, 1), date(2021, 5, 1)):
+            case_data = CaseData()
+            case_data.accident_info.accident_date = accident_date
+            case_data.medical_info.disability_grade = 9
+            case_data.income_info.basic_annual_income = Decimal('5000000')
+            case_data.income_info.loss_period_years = 10
+            cases.append(case_data)
+
+        # 5,000,000円 × 35% × 7.722（5%） / 8.530（3%）
+        expected = [Decimal('13513500'), Decimal('14927500')]
+        assert [engine.calculate_all(case)['future_income_loss'].amount for case in cases] == expected
+        batch = engine.calculate_batch(cases_to_columns(cases))
+        assert [Decimal(int(amount)) for amount in batch['future_income_loss']] == expected
+        assert [Decimal(int(amount)) for amount in batch['summary']] == \
+            [engine.calculate_all(case)['summary'].amount for case in cases]
+
+
+class TestResultCache:
+    """計算結果キャッシュのテスト"""
+
+    def _case(self):
+        case_data = CaseData()
+        case_data.medical_info.hospital_months = 1
+        case_data.medical_info.outpatient_months = 3
+        case_data.medical_info.disability_grade = 14
+        case_data.income_info.loss_period_years = 5
+        case_data.person_info.annual_income = Decimal('4000000')
+        return case_data
+
+    def test_identical_inputs_hit_cache(self):
+        """同一入力の再計算はキャッシュから返す"""
+        engine = CompensationEngine()
+        case_data = self._case()
+        first = engine.calculate_all(case_data)
+        case_data.person_info.name = "氏名の変更は計算に影響しない"
+        second = engine.calculate_all(case_data)
+        info = engine.get_result_cache_info()
+        assert (info['hits'], info['misses']) == (1, 1)
+        assert {k: v.amount for k, v in first.items()} == {k: v.amount for k, v in second.items()}
+        stats = engine.performance_monitor.get_cache_statistics()
+        assert stats['calculation_results']['hits'] >= 1
+
+    def test_changed_inputs_miss_cache(self):
+        """計算に影響する項目の変更はキャッシュを使わない"""
+        engine = CompensationEngine()
+        case_data = self._case()
+        before = engine.calculate_all(case_data)['summary'].amount
+        case_data.medical_info.outpatient_months = 6
+        after = engine.calculate_all(case_data)['summary'].amount
+        assert after > before
+        assert engine.get_result_cache_info()['misses'] == 2
+
+    def test_cached_results_are_copies(self):
+        """返却された結果の変更はキャッシュに影響しない"""
+        engine = CompensationEngine()
+        case_data = self._case()
+        engine.calculate_all(case_data)['summary'].amount = Decimal('0')
+        assert engine.calculate_all(case_data)['summary'].amount > 0
+
+    def test_cache_is_bounded(self):
+        """上限件数を超えると古い結果から破棄"""
+        engine = CompensationEngine(cache_size=2)
+        case_data = self._case()
+        for months in (1, 2, 3):
+            case_data.medical_info.outpatient_months = months
+            engine.calculate_all(case_data)
+        assert engine.get_result_cache_info()['size'] == 2
+
+
+class TestRecalculate:
+    """依存関係に基づく差分再計算のテスト"""
+
+    def _case(self):
+        case_data = CaseData()
+        case_data.medical_info.hospital_months = 1
+        case_data.medical_info.outpatient_months = 3
+        case_data.medical_info.disability_grade = 12
+        case_data.medical_info.medical_expenses = Decimal('300000')
+        case_data.income_info.loss_period_years = 10
+        case_data.income_info.lost_work_days = 20
+        case_data.income_info.daily_income = Decimal('10000')
+        case_data.person_info.annual_income = Decimal('5000000')
+        case_data.person_info.fault_percentage = 10.0
+        return case_data
+
+    def test_affected_items(self):
+        """入力項目から影響を受ける損害項目を求める"""
+        engine = CompensationEngine()
+        assert engine.affected_items(['medical_expenses']) == {'medical_expenses'}
+        assert engine.affected_items(['medical_info.disability_grade']) == {'disability', 'future_income_loss'}
+        assert engine.affected_items(['fault_percentage', 'person_info.name']) == set()
+        with pytest.raises(Exception):
+            engine.affected_items(['no_such_field'])
+
+    def test_recalculate_matches_full_calculation(self):
+        """差分再計算の結果は全項目計算と一致"""
+        engine = CompensationEngine(cache_size=0)
+        case_data = self._case()
+        previous = engine.calculate_all(case_data)
+        before = engine.input_snapshot(case_data)
+        case_data.medical_info.medical_expenses = Decimal('450000')
+        case_data.person_info.fault_percentage = 20.0
+        changed = engine.changed_input_fields(before, engine.input_snapshot(case_data))
+        assert changed == {'medical_info.medical_expenses', 'person_info.fault_percentage'}
+
+        calls = []
+        original = engine.calculate_item
+        engine.calculate_item = lambda item, *args: calls.append(item) or original(item, *args)
+        updated = engine.recalculate(case_data, changed, previous)
+        assert calls == ['medical_expenses']
+
+        full = CompensationEngine(cache_size=0).calculate_all(case_data)
+        assert {k: v.amount for k, v in updated.items()} == {k: v.amount for k, v in full.items()}
+        assert updated['summary'].calculation_details == full['summary'].calculation_details
+
+    def test_recalculate_without_previous_results(self):
+        """前回結果がなければ全項目を計算"""
+        engine = CompensationEngine(cache_size=0)
+        case_data = self._case()
+        results = engine.recalculate(case_data, ['medical_expenses'])
+        assert set(results) == {'hospitalization', 'disability', 'lost_income',
+                                'future_income_loss', 'medical_expenses', 'summary'}
+
+
+class TestCalculationDetails:
+    """計算詳細の遅延整形のテスト"""
+
+    def test_details_render_on_access(self):
+        """詳細は参照時に初めて整形される"""
+        engine = CompensationEngine(cache_size=0)
+        case_data = CaseData()
+        case_data.income_info.lost_work_days = 10
+        case_data.income_info.daily_income = Decimal('12000')
+        result = engine.calculate_all(case_data)['lost_income']
+        raw = result._calculation_details
+        assert not raw.is_rendered
+        assert result.calculation_details == "休業日数: 10日\n日額基礎収入: 12,000円\n計算式: 12,000円 × 10日"
+        assert raw.is_rendered
+        assert result.to_dict()['calculation_details'] == result.calculation_details
+
+    def test_plain_string_details(self):
+        """文字列の詳細はそのまま保持"""
+        from calculation.compensation_engine import CalculationResult
+        result = CalculationResult("項目", Decimal('0'), "詳細")
+        assert result.calculation_details == "詳細"
+        result.calculation_details = "変更後"
+        assert result.to_dict()['calculation_details'] == "変更後"
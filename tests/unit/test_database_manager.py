@@ -217,3 +217,941 @@ class TestDatabaseManager:
         for case in cases:
             loaded = mock_database_manager.load_case(case.case_number)
             assert loaded is not None
+
+
+class TestConnectionPool:
+    """接続プールのテスト"""
+
+    def test_connections_are_reused(self, mock_database_manager, sample_case_data):
+        """複数回の操作で接続が再利用されることを確認"""
+        sample_case_data.case_number = "POOL-TEST-001"
+        mock_database_manager.save_case(sample_case_data)
+        before = mock_database_manager.get_pool_statistics()['checkouts']
+        # 検索はキャッシュを経由しないため、呼び出しごとに接続を借りる
+        for _ in range(10):
+            cases = mock_database_manager.search_cases()
+            assert any(case['case_number'] == "POOL-TEST-001" for case in cases)
+
+        stats = mock_database_manager.get_pool_statistics()
+        assert stats['connections'] == 1
+        assert stats['checkouts'] - before == 10
+        assert stats['in_use'] == 0
+
+    def test_pragmas_applied_once_per_connection(self, temp_db_path):
+        """PRAGMA設定は接続の生成時のみ実行されることを確認"""
+        db_manager = DatabaseManager(str(temp_db_path))
+        with patch.object(db_manager, '_create_connection', wraps=db_manager._create_connection) as create:
+            db_manager._pool._connect = create
+            for _ in range(5):
+                db_manager.search_cases()
+            assert create.call_count == 0
+
+        with db_manager.get_connection() as conn:
+            assert conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+
+    def test_context_manager_commits_and_rolls_back(self, mock_database_manager):
+        """ブロック終了時に確定、例外時に取り消されることを確認"""
+        with mock_database_manager.get_connection() as conn:
+            conn.execute("INSERT INTO settings (key, value) VALUES ('a', '1')")
+
+        with pytest.raises(RuntimeError):
+            with mock_database_manager.get_connection() as conn:
+                conn.execute("INSERT INTO settings (key, value) VALUES ('b', '2')")
+                raise RuntimeError("abort")
+
+        with mock_database_manager.get_connection() as conn:
+            keys = [row[0] for row in conn.execute('SELECT key FROM settings')]
+        assert keys == ['a']
+
+    def test_execute_query_releases_finished_connection(self, tmp_path):
+        """execute_query は結果を読み切り、変更を確定してから接続を返すことを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "query.db"))
+        assert db_manager.execute_query("INSERT INTO settings (key, value) VALUES ('theme', 'dark')") == []
+        rows = db_manager.execute_query("SELECT key, value FROM settings")
+        assert [tuple(row) for row in rows] == [('theme', 'dark')]
+        assert db_manager.get_pool_statistics()['in_use'] == 0
+        db_manager.close()
+
+    def test_pool_wait_and_timeout(self, temp_db_path):
+        """上限まで貸し出すと待機し、タイムアウトでエラーとなることを確認"""
+        from database.connection_pool import ConnectionPool
+        from utils.error_handler import DatabaseError
+        import sqlite3
+
+        pool = ConnectionPool(lambda: sqlite3.connect(str(temp_db_path), check_same_thread=False),
+                              pool_size=1, timeout=0.05)
+        conn = pool.acquire()
+        with pytest.raises(DatabaseError):
+            pool.acquire()
+        pool.release(conn)
+
+        with pool.connection() as again:
+            assert again is conn
+        stats = pool.get_statistics()
+        assert stats['checkouts'] == 2
+        assert stats['connections'] == 1
+        pool.close()
+
+
+class TestSearchColumns:
+    """検索用列（非正規化列）のテスト"""
+
+    def test_search_columns_populated_on_save(self, tmp_path, sample_case_data):
+        """保存時に検索用列が設定され、条件検索に使えることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "search.db"))
+        sample_case_data.medical_info.disability_grade = 12
+        sample_case_data.calculation_results = {'summary': {'amount': '12345678'}}
+        assert db_manager.save_case(sample_case_data)
+
+        results = db_manager.search_cases(disability_grade=12, min_total_amount=10000000)
+        assert [r['case_number'] for r in results] == [sample_case_data.case_number]
+        assert results[0]['client_name'] == sample_case_data.person_info.name
+        assert results[0]['accident_date'] == sample_case_data.accident_info.accident_date.isoformat()
+        assert results[0]['total_amount'] == 12345678
+        assert db_manager.search_cases(max_total_amount=100) == []
+
+    def test_migration_backfills_existing_rows(self, tmp_path):
+        """検索用列の無い既存データベースが移行時に埋められることを確認"""
+        import sqlite3
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, case_number TEXT UNIQUE NOT NULL, case_name TEXT,
+                created_date TEXT, last_modified TEXT, status TEXT DEFAULT '作成中', client_name TEXT,
+                person_info TEXT, accident_info TEXT, medical_info TEXT, income_info TEXT,
+                calculation_results TEXT, notes TEXT, custom_fields TEXT DEFAULT '{}', is_archived BOOLEAN DEFAULT 0
+            )
+        """)
+        conn.execute(
+            "INSERT INTO cases (case_number, created_date, last_modified, person_info, accident_info, "
+            "medical_info, income_info, calculation_results) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ("OLD-001", "2023-01-01", "2023-01-02", json.dumps({'name': '旧データ'}, ensure_ascii=False),
+             json.dumps({'accident_date': '2022-12-01'}), json.dumps({'disability_grade': 14}), '{}',
+             json.dumps({'summary': {'amount': '2500000'}}))
+        )
+        conn.commit()
+        conn.close()
+
+        db_manager = DatabaseManager(str(db_path))
+        results = db_manager.search_cases(client_name_pattern="旧データ")
+        assert len(results) == 1
+        assert results[0]['accident_date'] == '2022-12-01'
+        assert results[0]['disability_grade'] == 14
+        assert results[0]['total_amount'] == 2500000
+
+
+class TestFulltextSearch:
+    """全文検索（FTS5）のテスト"""
+
+    @pytest.fixture
+    def fulltext_db(self, tmp_path):
+        db_manager = DatabaseManager(str(tmp_path / "fulltext.db"))
+        for number, name, location, notes in [
+            ("FTS-001", "山田太郎", "東京都港区交差点", "追突事故で頸椎捻挫"),
+            ("FTS-002", "佐藤花子", "大阪市北区", "歩行者横断中の事故"),
+        ]:
+            case = CaseData()
+            case.case_number = number
+            case.person_info.name = name
+            case.accident_info.location = location
+            case.notes = notes
+            case.custom_fields = {'保険会社': '東京海上日動'}
+            db_manager.save_case(case)
+        return db_manager
+
+    def test_match_with_snippet(self, fulltext_db):
+        """3文字以上の語は索引で検索され、抜粋が付くことを確認"""
+        results = fulltext_db.search_cases_fulltext("交差点")
+        assert [r['case_number'] for r in results] == ["FTS-001"]
+        assert "【交差点】" in results[0]['snippet']
+
+        results = fulltext_db.search_cases_fulltext("東京海上")
+        assert {r['case_number'] for r in results} == {"FTS-001", "FTS-002"}
+
+    def test_short_terms_fall_back_to_like(self, fulltext_db):
+        """2文字の語（日本語の姓など）も検索できることを確認"""
+        results = fulltext_db.search_cases_fulltext("佐藤")
+        assert [r['case_number'] for r in results] == ["FTS-002"]
+        assert results[0]['snippet'] == "【佐藤】花子"
+
+        results = fulltext_db.search_cases_fulltext("大阪 歩行者")
+        assert [r['case_number'] for r in results] == ["FTS-002"]
+
+    def test_index_follows_updates_and_archive(self, fulltext_db):
+        """更新・アーカイブがトリガーで索引に反映されることを確認"""
+        case = fulltext_db.load_case("FTS-001")
+        case.notes = "示談交渉中"
+        fulltext_db.save_case(case)
+        assert fulltext_db.search_cases_fulltext("追突事故") == []
+        assert [r['case_number'] for r in fulltext_db.search_cases_fulltext("示談交渉")] == ["FTS-001"]
+
+        fulltext_db.delete_case("FTS-002")
+        assert fulltext_db.search_cases_fulltext("歩行者") == []
+
+
+class TestIterCases:
+    """キーセットページングによるストリーミング取得のテスト"""
+
+    @pytest.fixture
+    def paged_db(self, tmp_path):
+        db_manager = DatabaseManager(str(tmp_path / "paged.db"))
+        with db_manager.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO cases (case_number, last_modified, status, client_name) VALUES (?, ?, ?, ?)",
+                [(f"PAGE-{i:03d}", None if i % 10 == 0 else f"2024-01-{i % 4 + 1:02d}T00:00:00",
+                  '完了' if i % 2 else '作成中', f"依頼者{i}") for i in range(25)]
+            )
+            conn.execute("UPDATE cases SET is_archived = 1 WHERE case_number = 'PAGE-001'")
+        return db_manager
+
+    def test_iterates_all_rows_in_keyset_order(self, paged_db):
+        """同一更新日時・NULLを含めても漏れや重複なく順に返すことを確認"""
+        rows = list(paged_db.iter_cases(chunk_size=3))
+        expected = [dict(r) for r in paged_db.search_cases(limit=100)]
+        assert len(rows) == 24
+        assert len({row.id for row in rows}) == 24
+        assert [row.keyset for row in rows] == sorted(
+            (row.keyset for row in rows),
+            key=lambda k: (k[0] is not None, k[0] or "", k[1]), reverse=True)
+        assert {row.case_number for row in rows} == {r['case_number'] for r in expected}
+
+    def test_status_filter_and_resume(self, paged_db):
+        """ステータス絞り込みと、途中の行からの再開を確認"""
+        completed = list(paged_db.iter_cases(status='完了', chunk_size=4))
+        assert completed and all(row.status == '完了' for row in completed)
+
+        first = list(paged_db.iter_cases(chunk_size=5))
+        resumed = list(paged_db.iter_cases(chunk_size=5, after=first[9].keyset))
+        assert resumed == first[10:]
+
+    def test_iter_case_data(self, paged_db):
+        """CaseData として順に取得できることを確認"""
+        cases = list(paged_db.iter_case_data(chunk_size=7))
+        assert [c.case_number for c in cases] == [row.case_number for row in paged_db.iter_cases()]
+
+
+class TestBatchSaveCases:
+    """一括保存（UPSERT）のテスト"""
+
+    @staticmethod
+    def make_cases(count, prefix="BULK"):
+        cases = []
+        for i in range(count):
+            case = CaseData()
+            case.case_number = f"{prefix}-{i:03d}"
+            case.person_info.name = f"一括{i}"
+            cases.append(case)
+        return cases
+
+    def test_insert_then_update(self, tmp_path):
+        """チャンク単位で新規作成し、再保存で更新されることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "bulk.db"))
+        cases = self.make_cases(25)
+        results = db_manager.batch_save_cases(cases, chunk_size=10)
+        assert results['success_count'] == 25
+        assert results['failed_count'] == 0
+
+        created = db_manager.load_case("BULK-003").created_date
+        cases[3].person_info.name = "更新後"
+        results = db_manager.batch_save_cases(cases, chunk_size=10)
+        assert results['success_count'] == 25
+        loaded = db_manager.load_case("BULK-003")
+        assert loaded.person_info.name == "更新後"
+        assert loaded.created_date == created
+        assert db_manager.get_statistics()['total_cases'] == 25
+
+    def test_row_errors_do_not_abort_chunk(self, tmp_path):
+        """失敗した行のみが記録され、同じチャンクの他の行は保存されることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "bulk_errors.db"))
+        with db_manager.get_connection() as conn:
+            conn.execute("""
+                CREATE TRIGGER reject_case BEFORE INSERT ON cases
+                WHEN new.case_number = 'BULK-002'
+                BEGIN SELECT RAISE(ABORT, 'rejected'); END
+            """)
+        cases = self.make_cases(5)
+        cases[4].case_number = ""
+        results = db_manager.batch_save_cases(cases, chunk_size=10)
+
+        assert results['success_count'] == 3
+        assert results['failed_count'] == 2
+        assert {(e['index'], e['case_number']) for e in results['row_errors']} == {(2, 'BULK-002'), (4, '')}
+        assert db_manager.load_case("BULK-003") is not None
+        assert db_manager.load_case("BULK-002") is None
+
+
+class TestOnlineBackup:
+    """バックアップAPIによるオンラインバックアップのテスト"""
+
+    def test_backup_includes_wal_contents(self, tmp_path, sample_case_data):
+        """チェックポイント前（WAL内）の変更もバックアップに含まれることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "live.db"))
+        sample_case_data.case_number = "WAL-001"
+        db_manager.save_case(sample_case_data)
+        assert (tmp_path / "live.db-wal").exists()
+
+        assert db_manager.create_backup(str(tmp_path / "backups"))
+        backup_file, = (tmp_path / "backups").glob("*.db")
+        restored = DatabaseManager(str(backup_file))
+        assert restored.load_case("WAL-001") is not None
+
+    def test_compression_retention_and_records(self, tmp_path):
+        """圧縮・保持数の上限・記録内容を確認"""
+        import gzip
+        db_manager = DatabaseManager(str(tmp_path / "live.db"))
+        db_manager.max_backup_files = 2
+        backup_dir = tmp_path / "backups"
+        for _ in range(3):
+            assert db_manager.create_backup(str(backup_dir), compress=True)
+
+        backups = sorted(backup_dir.glob("*.db.gz"))
+        assert len(backups) == 2
+        with gzip.open(backups[-1], 'rb') as f:
+            assert f.read(16) == b"SQLite format 3\x00"
+
+        with db_manager.get_connection() as conn:
+            records = conn.execute(
+                "SELECT success, compressed, duration_seconds, file_size FROM backup_records"
+            ).fetchall()
+        assert len(records) == 3
+        assert all(r['success'] and r['compressed'] and r['duration_seconds'] >= 0 and r['file_size'] > 0
+                   for r in records)
+
+    def test_async_backup(self, tmp_path):
+        """バックグラウンドスレッドで実行され、完了時に通知されることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "live.db"))
+        results = []
+        thread = db_manager.create_backup_async(str(tmp_path / "backups"), on_complete=results.append)
+        thread.join(timeout=10)
+        assert results and results[0]['success']
+        assert Path(results[0]['path']).exists()
+
+
+class TestPayloadEncoding:
+    """案件データの圧縮保存形式のテスト"""
+
+    def _case(self, number, sample_case_data):
+        sample_case_data.case_number = number
+        sample_case_data.accident_info.location = "名古屋市中区交差点"
+        sample_case_data.medical_info.disability_grade = 14
+        sample_case_data.custom_fields = {'保険会社': '損保ジャパン'}
+        sample_case_data.calculation_results = {'summary': {'item_name': '総合計', 'amount': '3200000'}}
+        return sample_case_data
+
+    def test_codec_round_trip_and_legacy_json(self):
+        """圧縮形式の往復変換と、従来のJSON文字列の読み込みを確認"""
+        from database import payload_codec
+        payload = {'name': '山田太郎', 'age': 45, 'nested': {'amount': '1000000'}}
+        encoded = payload_codec.encode(payload, payload_codec.ENCODING_ZLIB_JSON)
+        assert payload_codec.is_encoded(encoded)
+        assert payload_codec.decode(encoded) == payload
+        assert payload_codec.decode(json.dumps(payload, ensure_ascii=False)) == payload
+        assert payload_codec.decode(None) is None
+        assert json.loads(payload_codec.to_json_text(encoded)) == payload
+
+    def test_save_and_load_compressed(self, tmp_path, sample_case_data):
+        """圧縮形式で保存しても読み込み・検索用列・全文検索が従来どおり動くことを確認"""
+        from database import payload_codec
+        from config.app_config import DatabaseConfig
+        config_manager = MagicMock()
+        config_manager.get_config.return_value.database = DatabaseConfig(
+            payload_encoding=payload_codec.ENCODING_ZLIB_JSON
+        )
+        db_manager = DatabaseManager(str(tmp_path / "codec.db"), config_manager=config_manager)
+        case = self._case("CODEC-001", sample_case_data)
+        assert db_manager.save_case(case)
+
+        with db_manager.get_connection() as conn:
+            stored = conn.execute("SELECT person_info FROM cases WHERE case_number = 'CODEC-001'").fetchone()[0]
+        assert payload_codec.is_encoded(stored)
+
+        loaded = db_manager.load_case("CODEC-001")
+        assert loaded.to_dict() == case.to_dict()
+        assert db_manager.search_cases(disability_grade=14, min_total_amount=3000000)[0]['case_number'] == "CODEC-001"
+        assert [r['case_number'] for r in db_manager.search_cases_fulltext("損保ジャパン")] == ["CODEC-001"]
+
+    def test_migrate_payloads(self, tmp_path, sample_case_data):
+        """既存のJSON行が変換され、同じ内容で読み込めることを確認"""
+        from database import payload_codec
+        db_manager = DatabaseManager(str(tmp_path / "migrate.db"))
+        case = self._case("CODEC-002", sample_case_data)
+        db_manager.save_case(case)
+        before = db_manager.load_case("CODEC-002").to_dict()
+
+        report = db_manager.migrate_payloads(payload_codec.ENCODING_ZLIB_JSON, chunk_size=1)
+        assert report['rows_converted'] == 1 and not report['errors']
+        assert db_manager.load_case("CODEC-002").to_dict() == before
+        assert [r['case_number'] for r in db_manager.search_cases_fulltext("損保ジャパン")] == ["CODEC-002"]
+        assert db_manager.migrate_payloads(payload_codec.ENCODING_ZLIB_JSON)['rows_converted'] == 0
+
+        db_manager.migrate_payloads(payload_codec.ENCODING_JSON)
+        with db_manager.get_connection() as conn:
+            stored = conn.execute("SELECT medical_info FROM cases WHERE case_number = 'CODEC-002'").fetchone()[0]
+        assert json.loads(stored)['disability_grade'] == 14
+
+    def test_dictionary_improves_compression(self):
+        """実際の案件データ（入力値と計算結果）がプリセット辞書でより小さく圧縮されることを確認"""
+        import zlib
+        from database import payload_codec
+        from benchmarks.synthetic_cases import generate_cases
+        from calculation.compensation_engine import CompensationEngine
+        case = generate_cases(1, seed=3)[0]
+        case.calculation_results = {k: v.to_dict() for k, v in CompensationEngine().calculate_all(case).items()}
+
+        for column in ('person_info', 'medical_info', 'calculation_results'):
+            value = getattr(case, column)
+            payload = value if isinstance(value, dict) else value.to_dict()
+            serialized = json.dumps(payload, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+            encoded = payload_codec.encode(payload, payload_codec.ENCODING_ZLIB_JSON)
+            compressed = len(encoded) - payload_codec.HEADER_SIZE
+            without_dictionary = len(zlib.compress(serialized, 9))
+            assert compressed < without_dictionary, column
+            if column == 'calculation_results':
+                # 項目名・計算詳細の定型文がほぼ辞書から参照される
+                assert compressed < without_dictionary / 3
+            assert payload_codec.decode(encoded) == json.loads(serialized)
+
+
+class TestCaseCache:
+    """案件データの読み込みキャッシュのテスト"""
+
+    @pytest.fixture
+    def cached_db(self, tmp_path, sample_case_data):
+        db_manager = DatabaseManager(str(tmp_path / "cache.db"))
+        sample_case_data.case_number = "CACHE-001"
+        db_manager.save_case(sample_case_data)
+        return db_manager
+
+    def test_hits_and_copies(self, cached_db):
+        """繰り返しの読み込みがキャッシュから返り、返却値の変更が波及しないことを確認"""
+        first = cached_db.load_case("CACHE-001")
+        first.person_info.name = "変更済み"
+        first.custom_fields['メモ'] = '未保存'
+        second = cached_db.load_case("CACHE-001")
+        assert second.person_info.name == "テスト太郎"
+        assert 'メモ' not in second.custom_fields
+
+        stats = cached_db.get_case_cache_statistics()
+        assert stats['hits'] >= 1 and stats['misses'] == 0  # 保存時の書き込みスルーでミスなし
+
+        case_id = cached_db.search_cases(case_number_pattern="CACHE-001")[0]['id']
+        assert cached_db.load_case_data_by_id(case_id).case_number == "CACHE-001"
+        assert cached_db.load_case_by_id(case_id)['id'] == case_id
+
+    def test_detects_external_writes(self, cached_db):
+        """別の接続（他のプロセス）による更新・アーカイブを検知することを確認"""
+        import sqlite3
+        cached_db.load_case("CACHE-001")
+        conn = sqlite3.connect(str(cached_db.db_path))
+        conn.execute("UPDATE cases SET notes = '外部更新', last_modified = '2099-01-01T00:00:00' "
+                     "WHERE case_number = 'CACHE-001'")
+        conn.commit()
+        assert cached_db.load_case("CACHE-001").notes == "外部更新"
+        assert cached_db.get_case_cache_statistics()['stale'] == 1
+
+        conn.execute("UPDATE cases SET is_archived = 1 WHERE case_number = 'CACHE-001'")
+        conn.commit()
+        conn.close()
+        assert cached_db.load_case("CACHE-001") is None
+
+    def test_write_through_and_delete(self, cached_db):
+        """保存内容がキャッシュに反映され、削除でキャッシュから外れることを確認"""
+        case = cached_db.load_case("CACHE-001")
+        case.notes = "保存後の内容"
+        cached_db.save_case(case)
+        case.notes = "保存していない変更"
+        assert cached_db.load_case("CACHE-001").notes == "保存後の内容"
+
+        cached_db.delete_case("CACHE-001")
+        assert cached_db.load_case("CACHE-001") is None
+
+
+class TestStatisticsRollup:
+    """統計ロールアップのテスト"""
+
+    def _save(self, db_manager, number, status, grade, amount):
+        case = CaseData()
+        case.case_number = number
+        case.status = status
+        case.created_date = datetime(2024, 3, 15)
+        case.medical_info.disability_grade = grade
+        case.calculation_results = {'summary': {'amount': str(amount)}}
+        assert db_manager.save_case(case)
+        return case
+
+    def test_rollup_follows_changes(self, tmp_path):
+        """保存・更新・アーカイブ・物理削除がトリガーで統計に反映されることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "stats.db"))
+        self._save(db_manager, "STAT-001", "作成中", 14, 1000000)
+        case = self._save(db_manager, "STAT-002", "作成中", 12, 3000000)
+        self._save(db_manager, "STAT-003", "計算完了", 0, 500000)
+
+        case.status = "計算完了"
+        db_manager.save_case(case)
+        db_manager.delete_case("STAT-003")
+        with db_manager.get_connection() as conn:
+            conn.execute("DELETE FROM cases WHERE case_number = 'STAT-001'")
+
+        stats = db_manager.get_statistics()
+        assert stats['total_cases'] == 1
+        assert stats['total_amount'] == 3000000
+        assert stats['status_counts'] == {"計算完了": 1}
+        assert stats['grade_counts'] == {12: 1}
+        assert db_manager.get_database_info()['table_counts']['cases'] == 2
+        assert db_manager.check_statistics()['consistent']
+
+    def test_checker_detects_and_repairs(self, tmp_path):
+        """ロールアップの不一致を検出し、作り直せることを確認"""
+        db_manager = DatabaseManager(str(tmp_path / "stats.db"))
+        self._save(db_manager, "STAT-010", "作成中", 0, 200000)
+        with db_manager.get_connection() as conn:
+            conn.execute("UPDATE case_stats SET case_count = 5 WHERE dimension = 'status'")
+
+        result = db_manager.check_statistics()
+        assert not result['consistent']
+        assert result['differences'][0]['rollup'] == (5, 200000)
+        assert result['differences'][0]['expected'] == (1, 200000)
+        assert db_manager.health_check()['issues']
+
+        assert db_manager.check_statistics(repair=True)['repaired']
+        assert db_manager.check_statistics()['consistent']
+        assert db_manager.get_statistics()['status_counts'] == {"作成中": 1}
+
+    def test_health_check_uses_one_connection(self, tmp_path):
+        """接続が1本のプールでもヘルスチェックが待たされずに照合できることを確認"""
+        from config.app_config import DatabaseConfig
+        config_manager = MagicMock()
+        config_manager.get_config.return_value.database = DatabaseConfig(pool_size=1, connection_timeout_seconds=0.2)
+        db_manager = DatabaseManager(str(tmp_path / "stats.db"), config_manager=config_manager)
+        self._save(db_manager, "STAT-020", "作成中", 0, 200000)
+        with db_manager.get_connection() as conn:
+            conn.execute("UPDATE case_stats SET case_count = 5 WHERE dimension = 'status'")
+
+        health = db_manager.health_check()
+        assert health['status'] != 'error'
+        assert any("統計ロールアップの不一致" in issue for issue in health['issues'])
+        assert db_manager.get_pool_statistics()['in_use'] == 0
+
+
+class TestAsyncDatabase:
+    """非同期ファサード（書き込みスレッド・読み込みスレッド）のテスト"""
+
+    @pytest.fixture
+    def async_db(self, tmp_path):
+        from database.async_db import AsyncDatabase
+        db = AsyncDatabase(DatabaseManager(str(tmp_path / "async.db")))
+        yield db
+        db.close()
+
+    def test_writes_in_order_and_asyncio(self, async_db):
+        """書き込みが投入順に実行され、asyncio から await できることを確認"""
+        import asyncio
+        order = []
+        futures = []
+        for i in range(10):
+            case = CaseData()
+            case.case_number = f"ASYNC-{i:03d}"
+            futures.append(async_db.save_case(case, callback=lambda result, error, i=i: order.append(i)))
+        assert all(f.result(timeout=10) for f in futures)
+        assert order == list(range(10))
+
+        loaded = asyncio.run(async_db.run('load_case', "ASYNC-009"))
+        assert loaded.case_number == "ASYNC-009"
+        assert async_db.get_statistics()['writes'] == 10
+
+    def test_reads_not_blocked_by_writes(self, async_db):
+        """書き込み中も読み込みが完了することを確認"""
+        import threading
+        release = threading.Event()
+        write = async_db.submit_write(release.wait, 10)
+        assert async_db.search_cases(limit=5).result(timeout=5) == []
+        assert not write.done()
+        release.set()
+        write.result(timeout=5)
+
+    def test_superseded_results_and_pump(self, tmp_path):
+        """同じ key の古い要求の結果は通知されず、通知は drain したスレッドで実行されることを確認"""
+        import threading
+        import time
+        from database.async_db import AsyncDatabase, CallbackPump
+        pump = CallbackPump()
+        db = AsyncDatabase(DatabaseManager(str(tmp_path / "async.db")), dispatcher=pump.dispatch)
+        received = []
+        slow = db.submit_read(lambda: time.sleep(0.2) or "古い結果", key='case_list',
+                              callback=lambda result, error: received.append((result, threading.get_ident())))
+        fast = db.submit_read(lambda: "新しい結果", key='case_list',
+                              callback=lambda result, error: received.append((result, threading.get_ident())))
+        slow.result(timeout=5), fast.result(timeout=5)
+        assert received == []
+        pump.drain()
+        assert received == [("新しい結果", threading.get_ident())]
+        assert db.get_statistics()['superseded'] == 1
+        db.close()
+
+
+class TestAutosave:
+    """自動保存（ライトビハインド）のテスト"""
+
+    def test_coalesces_and_writes_changed_sections(self, tmp_path, sample_case_data):
+        """同じ案件の変更がまとめられ、変更のあった項目のみ保存されることを確認"""
+        from database.autosave import AutosaveQueue
+        db_manager = DatabaseManager(str(tmp_path / "autosave.db"))
+        sample_case_data.case_number = "AUTO-001"
+        db_manager.save_case(sample_case_data)
+        autosave = AutosaveQueue(db_manager, interval_seconds=60)
+        autosave.track(db_manager.load_case("AUTO-001"))
+
+        for note in ("1回目", "2回目", "3回目"):
+            sample_case_data.notes = note
+            autosave.mark_dirty(sample_case_data)
+        sample_case_data.notes = "保存後の変更"  # 受け付け時点の内容が保存される
+        assert autosave.pending_count == 1
+        assert autosave.journal_path.exists()
+
+        results = autosave.flush()
+        assert results['success_count'] == 1 and results['sections_written'] == 1
+        assert db_manager.load_case("AUTO-001").notes == "3回目"
+        assert not autosave.journal_path.exists()
+        stats = autosave.get_statistics()
+        assert stats['coalesced'] == 2 and stats['sections_skipped'] == 6
+
+    def test_new_case_and_close(self, tmp_path):
+        """未保存の新規案件は全体を保存し、close で未保存分が保存されることを確認"""
+        from database.autosave import AutosaveQueue
+        db_manager = DatabaseManager(str(tmp_path / "autosave.db"))
+        autosave = AutosaveQueue(db_manager, interval_seconds=60, idle_seconds=60)
+        autosave.start()
+        case = CaseData()
+        case.case_number = "AUTO-NEW"
+        case.person_info.name = "新規依頼者"
+        autosave.mark_dirty(case)
+        autosave.close()
+        assert db_manager.load_case("AUTO-NEW").person_info.name == "新規依頼者"
+        assert autosave.pending_count == 0
+
+    def test_idle_flush(self, tmp_path):
+        """入力が止まった後に保存スレッドが保存することを確認"""
+        import time
+        from database.autosave import AutosaveQueue
+        db_manager = DatabaseManager(str(tmp_path / "autosave.db"))
+        autosave = AutosaveQueue(db_manager, interval_seconds=60, idle_seconds=0.05)
+        autosave.start()
+        case = CaseData()
+        case.case_number = "AUTO-IDLE"
+        autosave.mark_dirty(case)
+        deadline = time.monotonic() + 5
+        while autosave.pending_count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        autosave.close()
+        assert db_manager.load_case("AUTO-IDLE") is not None
+
+    def test_recover_from_journal(self, tmp_path):
+        """異常終了で残ったジャーナルから復元されることを確認（壊れた最終行は無視）"""
+        from database.autosave import AutosaveQueue
+        db_manager = DatabaseManager(str(tmp_path / "autosave.db"))
+        crashed = AutosaveQueue(db_manager, interval_seconds=60)
+        case = CaseData()
+        case.case_number = "AUTO-CRASH"
+        case.notes = "異常終了前の入力"
+        crashed.mark_dirty(case)
+        crashed._journal.close()  # 保存せずに終了した状態
+        with open(crashed.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"case": {"case_number": "AUTO-')
+
+        restarted = AutosaveQueue(db_manager, interval_seconds=60)
+        assert restarted.recover() == 1
+        assert db_manager.load_case("AUTO-CRASH").notes == "異常終了前の入力"
+        assert not restarted.journal_path.exists()
+
+
+class TestCalculationHistory:
+    """計算履歴（差分圧縮）のテスト"""
+
+    def test_patch_round_trip(self):
+        """差分の作成・適用で元の内容が再現されることを確認"""
+        from database.calculation_history import make_patch, apply_patch
+        old = {'a': 1, 'b': {'c': '2', 'd/e': [1, 2]}, 'x': None}
+        new = {'a': 1, 'b': {'c': '3', 'd/e': [1, 2, 3], 'f~': True}, 'y': 0}
+        patch = make_patch(old, new)
+        assert apply_patch(old, patch) == new
+        assert old['b']['c'] == '2'  # 元の内容は変更しない
+        assert make_patch(new, new) == []
+        assert make_patch({'v': 1}, {'v': True}) == [{'op': 'replace', 'path': '/v', 'value': True}]
+
+    def test_record_reconstruct_and_diff(self, tmp_path):
+        """記録した各時点の内容が復元でき、キーフレーム間隔ごとに全体が保存されることを確認"""
+        from database.calculation_history import CalculationHistory
+        db_manager = DatabaseManager(str(tmp_path / "history.db"))
+        case = CaseData()
+        case.case_number = "HIST-001"
+        db_manager.save_case(case)
+        history = CalculationHistory(db_manager, keyframe_interval=4)
+        assert history.record("UNSAVED-001", {}, {}) is None
+
+        ids = []
+        for i in range(10):
+            ids.append(history.record("HIST-001", {'medical_info.hospital_months': i, 'age': 40},
+                                      {'summary': {'amount': str(1000000 + i)}}))
+        stats = history.get_statistics("HIST-001")
+        assert stats['entries'] == 10 and stats['keyframes'] == 3
+
+        state = history.get_state("HIST-001", ids[6])
+        assert state['inputs'] == {'medical_info.hospital_months': 6, 'age': 40}
+        assert state['results']['summary']['amount'] == '1000006'
+        assert history.get_state("HIST-001")['id'] == ids[-1]
+        assert [e['id'] for e in history.list_entries("HIST-001", limit=2)] == [ids[9], ids[8]]
+
+        diff = history.diff("HIST-001", ids[2], ids[5])
+        assert diff['inputs'] == [{'op': 'replace', 'path': '/medical_info.hospital_months', 'value': 5}]
+
+        # 別のインスタンス（他のプロセス相当）からの追記でも差分の起点が正しいことを確認
+        other = CalculationHistory(db_manager, keyframe_interval=4)
+        other.record("HIST-001", {'medical_info.hospital_months': 99, 'age': 40}, {'summary': {'amount': '1'}})
+        latest = history.record("HIST-001", {'medical_info.hospital_months': 100, 'age': 41}, {'summary': {'amount': '2'}})
+        assert history.get_state("HIST-001", latest)['inputs'] == {'medical_info.hospital_months': 100, 'age': 41}
+
+
+class TestSchemaMigrations:
+    """PRAGMA user_version によるスキーマ移行のテスト"""
+
+    def test_current_schema_skips_migrations(self, tmp_path):
+        """最新のスキーマでは移行処理を実行しないことを確認"""
+        db_path = tmp_path / "schema.db"
+        DatabaseManager(str(db_path)).close()
+        with patch.object(DatabaseManager, '_migrate_base_schema') as base_schema:
+            db_manager = DatabaseManager(str(db_path))
+        base_schema.assert_not_called()
+        assert db_manager.schema_version == len(db_manager._schema_migrations())
+        assert db_manager.get_database_info()['schema_version'] == db_manager.schema_version
+        assert db_manager.fulltext_enabled
+
+    def test_upgrades_unversioned_database(self, tmp_path):
+        """バージョン管理導入前のデータベースに列・索引・集計を追加できることを確認"""
+        import sqlite3
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, case_number TEXT UNIQUE NOT NULL, case_name TEXT,
+                created_date TEXT, last_modified TEXT, status TEXT DEFAULT '作成中', client_name TEXT,
+                person_info TEXT, accident_info TEXT, medical_info TEXT, income_info TEXT,
+                calculation_results TEXT, notes TEXT, custom_fields TEXT DEFAULT '{}', is_archived BOOLEAN DEFAULT 0
+            )
+        """)
+        conn.execute(
+            "INSERT INTO cases (case_number, created_date, last_modified, person_info, accident_info, "
+            "medical_info, income_info, calculation_results) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ("LEGACY-001", "2024-01-05T10:00:00", "2024-01-05T10:00:00", '{"name": "旧形式 太郎"}',
+             '{"location": "横浜市中区"}', '{"disability_grade": 12}', '{}', '{"summary": {"amount": 500000}}')
+        )
+        conn.commit()
+        conn.close()
+
+        db_manager = DatabaseManager(str(db_path))
+        assert db_manager.schema_version == len(db_manager._schema_migrations())
+        assert [case['case_number'] for case in db_manager.search_cases(disability_grade=12)] == ["LEGACY-001"]
+        assert db_manager.search_cases_fulltext("横浜市")[0]['case_number'] == "LEGACY-001"
+        statistics = db_manager.get_statistics()
+        assert statistics['total_cases'] == 1 and statistics['total_amount'] == 500000
+        assert db_manager.check_statistics()['consistent']
+
+    def test_failed_migration_rolls_back(self, tmp_path):
+        """移行が途中で失敗した場合に変更とバージョンが元に戻ることを確認"""
+        import sqlite3
+        from utils.error_handler import DatabaseError
+        from database.migrations import Migration
+        db_path = tmp_path / "rollback.db"
+        db_manager = DatabaseManager(str(db_path))
+        version = db_manager.schema_version
+        db_manager.close()
+
+        def broken(conn):
+            conn.execute("CREATE TABLE partial (id INTEGER)")
+            conn.execute("INSERT INTO missing_table VALUES (1)")
+
+        migrations = db_manager._schema_migrations() + [Migration(version + 1, "失敗する移行", broken)]
+        with patch.object(DatabaseManager, '_schema_migrations', return_value=migrations):
+            with pytest.raises(DatabaseError):
+                DatabaseManager(str(db_path))
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'partial'").fetchone() is None
+        conn.close()
+
+    def test_rejects_newer_schema(self, tmp_path):
+        """アプリケーションより新しいスキーマのデータベースは開かないことを確認"""
+        import sqlite3
+        from utils.error_handler import DatabaseError
+        db_path = tmp_path / "newer.db"
+        DatabaseManager(str(db_path)).close()
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA user_version = 999")
+        conn.close()
+        with pytest.raises(DatabaseError):
+            DatabaseManager(str(db_path))
+
+
+class TestCaseArchive:
+    """ホット／コールド分割（アーカイブDB）のテスト"""
+
+    @staticmethod
+    def _make_archive_db(db_path, config_manager=None):
+        db_manager = DatabaseManager(str(db_path), config_manager=config_manager)
+        for i in range(6):
+            case = CaseData()
+            case.case_number = f"ARC-{i:03d}"
+            case.person_info.name = f"保管 {i}"
+            case.accident_info.location = "札幌市中央区" if i % 2 else "福岡市博多区"
+            case.medical_info.disability_grade = 14
+            case.calculation_results = {'summary': {'amount': 100000}}
+            db_manager.save_case(case)
+        with db_manager.get_connection() as conn:
+            conn.execute("UPDATE cases SET last_modified = '2019-04-01T09:00:00' WHERE case_number IN ('ARC-000', 'ARC-001')")
+        db_manager.delete_case("ARC-002")
+        return db_manager
+
+    @pytest.fixture
+    def archive_db(self, tmp_path):
+        db_manager = self._make_archive_db(tmp_path / "hot.db")
+        yield db_manager
+        db_manager.close()
+
+    def test_archive_search_and_restore(self, archive_db):
+        """古い案件・削除済みの案件を移し、指定時のみ検索対象になり、復元できることを確認"""
+        from database.calculation_history import CalculationHistory
+        history = CalculationHistory(archive_db)
+        history.record("ARC-000", {'age': 30}, {'summary': {'amount': '1'}})
+        statistics = archive_db.get_statistics()
+
+        report = archive_db.archive_cases(older_than_months=12)
+        assert report['cases_moved'] == 3 and report['history_moved'] == 1
+        assert archive_db.archive_path.exists()
+        assert archive_db.get_statistics() == statistics
+        assert archive_db.check_statistics()['consistent']
+
+        assert {c['case_number'] for c in archive_db.search_cases()} == {"ARC-003", "ARC-004", "ARC-005"}
+        spanning = {c['case_number']: c['archived'] for c in archive_db.search_cases(include_archived=True)}
+        assert spanning == {"ARC-000": 1, "ARC-001": 1, "ARC-003": 0, "ARC-004": 0, "ARC-005": 0}
+        assert {c['case_number'] for c in archive_db.search_cases_fulltext("札幌市", include_archived=True)} == {"ARC-001", "ARC-003", "ARC-005"}
+        assert archive_db.load_case("ARC-000") is None
+        assert archive_db.load_case("ARC-000", include_archived=True).person_info.name == "保管 0"
+
+        assert archive_db.restore_case("ARC-000")
+        assert archive_db.load_case("ARC-000").person_info.name == "保管 0"
+        assert history.get_state("ARC-000")['inputs'] == {'age': 30}
+        assert not archive_db.restore_case("ARC-000")
+        assert archive_db.get_statistics() == statistics
+        assert archive_db.get_database_info()['archive']['cases'] == 2
+
+    def test_interrupted_move_keeps_hot_rows(self, archive_db):
+        """元の行を削除する前に失敗しても案件は失われず、次回の実行で移動が完了することを確認"""
+        statistics = archive_db.get_statistics()
+        with archive_db.get_connection() as conn:
+            conn.execute("CREATE TRIGGER fail_delete BEFORE DELETE ON cases BEGIN SELECT RAISE(ABORT, 'interrupted'); END")
+        with pytest.raises(Exception):
+            archive_db.archive_cases(older_than_months=12)
+        with archive_db.get_connection() as conn:
+            conn.execute("DROP TRIGGER fail_delete")
+
+        assert archive_db.load_case("ARC-000") is not None
+        assert len(archive_db.search_cases(include_archived=True)) == 5
+
+        report = archive_db.archive_cases(older_than_months=12)
+        assert report['stale_removed'] == 3 and report['cases_moved'] == 3
+        assert archive_db.get_statistics() == statistics
+        assert len(archive_db.search_cases(include_archived=True)) == 5
+
+    def test_changed_between_phases_not_counted_twice(self, tmp_path):
+        """複製後に変更された案件は移さず、統計にも二重に計上されないことを確認"""
+        from config.app_config import DatabaseConfig
+        config_manager = MagicMock()
+        config_manager.get_config.return_value.database = DatabaseConfig(pool_size=1)
+        db_manager = self._make_archive_db(tmp_path / "hot.db", config_manager)
+        statistics = db_manager.get_statistics()
+        # 複製（1段階目）の直後に、ホット側の案件が更新されたのと同じ状態にする
+        with db_manager.get_connection() as conn:
+            db_manager._attach_archive(conn, create=True)
+            conn.execute(
+                "CREATE TEMP TRIGGER change_between_phases AFTER INSERT ON archive.cases "
+                "WHEN new.case_number = 'ARC-000' BEGIN "
+                "UPDATE cases SET last_modified = '2030-01-01T00:00:00' WHERE id = new.id; END"
+            )
+
+        report = db_manager.archive_cases(older_than_months=12)
+        assert report['cases_moved'] == 2 and report['skipped'] == 1
+        assert db_manager.get_statistics() == statistics
+        assert len(db_manager.search_cases(include_archived=True)) == 5
+        assert db_manager.load_case("ARC-000") is not None
+
+        with db_manager.get_connection() as conn:
+            conn.execute("DROP TRIGGER temp.change_between_phases")
+        report = db_manager.archive_cases(older_than_months=12)
+        assert report['stale_removed'] == 0 and report['cases_moved'] == 0
+        assert db_manager.get_statistics() == statistics
+        db_manager.close()
+
+
+class TestQueryLog:
+    """SQL文の実行時間の集計とスロークエリの実行計画のテスト"""
+
+    def test_fingerprint_normalizes_literals(self):
+        """リテラル・IN句の要素数・空白の違いが同じ形にまとめられることを確認"""
+        from database.query_log import fingerprint
+        assert fingerprint("SELECT * FROM cases WHERE id = 5 AND status = 'x'") == \
+            fingerprint("SELECT *  FROM cases\n WHERE id = ? AND status = :status")
+        assert fingerprint("SELECT * FROM cases WHERE id IN (?, ?, ?)") == \
+            fingerprint("SELECT * FROM cases WHERE id IN (1,2)")
+        assert fingerprint("SELECT * FROM t1") != fingerprint("SELECT * FROM t2")
+
+    def test_statistics_percentile(self):
+        """形ごとの回数・合計・95パーセンタイルが集計されることを確認"""
+        from database.query_log import QueryLog
+        query_log = QueryLog(slow_threshold_ms=1000)
+        for i in range(1, 101):
+            query_log.record(f"SELECT * FROM cases WHERE id = {i}", (), i / 1000.0)
+        statistics = query_log.get_statistics()
+        assert statistics['fingerprint_count'] == 1 and statistics['statement_count'] == 100
+        statement = statistics['statements'][0]
+        assert statement['count'] == 100 and statement['slow_count'] == 0
+        assert statement['p95_ms'] == pytest.approx(96.0)
+        assert statement['total_ms'] == pytest.approx(5050.0)
+
+    def test_unfinished_cursor_recorded_without_plan(self):
+        """読み切らずに破棄されたカーソルは時間のみ記録し、実行計画は取得しないことを確認"""
+        import gc
+        import sqlite3
+        from database.query_log import QueryLog, TimedConnection
+        conn = sqlite3.connect(":memory:", factory=TimedConnection)
+        conn.query_log = QueryLog(slow_threshold_ms=0)
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        with patch.object(QueryLog, '_explain') as explain:
+            assert conn.execute("SELECT v FROM t ORDER BY v").fetchone()[0] == 1
+            gc.collect()
+        explain.assert_not_called()
+        statements = {s['fingerprint']: s for s in conn.query_log.get_statistics()['statements']}
+        assert statements["SELECT v FROM t ORDER BY v"]['count'] == 1
+        conn.close()
+
+    def test_slow_full_scan_reported(self, tmp_path):
+        """閾値を超えた文の実行計画が記録され、全件走査がヘルスチェックに出ることを確認"""
+        from config.app_config import DatabaseConfig
+        config_manager = MagicMock()
+        config_manager.get_config.return_value.database = DatabaseConfig(slow_query_threshold_ms=0)
+        with patch.object(DatabaseManager, '_report_slow_query') as report:
+            db_manager = DatabaseManager(str(tmp_path / "slow.db"), config_manager=config_manager)
+            db_manager.reset_query_statistics()
+            with db_manager.get_connection() as conn:
+                conn.execute("SELECT id FROM cases WHERE case_number = ?", ("Q-1",)).fetchall()
+                conn.execute("SELECT id FROM cases WHERE notes = ?", ("メモ",)).fetchall()
+            statements = {s['fingerprint']: s for s in db_manager.get_query_statistics()['statements']}
+            assert statements["SELECT id FROM cases WHERE notes = ?"]['full_scans'] == ['cases']
+            assert statements["SELECT id FROM cases WHERE case_number = ?"]['full_scans'] == []
+            assert report.called
+
+            health = db_manager.health_check()
+            assert any("SELECT id FROM cases WHERE notes = ?" in issue for issue in health['issues'])
+            assert any(s['full_scans'] == ['cases'] for s in health['slow_queries'])
+            db_manager.close()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+固定小数点（整数）計算と Decimal 計算の差分テスト
+"""
+
+import pytest
+import random
+from datetime import date
+from decimal import Decimal
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from calculation.compensation_engine import CompensationEngine
+from calculation.fixed_point import (
+    differential_check, round_half_up_div, ratio_fraction, lawyer_fee_yen, NotFixedPointRepresentable, whole_yen
+)
+from models.case_data import CaseData
+
+
+def random_cases(count, seed):
+    """境界値を多く含む乱数案件"""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        case_data = CaseData()
+        medical, income, person = case_data.medical_info, case_data.income_info, case_data.person_info
+        case_data.accident_info.accident_date = rng.choice([
+            None, date(1999, 12, 31), date(2019, 6, 1), date(2020, 3, 31), date(2020, 4, 1), date(2022, 6, 1)
+        ])
+        medical.hospital_months = rng.choice([0, 0, 1, 3, 10, 11, -1])
+        medical.outpatient_months = rng.choice([0, 1, 3, 6, 20, 25, -1])
+        medical.actual_outpatient_days = rng.randint(0, 200)
+        medical.is_whiplash = rng.random() < 0.5
+        medical.disability_grade = rng.choice([0, 0, 14, 12, 9, 5, 1, 15])
+        medical.medical_expenses = Decimal(rng.randint(0, 5000000))
+        medical.transportation_costs = Decimal(rng.randint(0, 100000))
+        medical.nursing_costs = rng.choice([Decimal(0), Decimal(rng.randint(0, 100000)), 5000])
+        income.lost_work_days = rng.randint(0, 300)
+        income.daily_income = Decimal(rng.randint(0, 40000))
+        income.loss_period_years = rng.choice([0, 1, 5, 30, 67, 80, -1])
+        income.basic_annual_income = Decimal(rng.choice([0, 3000000, 12345679]))
+        person.annual_income = Decimal(rng.randint(0, 20000000))
+        person.occupation = rng.choice(["会社員", "家事従事者"])
+        person.fault_percentage = rng.choice([0, 5, 12.5, 33.3, 0.1, 99.9, 100, 1 / 3])
+        cases.append(case_data)
+    return cases
+
+
+class TestFixedPoint:
+    """整数演算の基本関数のテスト"""
+
+    def test_round_half_up_div(self):
+        assert round_half_up_div(5, 10) == 1
+        assert round_half_up_div(4, 10) == 0
+        assert round_half_up_div(-5, 10) == -1
+        assert round_half_up_div(15, 10) == 2
+
+    def test_ratio_fraction(self):
+        assert ratio_fraction(12.5) == (125, 1000)
+        assert ratio_fraction(10) == (10, 100)
+        assert ratio_fraction(Decimal('33.30')) == (3330, 10000)
+
+    def test_lawyer_fee_tiers(self):
+        assert lawyer_fee_yen(0) == 200000
+        assert lawyer_fee_yen(3000000) == 720000
+        assert lawyer_fee_yen(30000001) == 2700000
+
+    def test_whole_yen_rejects_fractions(self):
+        assert whole_yen(Decimal('1000.00')) == 1000
+        with pytest.raises(NotFixedPointRepresentable):
+            whole_yen(Decimal('1000.5'))
+        with pytest.raises(NotFixedPointRepresentable):
+            whole_yen("1000")
+
+
+class TestDifferential:
+    """Decimal 経路・整数経路・一括計算の差分テスト"""
+
+    def test_all_paths_match(self):
+        engine = CompensationEngine(cache_size=0)
+        assert differential_check(engine, random_cases(2000, seed=20240601)) == []
+
+    def test_batch_compared_for_pre_2020_cases(self):
+        """事故日が2020年3月以前の案件も一括計算の結果を比較する"""
+        engine = CompensationEngine(cache_size=0)
+        cases = [case for case in random_cases(300, seed=11)
+                 if case.accident_info.accident_date and case.accident_info.accident_date < date(2020, 4, 1)]
+        assert cases and differential_check(engine, cases) == []
+
+        # 事故日を無視して最新版で一括計算すると不一致として検出される
+        calculate_batch = engine.calculate_batch
+        engine.calculate_batch = lambda columns: calculate_batch(columns, standards=engine.standards)
+        mismatches = differential_check(engine, cases)
+        assert {m['path'] for m in mismatches} == {'batch'}
+        assert {m['item'] for m in mismatches} >= {'future_income_loss'}
+
+    def test_calculate_amounts_matches_calculate_all(self):
+        engine = CompensationEngine(cache_size=0)
+        for case_data in random_cases(200, seed=7):
+            amounts = engine.calculate_amounts(case_data)
+            results = engine.calculate_all(case_data)
+            assert all(amounts[item] == results[item].amount for item in amounts)
+            assert isinstance(amounts['summary'], int)
+
+    def test_fractional_input_falls_back_to_decimal(self):
+        engine = CompensationEngine(cache_size=0)
+        case_data = CaseData()
+        case_data.income_info.lost_work_days = 3
+        case_data.income_info.daily_income = Decimal('10000.5')
+        amounts = engine.calculate_amounts(case_data)
+        assert amounts['lost_income'] == Decimal('30001.5')
+        assert amounts['summary'] == engine.calculate_all(case_data)['summary'].amount
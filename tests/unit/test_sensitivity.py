@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感度分析のユニットテスト
+"""
+
+import pytest
+import time
+from decimal import Decimal
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from calculation.compensation_engine import CompensationEngine
+from calculation.sensitivity import SensitivityAnalyzer, DISABILITY_GRADES, FAULT_PERCENTAGE_STEPS
+from models.case_data import CaseData
+
+
+@pytest.fixture
+def base_case():
+    case_data = CaseData()
+    case_data.medical_info.hospital_months = 1
+    case_data.medical_info.outpatient_months = 6
+    case_data.medical_info.medical_expenses = Decimal('800000')
+    case_data.income_info.loss_period_years = 10
+    case_data.income_info.lost_work_days = 30
+    case_data.income_info.daily_income = Decimal('15000')
+    case_data.person_info.annual_income = Decimal('5000000')
+    return case_data
+
+
+class TestSensitivityAnalyzer:
+    """SensitivityAnalyzerクラスのテスト"""
+
+    def test_sweep_matches_calculate_all(self, base_case):
+        """格子の各点は calculate_all と同じ金額"""
+        engine = CompensationEngine(cache_size=0)
+        result = SensitivityAnalyzer(engine).sweep(base_case, {
+            'fault_percentage': FAULT_PERCENTAGE_STEPS,
+            'disability_grade': DISABILITY_GRADES,
+        })
+        assert result.shape == (11, 15)
+        assert result.grid().shape == (11, 15)
+        for i, fault in enumerate(FAULT_PERCENTAGE_STEPS):
+            for j, grade in enumerate(DISABILITY_GRADES):
+                base_case.person_info.fault_percentage = float(fault)
+                base_case.medical_info.disability_grade = grade
+                expected = engine.calculate_all(base_case)['summary'].amount
+                assert result.grid()[i, j] == int(expected)
+
+    def test_table_and_range(self, base_case):
+        """表形式と金額レンジ"""
+        result = SensitivityAnalyzer().sweep(base_case, {'fault_percentage': [0, 50], 'income': [3000000, 6000000]})
+        rows = result.table(items=['summary'])
+        assert len(rows) == 4
+        assert rows[0]['fault_percentage'] == 0 and rows[0]['income'] == 3000000
+        low, high = result.range()
+        assert low == min(r['summary'] for r in rows) and high == max(r['summary'] for r in rows)
+
+    def test_evaluate_scenarios(self, base_case):
+        """任意のシナリオ列の評価"""
+        result = SensitivityAnalyzer().evaluate_scenarios(base_case, [
+            {'fault_percentage': 0},
+            {'fault_percentage': 20, 'disability_grade': 14},
+        ])
+        assert result.shape == (2,)
+        assert result.grid('disability')[1] == 1100000
+
+    def test_unknown_axis(self, base_case):
+        """未知の軸はエラー"""
+        with pytest.raises(Exception):
+            SensitivityAnalyzer().sweep(base_case, {'no_such_axis': [1, 2]})
+
+    def test_large_grid_is_fast(self, base_case):
+        """数千シナリオを1秒未満で評価"""
+        start = time.perf_counter()
+        result = SensitivityAnalyzer().sweep(base_case, {
+            'fault_percentage': range(0, 101),
+            'disability_grade': DISABILITY_GRADES,
+            'loss_period_years': range(1, 41),
+        })
+        assert result.size == 101 * 15 * 40
+        assert time.perf_counter() - start < 1.0
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+モンテカルロシミュレーションのユニットテスト
+"""
+
+import pytest
+import time
+from decimal import Decimal
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from calculation.compensation_engine import CompensationEngine
+from calculation.simulation import MonteCarloSimulator, Triangular, Uniform, Normal, Discrete
+from models.case_data import CaseData
+
+
+@pytest.fixture
+def base_case():
+    case_data = CaseData()
+    case_data.medical_info.hospital_months = 1
+    case_data.medical_info.outpatient_months = 6
+    case_data.medical_info.actual_outpatient_days = 60
+    case_data.medical_info.medical_expenses = Decimal('800000')
+    case_data.income_info.loss_period_years = 5
+    case_data.person_info.annual_income = Decimal('5000000')
+    return case_data
+
+
+class TestMonteCarloSimulator:
+    """MonteCarloSimulatorクラスのテスト"""
+
+    def test_seeded_runs_are_reproducible(self, base_case):
+        """同じ seed で同じ分布"""
+        simulator = MonteCarloSimulator()
+        distributions = {'fault_percentage': Triangular(0, 20, 50), 'income': Normal(5000000, 500000, low=0)}
+        first = simulator.simulate(base_case, distributions, draws=5000, seed=42)
+        second = simulator.simulate(base_case, distributions, draws=5000, seed=42)
+        assert first.percentiles() == second.percentiles()
+        assert first.mean() == second.mean()
+
+    def test_fixed_inputs_match_calculate_all(self, base_case):
+        """分布を指定しない場合は calculate_all と同じ金額"""
+        expected = CompensationEngine().calculate_all(base_case)
+        result = MonteCarloSimulator().simulate(base_case, {}, draws=10, seed=0)
+        for item, calc in expected.items():
+            assert result.percentiles(item, (0, 100)) == {0: int(calc.amount), 100: int(calc.amount)}
+
+    def test_grade_recognition_probability(self, base_case):
+        """等級認定確率は後遺障害慰謝料の期待値に反映される"""
+        result = MonteCarloSimulator().simulate(
+            base_case, {'disability_grade': Discrete.from_mapping({0: 0.5, 14: 0.5})}, draws=20000, seed=1)
+        assert result.mean('disability') == pytest.approx(550000, rel=0.03)
+        assert result.percentiles('disability', (10, 90)) == {10: 0, 90: 1100000}
+        assert 0.45 < result.probability_at_least(1100000, 'disability') < 0.55
+
+    def test_summary_and_interval(self, base_case):
+        """統計量の一覧と和解レンジ"""
+        result = MonteCarloSimulator().simulate(
+            base_case, {'actual_outpatient_days': Uniform(10, 90)}, draws=2000, seed=3)
+        summary = result.summary()
+        assert set(summary) >= {'hospitalization', 'summary'}
+        low, high = result.interval(0.9)
+        assert summary['summary']['min'] <= low <= high <= summary['summary']['max']
+
+    def test_100k_draws_interactive(self, base_case):
+        """10万試行を対話的な時間で評価"""
+        start = time.perf_counter()
+        result = MonteCarloSimulator().simulate(base_case, {
+            'fault_percentage': Triangular(0, 20, 50),
+            'disability_grade': Discrete.from_mapping({0: 0.4, 14: 0.4, 12: 0.2}),
+            'actual_outpatient_days': Uniform(20, 90),
+            'income': Normal(5000000, 800000, low=0),
+        }, draws=100_000, seed=7)
+        assert result.values['summary'].shape == (100_000,)
+        assert time.perf_counter() - start < 2.0
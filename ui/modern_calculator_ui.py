@@ -27,6 +27,10 @@ from pathlib import Path
 from models import CaseData, PersonInfo, AccidentInfo, MedicalInfo, IncomeInfo
 from calculation.compensation_engine import CompensationEngine, CalculationResult
 from database.db_manager import DatabaseManager
+from database.async_db import AsyncDatabase, CallbackPump
+from database.case_cache import copy_case_data
+from database.autosave import AutosaveQueue
+from database.calculation_history import CalculationHistory
 from config.app_config import ConfigManager, get_config_manager
 
 # CustomTkinterのテーマ設定
@@ -58,11 +62,23 @@ class ModernCompensationCalculator:
         try:
             self.calculation_engine = CompensationEngine()
             self.db_manager = DatabaseManager(self.config.database.file_path)
+            # データベース処理は別スレッドで実行し、完了通知はメインループで受け取る
+            self._db_callbacks = CallbackPump()
+            self.async_db = AsyncDatabase(self.db_manager, dispatcher=self._db_callbacks.dispatch)
+            self._db_callbacks.attach(self.root)
+            # 編集内容の自動保存（入力が止まった時点・一定間隔でまとめて保存。異常終了時は次回起動時に復元）
+            self.autosave = AutosaveQueue(self.db_manager, self.config.ui.auto_save_interval,
+                                          self.config.ui.auto_save_idle_seconds, writer=self.async_db)
+            self.autosave.recover()
+            self.autosave.start()
+            self.calculation_history = CalculationHistory(self.db_manager)
             self.current_case: CaseData = CaseData()
             
             # リアルタイム計算フラグ
             self.auto_calculate = ctk.BooleanVar(value=self.config.ui.auto_calculate)
             self.calculation_timer = None
+            # 直前の計算（対象案件, 入力スナップショット, 結果）。差分再計算に使用
+            self._last_calculation = None
             
             # UIコンポーネントの作成（すべての属性が初期化された後）
             self.create_modern_ui()
@@ -774,19 +790,31 @@ class ModernCompensationCalculator:
                 self.case_number_entry.focus_set()
             return
 
-        try:
-            saved_case_id = self.db_manager.save_case(self.current_case)
-            if saved_case_id:
-                self.current_case.id = saved_case_id
-                self.current_case.last_modified = datetime.now()
-                self.status_label.configure(text=f"案件 '{self.current_case.case_number}' を保存しました")
-                self.last_saved_label.configure(text=f"最終保存: {self.current_case.last_modified.strftime('%H:%M:%S')}")
-                self.refresh_case_list()
-            else:
-                messagebox.showerror("エラー", "案件の保存に失敗しました。データベースを確認してください。")
-        except Exception as e:
-            self.logger.error(f"案件保存中にエラー: {e}", exc_info=True)
-            messagebox.showerror("重大なエラー", f"案件の保存中に予期せぬエラーが発生しました: {str(e)}")
+        # 保存は書き込みスレッドで実行（保存中の入力が書き込み内容に混ざらないよう複製を渡す）
+        saving_case = self.current_case
+        self.autosave.discard(saving_case.case_number)  # 全体を保存するので未保存の自動保存分は不要
+        self.status_label.configure(text=f"案件 '{saving_case.case_number}' を保存しています...")
+        saved_copy = copy_case_data(saving_case)
+        self.async_db.save_case(
+            saved_copy,
+            callback=lambda saved_case_id, error: self._on_case_saved(saving_case, saved_copy, saved_case_id, error)
+        )
+
+    def _on_case_saved(self, case_data: CaseData, saved_copy: CaseData, saved_case_id,
+                       error: Optional[BaseException]):
+        """案件保存の完了通知（メインループで実行）"""
+        if error is not None:
+            self.logger.error(f"案件保存中にエラー: {error}", exc_info=error)
+            messagebox.showerror("重大なエラー", f"案件の保存中に予期せぬエラーが発生しました: {str(error)}")
+        elif saved_case_id:
+            self.autosave.track(saved_copy)
+            case_data.id = saved_case_id
+            case_data.last_modified = datetime.now()
+            self.status_label.configure(text=f"案件 '{case_data.case_number}' を保存しました")
+            self.last_saved_label.configure(text=f"最終保存: {case_data.last_modified.strftime('%H:%M:%S')}")
+            self.refresh_case_list()
+        else:
+            messagebox.showerror("エラー", "案件の保存に失敗しました。データベースを確認してください。")
 
     def load_case(self):
         """案件読み込み（ダイアログ経由）"""
@@ -794,13 +822,22 @@ class ModernCompensationCalculator:
 
 
     def refresh_case_list(self):
-        """案件リストの更新"""
+        """案件リストの更新（検索は読み込みスレッドで実行し、最新の要求の結果のみ表示）"""
+        search_term = self.search_entry.get() if hasattr(self, 'search_entry') else ""
+        if search_term.strip():
+            # 備考・事故状況なども対象とする全文検索（関連度順・一致箇所の抜粋付き）
+            self.async_db.search_cases_fulltext(search_term, limit=50, callback=self._show_case_list, key='case_list')
+        else:
+            self.async_db.search_cases(limit=50, callback=self._show_case_list, key='case_list')
+
+    def _show_case_list(self, cases, error: Optional[BaseException]):
+        """検索結果で案件リストを描画（メインループで実行）"""
         for widget in self.case_list_frame.winfo_children():
             widget.destroy()
         
         try:
-            search_term = self.search_entry.get() if hasattr(self, 'search_entry') else ""
-            cases = self.db_manager.search_cases(search_term=search_term, limit=50) 
+            if error is not None:
+                raise error
             
             if not cases:
                 no_case_label = ctk.CTkLabel(self.case_list_frame, text="該当する案件はありません", font=self.fonts['small'])
@@ -810,6 +847,8 @@ class ModernCompensationCalculator:
             for case_summary in cases: 
                 case_id = case_summary.get('id') 
                 display_text = f"{case_summary.get('case_number', 'N/A')}\n{case_summary.get('client_name', 'N/A')}"
+                if case_summary.get('snippet'):
+                    display_text += f"\n{case_summary['snippet']}"
                 
                 case_item_frame = ctk.CTkFrame(self.case_list_frame, corner_radius=5) 
                 case_item_frame.pack(fill="x", pady=3, padx=5)
@@ -844,18 +883,26 @@ class ModernCompensationCalculator:
             return
 
         if messagebox.askyesno("確認", "現在の入力内容を破棄し、選択した案件を読み込みますか？", icon=messagebox.WARNING):
-            try:
-                case_data_dict = self.db_manager.load_case_by_id(case_id) 
-                if case_data_dict:
-                    self.current_case = CaseData.from_dict(case_data_dict) 
-                    self.load_case_data_to_ui() # これでlast_modifiedもUIに反映される
-                    self.status_label.configure(text=f"案件 '{self.current_case.case_number}' を読み込みました")
-                    # self.last_saved_label は load_case_data_to_ui 内で更新される
-                else:
-                    messagebox.showerror("エラー", f"ID {case_id} の案件が見つかりません。")
-            except Exception as e:
-                self.logger.error(f"案件 (ID: {case_id}) の読み込み中にエラー: {e}")
-                messagebox.showerror("エラー", f"案件の読み込み中に予期せぬエラーが発生しました: {e}")
+            self.async_db.load_case_data_by_id(
+                case_id, callback=lambda case_data, error: self._on_case_loaded(case_id, case_data, error)
+            )
+
+    def _on_case_loaded(self, case_id: int, case_data: Optional[CaseData], error: Optional[BaseException]):
+        """案件読み込みの完了通知（メインループで実行）"""
+        try:
+            if error is not None:
+                raise error
+            if case_data:
+                self.current_case = case_data
+                self.autosave.track(case_data)
+                self.load_case_data_to_ui() # これでlast_modifiedもUIに反映される
+                self.status_label.configure(text=f"案件 '{self.current_case.case_number}' を読み込みました")
+                # self.last_saved_label は load_case_data_to_ui 内で更新される
+            else:
+                messagebox.showerror("エラー", f"ID {case_id} の案件が見つかりません。")
+        except Exception as e:
+            self.logger.error(f"案件 (ID: {case_id}) の読み込み中にエラー: {e}")
+            messagebox.showerror("エラー", f"案件の読み込み中に予期せぬエラーが発生しました: {e}")
     
     def _get_widget_value(self, widget):
         if widget is None: return None # ウィジェットが存在しない場合
@@ -1300,8 +1347,17 @@ class ModernCompensationCalculator:
             
         # 3. 計算の実行と結果表示
         try:
-            # calculation_engine.calculate_all に渡すのは更新済みの self.current_case
-            results = self.calculation_engine.calculate_all(self.current_case)
+            # calculation_engine に渡すのは更新済みの self.current_case
+            # 同じ案件の直前の結果があれば、変更された入力に依存する項目のみ再計算する
+            inputs = self.calculation_engine.input_snapshot(self.current_case)
+            calculation_type = "calculate_all"
+            if self._last_calculation and self._last_calculation[0] is self.current_case:
+                changed_fields = self.calculation_engine.changed_input_fields(self._last_calculation[1], inputs)
+                results = self.calculation_engine.recalculate(self.current_case, changed_fields, self._last_calculation[2])
+                calculation_type = "recalculate"
+            else:
+                results = self.calculation_engine.calculate_all(self.current_case)
+            self._last_calculation = (self.current_case, inputs, results) if results else None
             
             if results: # 計算結果が得られた場合
                 self.display_results(results)
@@ -1313,6 +1369,13 @@ class ModernCompensationCalculator:
                     self.logger.warning("calculate_all から予期しない形式の結果が返されました。")
                     # 必要であれば、ここで calculation_results を空にするなどの処理
                     self.current_case.calculation_results = {} 
+                # 入力内容・計算結果を自動保存の対象にし、計算履歴に記録（案件番号が入力済みの場合）
+                if self.current_case.case_number:
+                    self.autosave.mark_dirty(self.current_case)
+                    self.async_db.submit_write(
+                        self.calculation_history.record, self.current_case.case_number,
+                        inputs, self.current_case.calculation_results, calculation_type
+                    )
             else: # 計算結果がNoneや空だった場合（エンジン側でエラー処理された可能性）
                 self.logger.warning("CalculationEngine.calculate_all が結果を返しませんでした。")
                 # 結果フレームをクリアするなどの処理が必要か検討
@@ -1827,6 +1890,9 @@ class ModernCompensationCalculator:
         try:
             self.logger.info("GUI アプリケーションを開始します...")
             self.root.mainloop()
+            # 自動保存・保存待ちの書き込みを完了させてから終了
+            self.autosave.close()
+            self.async_db.close()
             self.logger.info("GUI アプリケーションが正常に終了しました")
         except Exception as e:
             self.logger.error(f"GUI アプリケーション実行中にエラーが発生しました: {e}", exc_info=True)
@@ -74,6 +74,13 @@ class PerformanceMonitor:
             'last_called': None
         })
         
+        # キャッシュ統計（キャッシュ名ごとのヒット・ミス数）
+        self.cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._cache_stats_lock = threading.Lock()
+        
+        # データベースの遅いクエリ（実行計画・全件走査する表を含む）
+        self.slow_queries: deque = deque(maxlen=100)
+        
         # 監視フラグ
         self.monitoring_active = False
         self.monitor_thread: Optional[threading.Thread] = None
@@ -269,6 +276,35 @@ class PerformanceMonitor:
             self.alerts.append(alert)
             self.logger.warning(f"パフォーマンスアラート: {alert['message']}")
 
+    def record_cache_access(self, cache_name: str, hit: bool):
+        """キャッシュの参照結果（ヒット/ミス）を記録"""
+        with self._cache_stats_lock:
+            self.cache_stats[cache_name]['hits' if hit else 'misses'] += 1
+    
+    def get_cache_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """キャッシュごとのヒット・ミス数とヒット率を取得"""
+        with self._cache_stats_lock:
+            snapshot = {name: dict(stats) for name, stats in self.cache_stats.items()}
+        for stats in snapshot.values():
+            total = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / total if total else 0.0
+        return snapshot
+    
+    def record_slow_query(self, entry: Dict[str, Any]):
+        """データベースの遅いクエリを記録（全件走査を含む場合はアラート）"""
+        self.slow_queries.append(entry)
+        if entry.get('full_scans'):
+            alert = {
+                'type': 'slow_query',
+                'message': f"遅いクエリ（全件走査: {', '.join(entry['full_scans'])}）: {entry['elapsed_ms']:.1f}ms",
+                'function': entry['fingerprint'],
+                'value': entry['elapsed_ms'] / 1000.0,
+                'threshold': None,
+                'timestamp': datetime.now()
+            }
+            self.alerts.append(alert)
+            self.logger.warning(f"パフォーマンスアラート: {alert['message']}")
+    
     def get_performance_summary(self, hours: int = 24) -> Dict[str, Any]:
         """パフォーマンス要約を取得"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
@@ -340,6 +376,8 @@ class PerformanceMonitor:
                 }
                 for name, stats in most_called_functions
             ],
+            'caches': self.get_cache_statistics(),
+            'slow_queries': list(self.slow_queries)[-10:],
             'recent_alerts': self.alerts[-10:] if self.alerts else []
         }
     
@@ -369,6 +407,19 @@ class PerformanceMonitor:
                         'suggestion': 'エラーハンドリングの改善、入力値検証の強化'
                     })
         
+        # 全件走査で遅くなっているクエリ（表ごとに1件）
+        scanned_tables = {}
+        for entry in self.slow_queries:
+            for table in entry.get('full_scans', []):
+                scanned_tables.setdefault(table, entry)
+        for table, entry in scanned_tables.items():
+            suggestions.append({
+                'type': 'missing_index',
+                'priority': 'high',
+                'message': f'{table} を全件走査するクエリが遅い ({entry["elapsed_ms"]:.1f}ms): {entry["fingerprint"][:120]}',
+                'suggestion': f'{table} の検索条件・並べ替えに使う列へのインデックス追加を検討'
+            })
+        
         # システムリソース
         if self.system_history:
             recent_cpu = [m.cpu_percent for m in list(self.system_history)[-10:]]